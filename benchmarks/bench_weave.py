@@ -0,0 +1,206 @@
+#!usr/bin/env python
+"""
+End-to-end benchmarks of weave_reports over synthetic confirmation tools.
+
+For every report type and deck size, the confirmation tools, template
+and simulation directory are generated (see synth.py) and reports are woven
+with each backend. Recorded are the wall time (best of --repeat runs),
+calls into the PowerPoint object model per build phase (see tracing.py)
+and the peak memory allocated by Python.
+
+    python benchmarks/bench_weave.py --json results.json
+    python benchmarks/bench_weave.py --baseline results.json
+
+With --baseline, cases that got slower or make more calls
+than the baseline (beyond --tolerance) are listed and the exit code is 1.
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+
+WEAVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "weaver")
+sys.path.insert(0, WEAVER_DIR)
+
+# Keep caches of the benchmark apart from those of actual runs
+WORK_DIR = tempfile.mkdtemp(prefix="weaver-bench-")
+CACHE_DIR = os.path.join(WORK_DIR, "cache")
+os.environ["WEAVER_CACHE"] = CACHE_DIR
+
+import synth
+import weaver
+import tracing
+from backends import get_backend
+from backends.fake import FakeBackend
+
+
+# =======================
+# -- Helper Functions --
+# =======================
+
+def _weave(paths, backend, params):
+    """
+    Runs weave_reports on the backend instance and returns list of saved paths
+    """
+    get_backend_ = weaver.get_backend
+    weaver.get_backend = lambda name="": backend
+    os.environ["TEMP_PATH"] = paths["templates"]
+    try:
+        with redirect_stdout(io.StringIO()):
+            return weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], backend.name, params)
+    finally:
+        weaver.get_backend = get_backend_
+
+
+def _make_backend(name, latency):
+    if name == FakeBackend.name:
+        return FakeBackend(latency=latency)
+    return get_backend(name)
+
+
+def run_case(case, backend_name, args):
+    """
+    Generates the decks of case, weaves them args.repeat times
+    and returns dict of measurements
+    """
+    case_dir = os.path.join(WORK_DIR, "{type}-{interfaces}-{signals}-{power_nets}".format(**case))
+    paths = synth.generate(case_dir, case["type"], case["interfaces"], case["signals"], case["power_nets"])
+    out_dir = os.path.join(case_dir, "out")
+
+    def run(backend):
+        shutil.rmtree(out_dir, ignore_errors=True)
+        if not args.warm:
+            shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        params = { "date": "2020-01-01", "output_dir": out_dir, "if_exists": "overwrite" }
+        return _weave(paths, backend, params)
+
+    if args.warm:
+        run(_make_backend(backend_name, 0))
+
+    # Timed runs, without tracing
+    times = []
+    for _ in range(args.repeat):
+        backend = _make_backend(backend_name, args.latency / 1000)
+        start = time.perf_counter()
+        saved = run(backend)
+        times.append(time.perf_counter() - start)
+
+    # Counted run, with call and memory tracing
+    tracer = tracing.enable()
+    tracemalloc.start()
+    try:
+        run(_make_backend(backend_name, 0))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        tracing.disable()
+
+    result = dict(case)
+    result.update({
+        "backend": backend_name,
+        "reports": len(saved),
+        "wall_s": min(times),
+        "wall_s_runs": times,
+        "calls": tracer.calls(),
+        "calls_per_phase": tracer.calls_per_phase(),
+        "peak_mb": peak / 2**20,
+    })
+    return result
+
+
+def _key(result):
+    return (result["type"], result["backend"], result["interfaces"], result["signals"], result["power_nets"])
+
+
+def _cases(args):
+    cases = []
+    for rep_type in args.types:
+        if rep_type == "si":
+            sizes = [ (i, s, 0) for i in args.interfaces for s in args.signals ]
+        else:
+            sizes = [ (1, 0, n) for n in args.power_nets ]
+        for interfaces, signals, power_nets in sizes:
+            cases.append({ "type": rep_type, "interfaces": interfaces, "signals": signals, "power_nets": power_nets })
+    return cases
+
+
+def print_results(results):
+    print(f"{'TYPE':<5} {'BACKEND':<7} {'IF':>3} {'SIG':>4} {'NETS':>4} {'REPORTS':>7} "
+          f"{'WALL [s]':>9} {'CALLS':>8} {'PEAK [MB]':>9}")
+    for r in results:
+        print(f"{r['type']:<5} {r['backend']:<7} {r['interfaces']:>3} {r['signals']:>4} {r['power_nets']:>4} "
+              f"{r['reports']:>7} {r['wall_s']:>9.3f} {r['calls']:>8} {r['peak_mb']:>9.1f}")
+
+    print("\nCALLS PER PHASE")
+    for r in results:
+        if not r["calls_per_phase"]:
+            continue
+        print(f"  {r['type']} {r['backend']} if={r['interfaces']} sig={r['signals']} nets={r['power_nets']}:")
+        for phase, count in sorted(r["calls_per_phase"].items(), key=lambda item: -item[1]):
+            print(f"    {phase:<24} {count:>8}")
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns list of messages for results worse than baseline by more than tolerance
+    """
+    base = { _key(r): r for r in baseline }
+    regressions = []
+    for r in results:
+        b = base.get(_key(r))
+        if not b:
+            continue
+        name = "{} {} if={} sig={} nets={}".format(*_key(r))
+        if r["wall_s"] > b["wall_s"] * (1 + tolerance):
+            regressions.append(f"{name}: wall time {b['wall_s']:.3f} s -> {r['wall_s']:.3f} s")
+        if r["calls"] is not None and b.get("calls") is not None and r["calls"] > b["calls"] * (1 + tolerance):
+            regressions.append(f"{name}: calls {b['calls']} -> {r['calls']}")
+        if r["peak_mb"] > b["peak_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak memory {b['peak_mb']:.1f} MB -> {r['peak_mb']:.1f} MB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--types", nargs="+", default=["si", "pi", "emc"], choices=["si", "pi", "emc"])
+    parser.add_argument("--backends", nargs="+", default=["fake", "ooxml"])
+    parser.add_argument("--interfaces", nargs="+", type=int, default=[2, 8], help="SI interfaces per deck")
+    parser.add_argument("--signals", nargs="+", type=int, default=[4, 16], help="SI signals per interface")
+    parser.add_argument("--power_nets", nargs="+", type=int, default=[4, 16], help="PI/EMC power nets per deck")
+    parser.add_argument("--latency", type=float, default=0.2, help="Milliseconds per call into the fake PowerPoint")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case; the best is reported")
+    parser.add_argument("--warm", action="store_true", help="Keep extraction caches between runs")
+    parser.add_argument("--json", help="Path to write results to")
+    parser.add_argument("--baseline", help="Path to results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative slowdown tolerated against baseline")
+    args = parser.parse_args()
+
+    results = []
+    try:
+        for case in _cases(args):
+            for backend_name in args.backends:
+                results.append(run_case(case, backend_name, args))
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        print()
+        print("\n".join(regressions) if regressions else "No regressions against baseline.")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
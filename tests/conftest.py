@@ -0,0 +1,30 @@
+import os
+import sys
+import pytest
+
+
+"""
+Shared setup of the tests: modules of the package are imported
+as the package imports them, i.e. from the weaver directory,
+and fixtures used by several test modules
+"""
+
+WEAVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "weaver")
+sys.path.insert(0, os.path.abspath(WEAVER_DIR))
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """
+    Returns a temporary directory for data persisted between runs,
+    used in place of that of the user
+    """
+    # (1) Setup
+    import util
+    cache_dir = str(tmp_path / "cache")
+    monkeypatch.setattr(util, "CACHE_DIR", cache_dir)
+    return cache_dir
@@ -0,0 +1,68 @@
+import os
+
+import batch
+
+
+"""
+Tests for the selection of confirmation tools in batch mode
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_read_manifest(tmp_path):
+
+    # (1) Setup
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text(
+        "conf_tools,output_dir,date,image_dir\n"
+        "a/conf_tools.pptx,out/a,2020-01-01,images\n"
+        ",out/b,2020-01-01,\n"
+    )
+
+    # (2) Execute
+    jobs = batch.read_manifest(str(manifest))
+
+    # (3) Verify
+    assert len(jobs) == 1
+    assert jobs[0]["conf_tools"] == os.path.join(str(tmp_path), "a/conf_tools.pptx")
+    assert jobs[0]["output_dir"] == os.path.join(str(tmp_path), "out/a")
+    assert jobs[0]["image_dir"] == os.path.join(str(tmp_path), "images")
+    assert jobs[0]["date"] == "2020-01-01"
+    assert jobs[0]["filename"] == jobs[0]["simulation_dir"] == ""
+
+    # (4) Teardown
+
+
+def test_glob_jobs(tmp_path):
+
+    # (1) Setup
+    for name in ["b_conf.pptx", "a_conf.pptx", "notes.txt"]:
+        (tmp_path / name).write_text("")
+
+    # (2) Execute
+    jobs = batch.glob_jobs(str(tmp_path / "*.pptx"), "out", "2020-01-01")
+
+    # (3) Verify
+    assert [ os.path.basename(job["conf_tools"]) for job in jobs ] == ["a_conf.pptx", "b_conf.pptx"]
+    assert jobs[0]["output_dir"] == os.path.join("out", "a_conf")
+
+    # (4) Teardown
+
+
+def test_run_job_requires_output_dir(tmp_path):
+
+    # (1) Setup
+    job = { "conf_tools": str(tmp_path / "missing.pptx"), "output_dir": "", "date": "",
+            "filename": "", "simulation_dir": "" }
+
+    # (2) Execute
+    result = batch.run_job(job)
+
+    # (3) Verify
+    assert not result["ok"]
+    assert "output directory" in result["error"]
+
+    # (4) Teardown
@@ -0,0 +1,172 @@
+import os
+import pytest
+
+import util
+import cache
+import tables
+from reports import ConfirmationTools
+from backends.ooxml import OOXMLBackend
+from test_ooxml import make_pptx
+
+
+"""
+Tests for the extraction cache of ConfirmationTools
+and the digests of files it is keyed on
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def conf_path(tmp_path, cache_dir):
+    """
+    Returns path to SI confirmation tools with a single interface,
+    caching into a temporary directory
+    """
+    # (1) Setup
+    path = str(tmp_path / "AB1234_Confirmation_si_tools.pptx")
+    make_pptx(path, [
+        [ ("text", util.TITLE_NAME, "AB1234 Confirmation Tools"),
+          ("table", "Table 1", [ ["Preparer", "A. Author"], ["Reviewer", "B. Reviewer"] ]) ],
+        [],
+        [ ("table", "Table 1", [ ["Contents", "Page"], ["2.1 Sim Target & Condition", "4"],
+                                 ["2.2 Topology", "5"], ["2.3 Eye Mask Judgement", "6"] ]) ],
+        [ ("text", "Title 1", "Target & Condition: DDR"),
+          ("table", "Table 2", [ ["Signal Group", "Frequency", "Transmission Line", "Topology", "PVT"],
+                                 ["DQ: DQ0", "800 MHz", "U1 ~ U2", "P2P", "SS / FF"] ]),
+          ("table", "Table 3", [ ["Reference", "Type", "Part", "IC Model"],
+                                 ["U1", "SoC", "SoC ABC123", "soc.ibs"] ]) ],
+    ])
+    return path
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_extraction_is_cached(conf_path, monkeypatch):
+
+    # (1) Setup
+    backend = OOXMLBackend()
+    first = ConfirmationTools(backend.open(conf_path))
+    expected_toc = first.get_toc()
+    expected_creators = first.get_creators()
+    expected_names = [ i.name for i in util.get_interfaces(first, "") ]
+    first.save_cache()
+
+    def no_reads(table, header_row=1):
+        raise AssertionError("Table read despite cached extraction")
+
+    # (2) Execute
+    monkeypatch.setattr(tables.TableSnapshot, "from_table", classmethod(no_reads))
+    second = ConfirmationTools(backend.open(conf_path))
+    actual_toc = second.get_toc()
+    actual_creators = second.get_creators()
+    actual_names = [ i.name for i in util.get_interfaces(second, "") ]
+
+    # (3) Verify
+    assert second.cache.digest == first.cache.digest
+    assert actual_toc == expected_toc == { "sim_target": [4, 4], "topology": [5, 5], "eye_mask_judgement": [6, 6] }
+    assert actual_creators == expected_creators
+    assert actual_names == expected_names == ["DDR"]
+
+    # (4) Teardown
+
+
+def test_cache_can_be_disabled(conf_path):
+
+    # (1) Setup
+    pptx = OOXMLBackend().open(conf_path)
+
+    # (2) Execute
+    conf_tools = ConfirmationTools(pptx, use_cache=False)
+
+    # (3) Verify
+    assert conf_tools.cache is None
+    assert conf_tools.type == "si"
+
+    # (4) Teardown
+
+
+def test_file_digests_memoized_once(tmp_path, monkeypatch):
+
+    # (1) Setup
+    cache_dir = str(tmp_path / "cache")
+    paths = []
+    for i in range(5):
+        (tmp_path / f"{i}.bin").write_bytes(bytes([ i ]) * 100)
+        paths.append(str(tmp_path / f"{i}.bin"))
+    writes = []
+    write_atomic = cache._write_atomic
+    monkeypatch.setattr(cache, "_write_atomic", lambda path, data: writes.append(path) or write_atomic(path, data))
+
+    # (2) Execute
+    digests = cache.file_digests(paths, cache_dir)
+    again = cache.file_digests(paths, cache_dir)
+
+    # (3) Verify
+    # The memo is written once for all files, and not at all once they are memoized
+    assert digests == again == [ cache.file_digest(path) for path in paths ]
+    assert len(writes) == 1
+
+    # (4) Teardown
+
+
+def test_file_digests_merged_on_write(tmp_path, monkeypatch):
+
+    # (1) Setup
+    cache_dir = str(tmp_path / "cache")
+    for name in ["a", "b"]:
+        (tmp_path / f"{name}.bin").write_bytes(name.encode() * 100)
+    sha256 = cache.hashlib.sha256
+    digesting = []
+
+    def other_process(*args):
+        # Another process memoizes its file while this one digests its own
+        if not digesting:
+            digesting.append(True)
+            cache.file_digests([ str(tmp_path / "b.bin") ], cache_dir)
+        return sha256(*args)
+
+    # (2) Execute
+    monkeypatch.setattr(cache.hashlib, "sha256", other_process)
+    cache.file_digests([ str(tmp_path / "a.bin") ], cache_dir)
+    monkeypatch.undo()
+    memo = cache._read_memo(str(tmp_path / "cache" / "digests.json"))
+
+    # (3) Verify
+    # Neither digest is lost
+    assert sorted(memo) == [ str(tmp_path / "a.bin"), str(tmp_path / "b.bin") ]
+
+    # (4) Teardown
+
+
+def test_prune(tmp_path):
+
+    # (1) Setup
+    cache_dir = tmp_path / "cache"
+    for name in ["a", "b"]:
+        (tmp_path / f"{name}.bin").write_bytes(name.encode() * 100)
+    kept, gone = cache.file_digests([ str(tmp_path / "a.bin"), str(tmp_path / "b.bin") ], str(cache_dir))
+    names = { "kept": f"extract-{kept}-v{cache.EXTRACTOR_VERSION}.pickle",
+              "old_version": f"extract-{kept}-v{cache.EXTRACTOR_VERSION - 1}.pickle",
+              "gone": f"extract-{gone}-v{cache.EXTRACTOR_VERSION}.pickle" }
+    for name in names.values():
+        (cache_dir / name).write_bytes(b"")
+
+    # (2) Execute
+    # Digests of files deleted are dropped as the memo is next written
+    (tmp_path / "b.bin").unlink()
+    (tmp_path / "c.bin").write_bytes(b"c")
+    cache.file_digest(str(tmp_path / "c.bin"), str(cache_dir))
+    removed = cache.prune(str(cache_dir))
+
+    # (3) Verify
+    memo = cache._read_memo(str(cache_dir / "digests.json"))
+    assert sorted(memo) == [ str(tmp_path / "a.bin"), str(tmp_path / "c.bin") ]
+    assert removed == 2
+    assert sorted(name for name in os.listdir(cache_dir) if name.endswith(".pickle")) == [ names["kept"] ]
+
+    # (4) Teardown
@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+import threading
+import pytest
+
+import synth
+import weaver
+from daemon import Daemon, submit, request
+from backends.fake import read_deck
+
+
+"""
+Tests for the Weaver daemon and its client functions
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def decks(tmp_path, cache_dir, monkeypatch):
+    # (1) Setup
+    paths = synth.generate(str(tmp_path / "decks"), "si", interfaces=1, signals=2)
+    monkeypatch.setenv("TEMP_PATH", paths["templates"])
+    return paths
+
+
+@pytest.fixture
+def daemon(decks, monkeypatch):
+    """
+    Returns a Daemon serving in a thread of its own
+    """
+    # (1) Setup
+    started = []
+    get_backend = weaver.get_backend
+    monkeypatch.setattr("daemon.get_backend", lambda name="": started.append(name) or get_backend(name))
+    # Short path, as that of a socket is limited in length
+    socket_dir = tempfile.mkdtemp(prefix="weaver-")
+    daemon = Daemon(os.path.join(socket_dir, "weaver.sock"), "ooxml")
+    ready = threading.Event()
+    thread = threading.Thread(target=daemon.serve, args=(ready,), daemon=True)
+    thread.start()
+    assert ready.wait(10)
+    daemon.started = started
+    yield daemon
+
+    # (4) Teardown
+    daemon.shutdown()
+    thread.join(10)
+    shutil.rmtree(socket_dir, ignore_errors=True)
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_jobs_share_backend(daemon, decks, tmp_path):
+
+    # (1) Setup
+    jobs = [ { "command": "job", "conf_tools": decks["conf_tools"], "simulation_dir": decks["sim_dir"],
+               "date": "2020-01-01", "output_dir": str(tmp_path / f"out{i}") } for i in range(3) ]
+
+    # (2) Execute
+    results = list(submit(jobs, daemon.socket_path))
+    stats = request({ "command": "stats" }, daemon.socket_path)
+
+    # (3) Verify
+    assert [ result["ok"] for result in results ] == [True] * 3
+    assert all(os.path.isfile(result["reports"][0]) for result in results)
+    # Backend is started once for all jobs
+    assert daemon.started == ["ooxml"]
+    assert (stats["jobs"], stats["failed"]) == (3, 0)
+
+    # (4) Teardown
+
+
+def test_job_places_images(daemon, decks, tmp_path):
+
+    # (1) Setup
+    image_dir = synth.make_image_dir(str(tmp_path / "images"), interfaces=1, signals=2)
+    job = { "command": "job", "conf_tools": decks["conf_tools"], "simulation_dir": decks["sim_dir"],
+            "date": "2020-01-01", "output_dir": str(tmp_path / "out"), "image_dir": image_dir }
+
+    # (2) Execute
+    result = request(job, daemon.socket_path)
+
+    # (3) Verify
+    assert result["ok"]
+    slides = read_deck(result["reports"][0])["slides"]
+    pictures = [ shape for slide in slides if slide["name"].startswith("weaver:signal:")
+                 for shape in slide["shapes"] if shape["name"] == "weaver:image" ]
+    assert len(pictures) == 2
+
+    # (4) Teardown
+
+
+def test_templates_kept_open(daemon, decks, tmp_path):
+
+    # (1) Setup
+    job = { "command": "job", "conf_tools": decks["conf_tools"], "simulation_dir": decks["sim_dir"],
+            "date": "2020-01-01", "output_dir": str(tmp_path / "out") }
+    template_path = weaver._load_template_paths(decks["templates"])["si"]
+
+    # (2) Execute
+    first = request(job, daemon.socket_path)
+    kept = weaver._open_templates[template_path][2]
+    second = request(job, daemon.socket_path)
+    kept_again = weaver._open_templates[template_path][2]
+    # Template changed between jobs
+    mtime = os.path.getmtime(template_path) + 10
+    os.utime(template_path, (mtime, mtime))
+    third = request(job, daemon.socket_path)
+
+    # (3) Verify
+    assert first["ok"] and second["ok"] and third["ok"]
+    # Jobs are built on copies of the template kept open, until it is changed
+    assert kept_again is kept
+    assert weaver._open_templates[template_path][2] is not kept
+    assert weaver._open_templates[template_path][0] == mtime
+
+    # (4) Teardown
+
+
+def test_rejects_bad_requests(daemon, tmp_path):
+
+    # (1) Setup
+    messages = [ { "command": "job", "conf_tools": str(tmp_path / "missing.pptx") }, { "command": "unknown" } ]
+
+    # (2) Execute
+    failed, unknown = submit(messages, daemon.socket_path)
+
+    # (3) Verify
+    assert not failed["ok"] and failed["error"] == "ValueError: No output directory given"
+    assert not unknown["ok"] and "unknown" in unknown["error"]
+    assert request({ "command": "ping" }, daemon.socket_path) == { "ok": True }
+
+    # (4) Teardown
+
+
+def test_shutdown(daemon):
+
+    # (1) Setup
+    path = daemon.socket_path
+
+    # (2) Execute
+    reply = request({ "command": "shutdown" }, path)
+
+    # (3) Verify
+    assert reply == { "ok": True }
+    with pytest.raises(OSError):
+        for _ in range(100):
+            threading.Event().wait(0.05)
+            request({ "command": "ping" }, path)
+
+    # (4) Teardown
@@ -0,0 +1,123 @@
+import time
+import pytest
+
+from backends import get_backend, clone_slide
+from backends.fake import FakeBackend
+from util import MSOTRUE, com_error
+from test_ooxml import make_pptx
+
+
+"""
+Tests for the in-memory stand-in of PowerPoint
+"""
+
+
+DECK = {
+    "slides": [
+        { "name": "Cover", "shapes": [
+            { "name": "Title 1", "text": "AB1234 Report" },
+            { "name": "Table 1", "table": [ ["Name", "Value"], ["a", "1"] ] },
+        ] },
+        { "name": "Body", "shapes": [ { "name": "Picture 1" } ] },
+    ]
+}
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def backend(tmp_path):
+    # (1) Setup
+    return FakeBackend(decks={ str(tmp_path / "deck.pptx"): DECK })
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_get_backend():
+
+    # (1) Setup
+    # None
+
+    # (2) Execute
+    backend = get_backend("fake")
+
+    # (3) Verify
+    assert isinstance(backend, FakeBackend)
+    assert backend.app.latency == 0
+
+    # (4) Teardown
+
+
+def test_object_model_and_calls(backend, tmp_path):
+
+    # (1) Setup
+    pptx = backend.open(str(tmp_path / "deck.pptx"))
+    backend.calls.clear()
+
+    # (2) Execute
+    title = pptx.Slides(1).Shapes("Title 1").TextFrame.TextRange.Text
+    table = pptx.Slides(1).Shapes(2).Table
+    table.Rows.Add()
+    table.Cell(3, 1).Shape.TextFrame.TextRange.Text = "b"
+
+    # (3) Verify
+    assert title == "AB1234 Report"
+    assert pptx.Slides(2).Shapes(1).HasTextFrame != MSOTRUE
+    assert table.Rows.Count == 3
+    assert table.Cell(3, 1).Shape.TextFrame.TextRange.Text == "b"
+    assert backend.calls["Slides.Item"] == 3
+    assert backend.calls["Table.Cell"] == 2
+    assert backend.calls["TextRange.Text="] == 1
+    with pytest.raises(com_error):
+        pptx.Slides(3)
+    with pytest.raises(com_error):
+        table.Cell(4, 1)
+
+    # (4) Teardown
+
+
+def test_copy_slides_and_save(backend, tmp_path):
+
+    # (1) Setup
+    src_path = str(tmp_path / "src.pptx")
+    make_pptx(src_path, [ [("text", "Title 1", "From file")] ])
+    dst = backend.open(str(tmp_path / "deck.pptx"))
+    src = backend.open(src_path)
+
+    # (2) Execute
+    # Same presentation is duplicated; others inserted from file
+    clone_slide(dst.Slides(2), dst, 1)
+    clone_slide(src.Slides(1), dst, 2)
+    dst.Slides(1).Copy()
+    dst.Slides.Paste(5)
+    dst.SaveAs(str(tmp_path / "out.pptx"))
+    saved = FakeBackend().open(str(tmp_path / "out.pptx"))
+
+    # (3) Verify
+    assert [ slide.Name for slide in saved.Slides ] == ["Body", "", "Cover", "Body", "Body"]
+    assert saved.Slides(2).Shapes("Title 1").TextFrame.TextRange.Text == "From file"
+    assert saved.Slides(3).Shapes(2).Table.Cell(2, 2).Shape.TextFrame.TextRange.Text == "1"
+
+    # (4) Teardown
+
+
+def test_latency(tmp_path):
+
+    # (1) Setup
+    backend = FakeBackend(latency=0.01, decks={ str(tmp_path / "deck.pptx"): DECK })
+    pptx = backend.open(str(tmp_path / "deck.pptx"))
+
+    # (2) Execute
+    start = time.perf_counter()
+    for _ in range(5):
+        pptx.Slides(1)
+    elapsed = time.perf_counter() - start
+
+    # (3) Verify
+    assert elapsed >= 0.05
+
+    # (4) Teardown
@@ -0,0 +1,89 @@
+import pytest
+
+import ibis
+
+
+"""
+Tests for the memory-mapped IBIS parser
+"""
+
+
+IBS = """[IBIS Ver]   5.0
+|-------------------------------------------
+[Component]  ABC123_SOC
+[Manufacturer] ACME
+[Package]
+| variable  typ   min   max
+R_pkg       0.1   0.05  0.2
+[Pin]  signal_name  model_name  R_pin  L_pin  C_pin
+| Data lanes
+A1     DQ0          DQ_40OHM    0.1    1nH    1pF
+A2     DQ1          DQ_40OHM
+B1     VDD          POWER
+[Model]  DQ_40OHM
+Model_type  I/O   | bidirectional
+C_comp      1pF   0.8pF  1.2pF
+[Pulldown]
+| Voltage  I(typ)  I(min)  I(max)
+-1.8       -10mA   -9mA    -11mA
+[Model Selector]  DQ_SEL
+DQ_40OHM   40 ohm drive
+DQ_60OHM   60 ohm drive
+[End]
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def ibs_path(tmp_path):
+    # (1) Setup
+    path = tmp_path / "soc.ibs"
+    path.write_text(IBS)
+    return str(path)
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_parse_ibis(ibs_path):
+
+    # (1) Setup
+    # None
+
+    # (2) Execute
+    ibs = ibis.load(ibs_path)
+
+    # (3) Verify
+    assert list(ibs.components) == ["ABC123_SOC"]
+    assert ibs.components["ABC123_SOC"].pins["A1"] == ("DQ0", "DQ_40OHM")
+    assert ibs.models == { "DQ_40OHM": "I/O" }
+    assert ibs.selectors["DQ_SEL"] == ["DQ_40OHM", "DQ_60OHM"]
+    # Parsed files are reused
+    assert ibis.load(ibs_path) is ibs
+
+    # (4) Teardown
+
+
+def test_buffer_model(ibs_path):
+
+    # (1) Setup
+    ibs = ibis.load(ibs_path)
+
+    # (2) Execute
+    by_signal = ibs.buffer_model(" dq1", part_name="ABC123")
+    by_pin = ibs.buffer_model(pin_name="B1")
+    missing = ibs.buffer_model("DQ7")
+    other_part = ibs.buffer_model("DQ1", part_name="GHI789")
+
+    # (3) Verify
+    assert by_signal == "DQ_40OHM"
+    assert by_pin == "POWER"
+    assert missing == ""
+    # Not the model of another component of the file
+    assert other_part == ""
+
+    # (4) Teardown
@@ -0,0 +1,133 @@
+import os
+import pytest
+
+import images
+from synth import _png
+from images import ImageDir, image_size, spread, fit, scale_images, warn_unscaled
+
+
+"""
+Tests for matching images to slides and scaling them to their boxes
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def image_dir(tmp_path):
+    """
+    Returns path to a directory of images named by interface and signal,
+    in files and folders alike
+    """
+    # (1) Setup
+    root = tmp_path / "images"
+    (root / "DDR4" / "DQ1").mkdir(parents=True)
+    (root / "DDR4_DQ0_eye.png").write_bytes(_png(40, 30))
+    (root / "DDR4_DQ10_eye.png").write_bytes(_png(40, 30))
+    (root / "DDR4" / "DQ1" / "eye.png").write_bytes(_png(40, 30))
+    (root / "DDR4_DQ0_notes.txt").write_text("")
+    return str(root)
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_match(image_dir):
+
+    # (1) Setup
+    index = ImageDir(image_dir)
+
+    # (2) Execute
+    dq0 = index.match(["DDR4", "DQ0"])
+    dq1 = index.match(["ddr4", "dq1"])
+
+    # (3) Verify
+    assert len(index) == 3
+    assert dq0 == [ os.path.join(image_dir, "DDR4_DQ0_eye.png") ]
+    assert dq1 == [ os.path.join(image_dir, "DDR4", "DQ1", "eye.png") ]
+    assert index.match(["DDR4", "DQ"]) == []
+    assert index.match(["LPDDR4", "DQ0"]) == []
+    assert len(index.match(["DDR4"])) == 3
+
+    # (4) Teardown
+
+
+def test_image_size(tmp_path, monkeypatch):
+
+    # (1) Setup
+    monkeypatch.setattr(images, "Image", None)
+    png = tmp_path / "a.png"
+    png.write_bytes(_png(64, 48))
+    gif = tmp_path / "b.gif"
+    gif.write_bytes(b"GIF89a" + (32).to_bytes(2, "little") + (16).to_bytes(2, "little") + b"\x00" * 16)
+    other = tmp_path / "c.png"
+    other.write_bytes(b"not an image")
+
+    # (2) Execute
+    sizes = [ image_size(str(path)) for path in [ png, gif, other ] ]
+
+    # (3) Verify
+    assert sizes == [ (64, 48), (32, 16), None ]
+
+    # (4) Teardown
+
+
+def test_spread_and_fit():
+
+    # (1) Setup
+    boxes = [ (0, 0, 300, 100), (0, 200, 300, 100) ]
+
+    # (2) Execute
+    placed = spread(["a", "b", "c"], boxes)
+
+    # (3) Verify
+    # Two images side by side in the first box, one in the second
+    assert placed == [ ("a", (0, 0, 150, 100)), ("b", (150, 0, 150, 100)), ("c", (0, 200, 300, 100)) ]
+    assert fit((0, 0, 300, 100), (400, 200)) == (50, 0, 200, 100)
+    assert fit((0, 0, 300, 100), None) == (0, 0, 300, 100)
+
+    # (4) Teardown
+
+
+def test_scale_images_without_pillow(image_dir, tmp_path, monkeypatch):
+
+    # (1) Setup
+    monkeypatch.setattr(images, "Image", None)
+    path = os.path.join(image_dir, "DDR4_DQ0_eye.png")
+
+    # (2) Execute
+    scaled = scale_images([ (path, (10, 10)) ], str(tmp_path / "cache"))
+
+    # (3) Verify
+    assert scaled == [ path ]
+    # Warned up front only if images are to be placed (e.g. -i given)
+    assert warn_unscaled([ image_dir ])
+    assert not warn_unscaled([ "" ])
+
+    # (4) Teardown
+
+
+def test_scale_images_cached(image_dir, tmp_path):
+
+    # (1) Setup
+    pytest.importorskip("PIL")
+    cache_dir = str(tmp_path / "cache")
+    path = os.path.join(image_dir, "DDR4_DQ0_eye.png")
+    jobs = [ (path, (20, 20)), (path, (80, 80)) ]
+
+    # (2) Execute
+    scaled = scale_images(jobs, cache_dir, workers=1)
+    mtimes = [ os.stat(p).st_mtime_ns for p in scaled ]
+    again = scale_images(jobs, cache_dir, workers=1)
+
+    # (3) Verify
+    # Downsampled to fit the first box; already small enough for the second
+    assert image_size(scaled[0]) == (20, 15)
+    assert image_size(scaled[1]) == (40, 30)
+    assert again == scaled
+    assert [ os.stat(p).st_mtime_ns for p in again ] == mtimes
+
+    # (4) Teardown
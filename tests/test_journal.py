@@ -0,0 +1,120 @@
+import pytest
+
+from journal import WriteJournal
+from reports import Report
+from backends.fake import FakeBackend, read_deck
+
+
+"""
+Tests for WriteJournal and the deferred writes of reports
+"""
+
+
+DECK = {
+    "slides": [
+        { "name": "Results", "shapes": [
+            { "name": "Title 1", "text": "<INTERFACE> Results" },
+            { "name": "Table 1", "table": [ ["Signal", "PVT"], ["-", "-"], ["-", "-"] ] },
+        ] },
+        { "name": "Template", "shapes": [ { "name": "Title 1", "text": "<SIGNAL>" } ] },
+    ]
+}
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def backend(tmp_path):
+    # (1) Setup
+    return FakeBackend(decks={ str(tmp_path / "deck.pptx"): DECK })
+
+
+@pytest.fixture
+def report(backend, tmp_path):
+    # (1) Setup
+    report = Report(backend.open(str(tmp_path / "deck.pptx")))
+    backend.calls.clear()
+    return report
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_superseded_and_dropped():
+
+    # (1) Setup
+    journal = WriteJournal()
+    shape, table = object(), object()
+
+    # (2) Execute
+    journal.set_text(1, 1, shape, "Same", old="Same")
+    journal.set_cell(1, 2, table, 2, 1, "DQ0")
+    journal.set_cell(1, 2, table, 2, 1, "DQ1")
+    journal.set_text(2, 1, shape, "New", old="Old")
+    journal.set_text(2, 1, shape, "Old")
+
+    # (3) Verify
+    # Only the last write to a target is kept, and none that leaves it as it was
+    assert journal.pending() == [ (1, 2, 2, 1, "DQ1") ]
+    assert journal.text(1, 2, 2, 1) == "DQ1"
+    assert journal.text(2, 1) is None
+    counts = journal.counts
+    assert (counts["recorded"], counts["dropped"], counts["superseded"]) == (5, 2, 2)
+
+    # (4) Teardown
+
+
+def test_applied_on_flush(report, backend, tmp_path):
+
+    # (1) Setup
+    slide = report.pptx.Slides(1)
+    shapes = report.shape_index(slide)
+    (title, text), = shapes.texts()
+    table = shapes.table()
+
+    # (2) Execute
+    shapes.set_text(title, text.replace("<INTERFACE>", "DDR"))
+    for row in (2, 3):
+        shapes.set_cell(table, row, 1, "DQ0") # Superseded
+        shapes.set_cell(table, row, 1, f"DQ{row - 2}")
+    written = backend.calls["TextRange.Text="]
+    report._apply_writes()
+
+    # (3) Verify
+    assert written == 0
+    assert backend.calls["TextRange.Text="] == 3
+    assert shapes.texts()[0][1] == "DDR Results"
+    assert [ change[1:] for change in report.journal.changes() ] == [ (1, 0, 0, "DDR Results"), (2, 2, 1, "DQ0"), (2, 3, 1, "DQ1") ]
+    report.pptx.SaveAs(str(tmp_path / "out.pptx"))
+    results = read_deck(str(tmp_path / "out.pptx"))["slides"][0]["shapes"]
+    assert results[0]["text"] == "DDR Results"
+    assert results[1]["table"] == [ ["Signal", "PVT"], ["DQ0", "-"], ["DQ1", "-"] ]
+
+    # (4) Teardown
+
+
+def test_clone_and_delete(report, tmp_path):
+
+    # (1) Setup
+    template = report.pptx.Slides(2)
+    shapes = report.shape_index(template)
+    (title, _), = shapes.texts()
+    shapes.set_text(title, "DQ0")
+
+    # (2) Execute
+    report._clone_slide(template, 3)
+    shapes.set_text(title, "DQ1")
+    report._delete_slide(2)
+    report._apply_writes()
+
+    # (3) Verify
+    # Copies take on the writes made so far; those to deleted slides are never made
+    assert len(report.journal) == 0
+    report.pptx.SaveAs(str(tmp_path / "out.pptx"))
+    slides = read_deck(str(tmp_path / "out.pptx"))["slides"]
+    assert [ slide["shapes"][0]["text"] for slide in slides ] == ["<INTERFACE> Results", "DQ0"]
+
+    # (4) Teardown
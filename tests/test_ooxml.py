@@ -0,0 +1,357 @@
+import pytest
+import hashlib
+import zipfile
+from xml.sax.saxutils import escape
+
+from backends import get_backend, clone_slide, copy_presentation
+from backends.ooxml import OOXMLBackend, RT_SLIDE_LAYOUT
+from util import MSOTRUE, com_error
+
+
+"""
+Tests for the native OOXML backend,
+which run without PowerPoint on any platform.
+Decks are generated into a temporary directory.
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  HELPERS
+# //////////////////////
+
+P_NS = 'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" ' \
+       'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" ' \
+       'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+RT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+CT = "application/vnd.openxmlformats-officedocument.presentationml."
+
+
+def _text_shape(i, name, text):
+    paras = "".join(f"<a:p><a:r><a:t>{escape(line)}</a:t></a:r></a:p>" for line in text.split("\n"))
+    return f'<p:sp><p:nvSpPr><p:cNvPr id="{i}" name="{name}"/><p:cNvSpPr/><p:nvPr/></p:nvSpPr>' \
+           f'<p:spPr/><p:txBody><a:bodyPr/><a:lstStyle/>{paras}</p:txBody></p:sp>'
+
+
+def _table_shape(i, name, rows):
+    grid = "".join('<a:gridCol w="100"/>' for _ in rows[0])
+    trs = "".join("<a:tr h=\"10\">" + "".join(
+        f"<a:tc><a:txBody><a:bodyPr/><a:lstStyle/><a:p><a:r><a:t>{escape(c)}</a:t></a:r></a:p></a:txBody><a:tcPr/></a:tc>"
+        for c in row) + "</a:tr>" for row in rows)
+    return f'<p:graphicFrame><p:nvGraphicFramePr><p:cNvPr id="{i}" name="{name}"/><p:cNvGraphicFramePr/><p:nvPr/>' \
+           f'</p:nvGraphicFramePr><p:xfrm><a:off x="0" y="0"/><a:ext cx="127000" cy="254000"/></p:xfrm>' \
+           f'<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/table">' \
+           f'<a:tbl><a:tblGrid>{grid}</a:tblGrid>{trs}</a:tbl></a:graphicData></a:graphic></p:graphicFrame>'
+
+
+def make_pptx(path, slides, layout_name="Title Only"):
+    """
+    Writes a minimal .pptx where slides is a list of shape lists,
+    each shape being ("text", name, text) or ("table", name, rows)
+    """
+    with zipfile.ZipFile(path, "w") as z:
+        overrides = "".join(f'<Override PartName="/ppt/slides/slide{i}.xml" ContentType="{CT}slide+xml"/>'
+                            for i in range(1, len(slides) + 1))
+        z.writestr("[Content_Types].xml",
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Default Extension="png" ContentType="image/png"/>'
+            f'<Override PartName="/ppt/presentation.xml" ContentType="{CT}presentation.main+xml"/>'
+            f'<Override PartName="/ppt/slideMasters/slideMaster1.xml" ContentType="{CT}slideMaster+xml"/>'
+            f'<Override PartName="/ppt/slideLayouts/slideLayout1.xml" ContentType="{CT}slideLayout+xml"/>'
+            f'{overrides}</Types>')
+        z.writestr("_rels/.rels", f'<Relationships xmlns="{REL_NS}">'
+            f'<Relationship Id="rId1" Type="{RT}officeDocument" Target="ppt/presentation.xml"/></Relationships>')
+        sld_ids = "".join(f'<p:sldId id="{255 + i}" r:id="rId{i + 1}"/>' for i in range(1, len(slides) + 1))
+        z.writestr("ppt/presentation.xml", f'<p:presentation {P_NS}><p:sldMasterIdLst>'
+            f'<p:sldMasterId id="2147483648" r:id="rId1"/></p:sldMasterIdLst>'
+            f'<p:sldIdLst>{sld_ids}</p:sldIdLst></p:presentation>')
+        rels = "".join(f'<Relationship Id="rId{i + 1}" Type="{RT}slide" Target="slides/slide{i}.xml"/>'
+                       for i in range(1, len(slides) + 1))
+        z.writestr("ppt/_rels/presentation.xml.rels", f'<Relationships xmlns="{REL_NS}">'
+            f'<Relationship Id="rId1" Type="{RT}slideMaster" Target="slideMasters/slideMaster1.xml"/>{rels}</Relationships>')
+        z.writestr("ppt/slideMasters/slideMaster1.xml", f'<p:sldMaster {P_NS}><p:cSld><p:spTree/></p:cSld>'
+            f'<p:sldLayoutIdLst><p:sldLayoutId id="2147483649" r:id="rId1"/></p:sldLayoutIdLst></p:sldMaster>')
+        z.writestr("ppt/slideMasters/_rels/slideMaster1.xml.rels", f'<Relationships xmlns="{REL_NS}">'
+            f'<Relationship Id="rId1" Type="{RT}slideLayout" Target="../slideLayouts/slideLayout1.xml"/></Relationships>')
+        z.writestr("ppt/slideLayouts/slideLayout1.xml",
+            f'<p:sldLayout {P_NS}><p:cSld name="{layout_name}"><p:spTree/></p:cSld></p:sldLayout>')
+        z.writestr("ppt/slideLayouts/_rels/slideLayout1.xml.rels", f'<Relationships xmlns="{REL_NS}">'
+            f'<Relationship Id="rId1" Type="{RT}slideMaster" Target="../slideMasters/slideMaster1.xml"/></Relationships>')
+        z.writestr("ppt/media/image1.png", b"\x89PNG fake")
+        for i, shapes in enumerate(slides, start=1):
+            tree = ""
+            for j, (kind, name, content) in enumerate(shapes, start=2):
+                tree += _text_shape(j, name, content) if kind == "text" else _table_shape(j, name, content)
+            z.writestr(f"ppt/slides/slide{i}.xml", f'<p:sld {P_NS}><p:cSld><p:spTree>'
+                f'<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+                f'{tree}</p:spTree></p:cSld></p:sld>')
+            z.writestr(f"ppt/slides/_rels/slide{i}.xml.rels", f'<Relationships xmlns="{REL_NS}">'
+                f'<Relationship Id="rId1" Type="{RT}slideLayout" Target="../slideLayouts/slideLayout1.xml"/>'
+                f'<Relationship Id="rId2" Type="{RT}image" Target="../media/image1.png"/></Relationships>')
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def deck(tmp_path):
+    """
+    Returns path to a two-slide deck
+    """
+    # (1) Setup
+    path = tmp_path / "AB1234_test_si_deck.pptx"
+    make_pptx(str(path), [
+        [ ("text", "Rectangle 26", "AB1234\nTitle") ],
+        [ ("text", "Title 1", "Target & Condition: DDR"),
+          ("table", "Table 3", [ ["Signal Group", "Frequency"], ["DQ: DQ0", "800 MHz"] ]) ],
+    ])
+    return str(path)
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_get_backend():
+
+    # (1) Setup
+    # None
+
+    # (2) Execute
+    backend = get_backend("ooxml")
+
+    # (3) Verify
+    assert isinstance(backend, OOXMLBackend)
+    with pytest.raises(ValueError):
+        get_backend("keynote")
+
+    # (4) Teardown
+
+
+def test_read_object_model(deck):
+
+    # (1) Setup
+    pptx = OOXMLBackend().open(deck)
+
+    # (2) Execute
+    title = pptx.Slides(1).Shapes("Rectangle 26").TextFrame.TextRange.Text
+    shapes = list(pptx.Slides(2).Shapes)
+    table = shapes[1].Table
+
+    # (3) Verify
+    assert pptx.Name == "AB1234_test_si_deck.pptx"
+    assert len(pptx.Slides) == 2
+    assert title == "AB1234\rTitle"
+    assert shapes[0].HasTextFrame == MSOTRUE and not shapes[0].HasTable == MSOTRUE
+    assert table.Cell(2, 1).Shape.TextFrame.TextRange.Text == "DQ: DQ0"
+    assert (len(table.Rows), len(table.Columns)) == (2, 2)
+    assert table.Parent.HasTable == MSOTRUE
+    # Reading past the last row raises like COM does
+    with pytest.raises(com_error):
+        table.Cell(3, 1)
+
+    # (4) Teardown
+    pptx.Close()
+
+
+def test_write_and_save(deck, tmp_path):
+
+    # (1) Setup
+    backend = OOXMLBackend()
+    pptx = backend.open(deck)
+    out = str(tmp_path / "out.pptx")
+
+    # (2) Execute
+    pptx.Slides(1).Shapes(1).TextFrame.TextRange.Text = "New\rTitle"
+    table = pptx.Slides(2).Shapes(2).Table
+    table.Rows.Add()
+    table.Cell(3, 2).Shape.TextFrame.TextRange.Text = "1 GHz"
+    pptx.Slides(2).Copy()
+    pptx.Slides.Paste(1)
+    pptx.SaveAs(out)
+    reopened = backend.open(out)
+
+    # (3) Verify
+    assert len(reopened.Slides) == 3
+    assert reopened.Slides(2).Shapes(1).TextFrame.TextRange.Text == "New\rTitle"
+    assert reopened.Slides(1).Shapes(2).Table.Cell(3, 2).Shape.TextFrame.TextRange.Text == "1 GHz"
+
+    # (4) Teardown
+    reopened.Close()
+
+
+def test_paste_across_presentations(deck, tmp_path):
+
+    # (1) Setup
+    backend = OOXMLBackend()
+    src = backend.open(deck)
+    other = str(tmp_path / "other.pptx")
+    make_pptx(other, [ [ ("text", "Title 1", "Other") ] ], layout_name="Blank")
+    dst = backend.open(other)
+    out = str(tmp_path / "out.pptx")
+
+    # (2) Execute
+    src.Slides(2).Copy()
+    dst.Slides.Paste()
+    dst.SaveAs(out)
+    with zipfile.ZipFile(out) as z:
+        names = z.namelist()
+        slide_rels = z.read("ppt/slides/_rels/slide2.xml.rels").decode("utf-8")
+
+    # (3) Verify
+    # Layout missing from the destination was imported along with the media,
+    # the copy of which is dropped as the destination holds the same image
+    assert "ppt/slideLayouts/slideLayout2.xml" in names
+    assert "ppt/media/image2.png" not in names
+    assert "../media/image1.png" in slide_rels
+    assert backend.open(out).Slides(2).Shapes("Table 3").Table.Cell(1, 1).Shape.TextFrame.TextRange.Text == "Signal Group"
+
+    # (4) Teardown
+
+
+def test_clone_slide(deck, tmp_path):
+
+    # (1) Setup
+    backend = OOXMLBackend()
+    src = backend.open(deck)
+    other = str(tmp_path / "other.pptx")
+    make_pptx(other, [ [ ("text", "Title 1", "Other") ] ])
+    dst = backend.open(other)
+
+    # (2) Execute
+    cover = clone_slide(src.Slides(1), dst, 1)
+    copy = clone_slide(dst.Slides(2), dst)
+
+    # (3) Verify
+    # Nothing was placed on the clipboard
+    assert backend.clipboard is None
+    assert cover.SlideIndex == 1 and copy.SlideIndex == 3
+    assert [ s.Shapes(1).TextFrame.TextRange.Text for s in dst.Slides ] == ["AB1234\rTitle", "Other", "Other"]
+    # Same-named layout is reused rather than imported
+    assert cover.part.related(RT_SLIDE_LAYOUT)[0] is dst.Slides(2).part.related(RT_SLIDE_LAYOUT)[0]
+
+    # (4) Teardown
+
+
+def test_lazy_loading(deck):
+
+    # (1) Setup
+    pptx = OOXMLBackend().open(deck)
+    parts = pptx.package.parts
+
+    # (2) Execute
+    text = pptx.Slides(2).Shapes(1).TextFrame.TextRange.Text
+
+    # (3) Verify
+    # Only the slide read (and the presentation listing it) has been read
+    assert text == "Target & Condition: DDR"
+    slides = sorted(name for name, part in parts.items() if name.startswith("/ppt/slides/") and part.is_loaded)
+    assert slides == [ "/ppt/slides/slide2.xml" ]
+    assert not parts["/ppt/slideLayouts/slideLayout1.xml"].is_loaded
+
+    # (4) Teardown
+    pptx.Close()
+
+
+def test_save_in_place(deck):
+
+    # (1) Setup
+    backend = OOXMLBackend()
+    pptx = backend.open(deck)
+
+    # (2) Execute
+    pptx.Slides(2).Shapes(1).TextFrame.TextRange.Text = "Target & Condition: LPDDR"
+    pptx.Save()
+    pptx.Close()
+    reopened = backend.open(deck)
+
+    # (3) Verify
+    # Parts never read are written back as they were
+    assert len(reopened.Slides) == 2
+    assert reopened.Slides(1).Shapes(1).TextFrame.TextRange.Text == "AB1234\rTitle"
+    assert reopened.Slides(2).Shapes(1).TextFrame.TextRange.Text == "Target & Condition: LPDDR"
+
+    # (4) Teardown
+    reopened.Close()
+
+
+def test_save_dedupes_media(deck, tmp_path):
+
+    # (1) Setup
+    backend = OOXMLBackend()
+    src = backend.open(deck)
+    dst = backend.open(deck)
+    out = str(tmp_path / "out.pptx")
+
+    # (2) Execute
+    # Copies of a slide imported one at a time each bring a copy of the media of its layout
+    for _ in range(3):
+        clone_slide(src.Slides(2), dst)
+    dropped = dst.package._dedupe_media()
+    dst.SaveAs(out)
+
+    # (3) Verify
+    assert dropped > 0
+    with zipfile.ZipFile(out) as z:
+        assert z.testzip() is None
+        assert [ name for name in z.namelist() if name.startswith("ppt/media/") ] == [ "ppt/media/image1.png" ]
+    reopened = backend.open(out)
+    assert len(reopened.Slides) == 5
+    assert reopened.Slides(5).Shapes("Table 3").Table.Cell(2, 1).Shape.TextFrame.TextRange.Text == "DQ: DQ0"
+
+    # (4) Teardown
+    reopened.Close()
+
+
+def test_copy_presentation(deck, tmp_path):
+
+    # (1) Setup
+    backend = OOXMLBackend()
+    pptx = backend.open(deck)
+    out = str(tmp_path / "out.pptx")
+
+    # (2) Execute
+    copy = copy_presentation(pptx)
+    copy.Slides(2).Shapes(1).TextFrame.TextRange.Text = "Target & Condition: LPDDR"
+    copy.Slides(1).Delete()
+    copy.SaveAs(out)
+    reopened = backend.open(out)
+
+    # (3) Verify
+    # The copy is built on without changing the presentation copied
+    assert copy.FullName != pptx.FullName
+    assert len(pptx.Slides) == 2
+    assert pptx.Slides(2).Shapes(1).TextFrame.TextRange.Text == "Target & Condition: DDR"
+    assert len(reopened.Slides) == 1
+    assert reopened.Slides(1).Shapes(1).TextFrame.TextRange.Text == "Target & Condition: LPDDR"
+
+    # (4) Teardown
+    reopened.Close()
+    copy.Close()
+    pptx.Close()
+
+
+def test_save_hashes_media_once(deck, tmp_path, monkeypatch):
+
+    # (1) Setup
+    backend = OOXMLBackend()
+    pptx = backend.open(deck)
+    out = str(tmp_path / "out.pptx")
+    hashed = []
+    sha1 = hashlib.sha1
+    monkeypatch.setattr(hashlib, "sha1", lambda blob=b"": hashed.append(len(blob)) or sha1(blob))
+
+    # (2) Execute
+    pptx.SaveAs(out)
+
+    # (3) Verify
+    # Digests taken when deduplicating media key their compression too
+    with zipfile.ZipFile(out) as z:
+        binary = [ info.file_size for info in z.infolist() if not info.filename.endswith((".xml", ".rels")) ]
+    assert binary and sorted(hashed) == sorted(binary)
+
+    # (4) Teardown
+    pptx.Close()
@@ -0,0 +1,75 @@
+import threading
+import pytest
+
+from pipeline import prefetch
+
+
+"""
+Tests for the stages of the streaming pipeline
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_prefetch_order_and_depth():
+
+    # (1) Setup
+    computed = []
+    def square(x):
+        computed.append(x)
+        return x * x
+
+    # (2) Execute
+    stage = prefetch(range(10), square, depth=2)
+    first = next(stage)
+    # Give the stage time to fill its queue
+    for _ in range(50):
+        if len(computed) >= 4:
+            break
+        threading.Event().wait(0.01)
+    ahead = len(computed)
+    rest = list(stage)
+
+    # (3) Verify
+    assert [ first ] + rest == [ x * x for x in range(10) ]
+    # One consumed, two queued and one waiting for room at most
+    assert ahead <= 4
+
+    # (4) Teardown
+
+
+def test_prefetch_raises_in_consumer():
+
+    # (1) Setup
+    def fail(x):
+        if x == 2:
+            raise ValueError("bad item")
+        return x
+
+    # (2) Execute
+    results = []
+    with pytest.raises(ValueError, match="bad item"):
+        for result in prefetch(range(5), fail):
+            results.append(result)
+
+    # (3) Verify
+    assert results == [ 0, 1 ]
+
+    # (4) Teardown
+
+
+def test_prefetch_stops_when_closed():
+
+    # (1) Setup
+    stage = prefetch(iter(range(1000)), lambda x: x, depth=1, name="test-stage")
+
+    # (2) Execute
+    assert next(stage) == 0
+    stage.close()
+
+    # (3) Verify
+    assert not any(thread.name == "test-stage" for thread in threading.enumerate())
+
+    # (4) Teardown
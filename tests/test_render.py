@@ -0,0 +1,149 @@
+import pytest
+
+import synth
+import render
+from render import RenderPlan, substitute
+from backends import clone_slide
+from backends.fake import FakeBackend, read_deck
+
+
+"""
+Tests for render plans of templates
+"""
+
+
+DECK = {
+    "slides": [
+        { "name": "Cover", "shapes": [ { "name": "Title 1", "text": "No placeholders" } ] },
+        { "name": "Signal", "shapes": [
+            { "name": "Title 1", "text": "<SIGNAL> Eye Diagram" },
+            { "name": "TextBox 2", "text": "<INTERFACE> at <FREQ> (<UNKNOWN>)" },
+            { "name": "Table 1", "table": [ ["Item", "<SIGNAL>"], ["Frequency", "<FREQ>"], ["Note", "-"] ] },
+        ] },
+    ]
+}
+VALUES = { "<INTERFACE>": "DDR", "<SIGNAL>": "DQ0", "<FREQ>": "800 MHz" }
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def template(tmp_path, cache_dir, monkeypatch):
+    # (1) Setup
+    monkeypatch.setattr(render, "_plans", {})
+    path = str(tmp_path / "template.pptx")
+    synth.write_pptx(path, DECK)
+    return path
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_substitute():
+
+    # (1) Setup
+    text = "<INTERFACE>: <SIGNAL> at <FREQ> <INTERFACE> <i> <UNKNOWN>"
+
+    # (2) Execute
+    new_text = substitute(text, dict(VALUES, **{ "<i>": "1" }))
+
+    # (3) Verify
+    # Every placeholder is replaced, not only the first or last
+    assert new_text == "DDR: DQ0 at 800 MHz DDR 1 <UNKNOWN>"
+
+    # (4) Teardown
+
+
+def test_compile(template):
+
+    # (1) Setup
+    pptx = FakeBackend().open(template)
+
+    # (2) Execute
+    plan = RenderPlan.compile(pptx)
+
+    # (3) Verify
+    slide_id = pptx.Slides(2).SlideID
+    assert plan.slide_ids == [ slide_id ]
+    assert plan.tokens(slide_id) == { "<SIGNAL>", "<INTERFACE>", "<FREQ>", "<UNKNOWN>" }
+
+    # (4) Teardown
+
+
+def test_render_writes_only(template, tmp_path):
+
+    # (1) Setup
+    backend = FakeBackend()
+    pptx = backend.open(template)
+    plan = RenderPlan.of(pptx)
+    slide = pptx.Slides(2)
+    copy = clone_slide(slide, pptx)
+    backend.calls.clear()
+
+    # (2) Execute
+    written = plan.render(copy, VALUES, slide.SlideID)
+
+    # (3) Verify
+    assert written == 4
+    assert backend.calls["TextRange.Text="] == 4
+    assert backend.calls["TextRange.Text"] == 0
+    pptx.SaveAs(str(tmp_path / "out.pptx"))
+    shapes = read_deck(str(tmp_path / "out.pptx"))["slides"][2]["shapes"]
+    assert [ shape.get("text") for shape in shapes[:2] ] == ["DQ0 Eye Diagram", "DDR at 800 MHz (<UNKNOWN>)"]
+    assert shapes[2]["table"] == [ ["Item", "DQ0"], ["Frequency", "800 MHz"], ["Note", "-"] ]
+
+    # (4) Teardown
+
+
+def test_render_by_name(template, tmp_path):
+
+    # (1) Setup
+    backend = FakeBackend()
+    pptx = backend.open(template)
+    plan = RenderPlan.of(pptx)
+    slide = pptx.Slides(2)
+    copy = clone_slide(slide, pptx)
+    plan.render(copy, VALUES, slide.SlideID)
+    # Edited by hand since: the title removed, shifting the shapes after it
+    copy.Shapes("Title 1").Delete()
+    copy.Shapes(1).TextFrame.TextRange.Text = "Edited"
+
+    # (2) Execute
+    written = plan.render(copy, dict(VALUES, **{ "<SIGNAL>": "DQ1" }), slide.SlideID, by_name=True)
+
+    # (3) Verify
+    # Shapes are written by name, the one no longer there skipped
+    assert written == 3
+    pptx.SaveAs(str(tmp_path / "out.pptx"))
+    shapes = read_deck(str(tmp_path / "out.pptx"))["slides"][2]["shapes"]
+    assert [ shape["name"] for shape in shapes ] == ["TextBox 2", "Table 1"]
+    assert shapes[0]["text"] == "DDR at 800 MHz (<UNKNOWN>)"
+    assert shapes[1]["table"] == [ ["Item", "DQ1"], ["Frequency", "800 MHz"], ["Note", "-"] ]
+
+    # (4) Teardown
+
+
+def test_plan_cached_by_contents(template, tmp_path, monkeypatch):
+
+    # (1) Setup
+    copy = str(tmp_path / "copy.pptx")
+    with open(template, "rb") as src, open(copy, "wb") as dst:
+        dst.write(src.read())
+    plan = RenderPlan.of(FakeBackend().open(template))
+    monkeypatch.setattr(render, "_plans", {})
+
+    def compile_(cls, pptx):
+        raise AssertionError("Compiled again")
+    monkeypatch.setattr(RenderPlan, "compile", classmethod(compile_))
+
+    # (2) Execute
+    cached = RenderPlan.of(FakeBackend().open(copy))
+
+    # (3) Verify
+    assert cached.slide_ids == plan.slide_ids
+    assert cached.tokens(cached.slide_ids[0]) == plan.tokens(plan.slide_ids[0])
+
+    # (4) Teardown
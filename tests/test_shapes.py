@@ -0,0 +1,148 @@
+import pytest
+
+from shapes import ShapeIndex
+from reports import Report
+from backends.fake import FakeBackend
+
+
+"""
+Tests for ShapeIndex and the per-slide indexes of reports
+"""
+
+
+DECK = {
+    "slides": [
+        { "name": "Interface", "shapes": [
+            { "name": "Title 1", "text": "Target & Condition: DDR" },
+            { "name": "Picture 1" },
+            { "name": "Table 1", "table": [ ["Signal Group", "Frequency"], ["DQ: DQ0", "800 MHz"] ] },
+            { "name": "Table 2", "table": [ ["Reference", "Type"], ["U1", "SoC"] ] },
+            { "name": "Note 1", "text": "<INTERFACE> results" },
+        ] },
+        { "name": "Spare", "shapes": [ { "name": "Title 1", "text": "Spare" } ] },
+    ]
+}
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def backend(tmp_path):
+    # (1) Setup
+    return FakeBackend(decks={ str(tmp_path / "deck.pptx"): DECK })
+
+
+@pytest.fixture
+def pptx(backend, tmp_path):
+    # (1) Setup
+    pptx = backend.open(str(tmp_path / "deck.pptx"))
+    backend.calls.clear()
+    yield pptx
+
+    # (4) Teardown
+    pptx.Close()
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_lookups(pptx):
+
+    # (1) Setup
+    shapes = ShapeIndex(pptx.Slides(1).Shapes)
+
+    # (2) Execute
+    table = shapes.table("Reference")
+    texts = shapes.texts()
+
+    # (3) Verify
+    assert table.Cell(2, 1).Shape.TextFrame.TextRange.Text == "U1"
+    assert shapes.table().Cell(1, 1).Shape.TextFrame.TextRange.Text == "Signal Group"
+    assert shapes.table("Item") is None
+    assert [ header for header, _ in shapes.tables(headers=True) ] == ["Signal Group", "Reference"]
+    assert [ text for _, text in texts ] == ["Target & Condition: DDR", "<INTERFACE> results"]
+    assert shapes.shape("Note 1") is texts[1][0]
+    assert shapes.shape("Missing") is None
+    assert ShapeIndex.of(shapes) is shapes
+
+    # (4) Teardown
+
+
+def test_reads_once(pptx, backend):
+
+    # (1) Setup
+    shapes = ShapeIndex(pptx.Slides(1).Shapes)
+    shapes.tables(headers=True)
+    shapes.texts()
+    shapes.shape("Note 1")
+    backend.calls.clear()
+
+    # (2) Execute
+    shapes.table("Signal Group")
+    shapes.table("Reference")
+    shapes.tables()
+    shapes.texts()
+    shapes.shape("Title 1")
+
+    # (3) Verify
+    assert sum(backend.calls.values()) == 0
+
+    # (4) Teardown
+
+
+def test_stops_at_first_match(pptx, backend):
+
+    # (1) Setup
+    shapes = ShapeIndex(pptx.Slides(1).Shapes)
+
+    # (2) Execute
+    shapes.table()
+
+    # (3) Verify
+    # Only shapes up to the first table are probed
+    assert backend.calls["Shape.HasTable"] == 3
+    assert backend.calls["Shape.HasTextFrame"] == 0
+
+    # (4) Teardown
+
+
+def test_set_text(pptx):
+
+    # (1) Setup
+    shapes = ShapeIndex(pptx.Slides(1).Shapes)
+    note, text = shapes.texts()[1]
+
+    # (2) Execute
+    shapes.set_text(note, text.replace("<INTERFACE>", "DDR"))
+
+    # (3) Verify
+    assert shapes.texts()[1][1] == "DDR results"
+    assert note.TextFrame.TextRange.Text == "DDR results"
+
+    # (4) Teardown
+
+
+def test_report_shape_index(pptx, backend):
+
+    # (1) Setup
+    report = Report(pptx)
+    shapes = report.shape_index(pptx.Slides(1))
+    shapes.texts()
+    spare = report.shape_index(pptx.Slides(2))
+    backend.calls.clear()
+
+    # (2) Execute
+    same = report.shape_index(pptx.Slides(1))
+    same.texts()
+    report._delete_slide(2)
+
+    # (3) Verify
+    assert same is shapes
+    assert backend.calls["Shape.HasTextFrame"] == 0
+    assert len(pptx.Slides) == 1
+    assert spare is not shapes
+
+    # (4) Teardown
@@ -0,0 +1,79 @@
+import os
+import pytest
+
+from simdir import SimDirIndex
+
+
+"""
+Tests for the persistent index of a simulation directory
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def sim_dir(tmp_path):
+    """
+    Returns path to a simulation directory with IBIS files
+    directly in a signal folder and one level deeper
+    """
+    # (1) Setup
+    root = tmp_path / "sim"
+    (root / "DDR" / "DQ0").mkdir(parents=True)
+    (root / "DDR" / "DQ0" / "soc.ibs").write_text("")
+    (root / "DDR" / "DQ0" / "readme.txt").write_text("")
+    (root / "DDR" / "DQ1" / "v2").mkdir(parents=True)
+    (root / "DDR" / "DQ1" / "v2" / "dram.ibs").write_text("")
+    return str(root)
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_ibis_files(sim_dir, tmp_path):
+
+    # (1) Setup
+    index = SimDirIndex(sim_dir, str(tmp_path / "cache"))
+
+    # (2) Execute
+    dq0 = index.ibis_files("ddr", " DQ0")
+    dq1 = index.ibis_files("DDR", "DQ1")
+
+    # (3) Verify
+    assert dq0 == [ os.path.join(sim_dir, "DDR", "DQ0", "soc.ibs") ]
+    assert dq1 == [ os.path.join(sim_dir, "DDR", "DQ1", "v2", "dram.ibs") ]
+    assert not index.has_signal("DDR", "DQ2")
+    assert index.ibis_files("PCIE", "TX0") == []
+
+    # (4) Teardown
+
+
+def test_cached_index_skips_walks(sim_dir, tmp_path, monkeypatch):
+
+    # (1) Setup
+    cache_dir = str(tmp_path / "cache")
+    index = SimDirIndex(sim_dir, cache_dir)
+    index.ibis_files("DDR", "DQ0")
+    index.save()
+
+    def no_scandir(path):
+        raise AssertionError(f"Unexpected walk of {path}")
+
+    # (2) Execute
+    monkeypatch.setattr(os, "scandir", no_scandir)
+    cached = SimDirIndex(sim_dir, cache_dir).ibis_files("DDR", "DQ1")
+    monkeypatch.undo()
+
+    # Adding a file changes the mtime of the signal folder
+    os.utime(os.path.join(sim_dir, "DDR", "DQ0"), ns=(0, 0))
+    open(os.path.join(sim_dir, "DDR", "DQ0", "new.ibs"), "w").close()
+    refreshed = SimDirIndex(sim_dir, cache_dir).ibis_files("DDR", "DQ0")
+
+    # (3) Verify
+    assert [ os.path.basename(path) for path in cached ] == ["dram.ibs"]
+    assert [ os.path.basename(path) for path in refreshed ] == ["new.ibs", "soc.ibs"]
+
+    # (4) Teardown
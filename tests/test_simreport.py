@@ -0,0 +1,120 @@
+import os
+import pytest
+
+import synth
+from util import Interface
+from reports.sim import SIReport, PIReport
+from reports.simreport import IMAGE_NAME
+from backends.fake import FakeBackend
+
+
+"""
+Tests for report parameters given in advance
+and for placing images on the slides of reports
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+class _Pptx():
+    """
+    Records calls of a Presentation used when saving
+    """
+    def __init__(self):
+        self.saved = []
+
+    def SaveAs(self, path):
+        self.saved.append(path)
+        open(path, "w").close()
+
+    def Close(self):
+        pass
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_filename_pattern():
+
+    # (1) Setup
+    params = { "date": "2020-01-01", "filename": "{proj_num}_{date}" }
+
+    # (2) Execute
+    pi = PIReport(_Pptx(), "AB1234", { "date": "today" })
+    si = SIReport(_Pptx(), Interface("ddr"), "AB1234", params)
+
+    # (3) Verify
+    assert pi._make_filename() == "AB1234_PI.pptx"
+    assert si._make_filename() == "AB1234_2020-01-01_DDR.pptx"
+    with pytest.raises(ValueError):
+        PIReport(_Pptx(), "AB1234", { "filename": "{project}" })._make_filename()
+    with pytest.raises(ValueError):
+        PIReport(_Pptx(), "AB1234", { "if_exists": "ask" })
+
+    # (4) Teardown
+
+
+@pytest.mark.parametrize("policy, expected", [
+    ("rename", ["AB1234_PI.pptx", "AB1234_PI_1.pptx"]),
+    ("overwrite", ["AB1234_PI.pptx", "AB1234_PI.pptx"]),
+    ("skip", ["AB1234_PI.pptx"]),
+])
+def test_if_exists(tmp_path, policy, expected):
+
+    # (1) Setup
+    params = { "date": "2020-01-01", "output_dir": str(tmp_path), "if_exists": policy }
+    pptx = _Pptx()
+
+    # (2) Execute
+    for _ in range(2):
+        PIReport(pptx, "AB1234", params)._save_report()
+
+    # (3) Verify
+    assert [ os.path.basename(path) for path in pptx.saved ] == expected
+
+    # (4) Teardown
+
+
+def test_if_exists_error(tmp_path):
+
+    # (1) Setup
+    params = { "date": "2020-01-01", "output_dir": str(tmp_path), "if_exists": "error" }
+    PIReport(_Pptx(), "AB1234", params)._save_report()
+
+    # (2) Execute / (3) Verify
+    with pytest.raises(FileExistsError):
+        PIReport(_Pptx(), "AB1234", params)._save_report()
+
+    # (4) Teardown
+
+
+def test_place_images_forgets_shape_index(tmp_path, cache_dir):
+
+    # (1) Setup
+    path = str(tmp_path / "report.pptx")
+    synth.write_pptx(path, { "slides": [ { "name": "weaver:signal:0:DQ0", "shapes": [
+        { "name": "Title 1", "text": "DQ0 Eye Diagram" },
+        { "name": "TextBox 2", "text": "<IMAGE>", "left": 20, "top": 150, "width": 680, "height": 140 } ] } ] })
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / "DDR_DQ0_eye.png").write_bytes(synth._png(40, 30))
+    rep = SIReport(FakeBackend().open(path), Interface("DDR"), "AB1234", { "image_dir": str(tmp_path / "images") })
+    slide = rep.pptx.Slides(1)
+    scanned = rep.shape_index(slide)
+    assert len(list(scanned)) == 2
+
+    # (2) Execute
+    rep._place_images()
+    placed = rep.shape_index(slide)
+    rep._place_images() # Again, as when updating: the image placed before is replaced
+
+    # (3) Verify
+    # Shapes added (and deleted) are seen by lookups made after images are placed
+    assert placed is not scanned
+    assert placed.shape(IMAGE_NAME) is not None
+    assert rep.shape_index(slide) is not placed
+    assert [ shape.Name for shape in slide.Shapes ].count(IMAGE_NAME) == 1
+
+    # (4) Teardown
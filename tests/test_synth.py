@@ -0,0 +1,308 @@
+import os
+import pytest
+
+import synth
+import render
+import images
+import weaver
+import backends
+from backends.fake import FakeBackend, read_deck
+from builds import BUILD_LOG
+from backends.ooxml import OOXMLBackend
+
+
+"""
+End-to-end tests weaving reports from synthetic confirmation tools
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+@pytest.mark.parametrize("rep_type, expected_reports, expected_slides", [
+    ("si", ["AB1234_SI_IF0.pptx", "AB1234_SI_IF1.pptx"],
+     [ "results:IF0", "signal: DQ0", "signal: DQ1", "signal: DQ2" ]),
+    ("pi", ["AB1234_PI.pptx"],
+     [ "analysis:dc", "analysis:ac", "analysis:imp" ] +
+     [ f"result:{analysis} analysis|VDD_{i}" for i in range(3) for analysis in ["dc drop", "ac drop", "impedance"] ]),
+    ("emc", ["AB1234_EMC.pptx"],
+     [ "analysis:power resonance" ] + [ f"{role}:VDD_{i}" for role in ["result", "appendix"] for i in range(3) ]),
+])
+@pytest.mark.parametrize("backend_name", ["ooxml", "fake"])
+def test_weave_synthetic(tmp_path, cache_dir, monkeypatch, rep_type, expected_reports, expected_slides, backend_name):
+
+    # (1) Setup
+    paths = synth.generate(str(tmp_path / "decks"), rep_type, interfaces=2, signals=3, power_nets=3)
+    monkeypatch.setenv("TEMP_PATH", paths["templates"])
+    params = { "date": "2020-01-01", "output_dir": str(tmp_path / "out") }
+
+    # (2) Execute
+    saved = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], backend_name, params)
+
+    # (3) Verify
+    assert [ os.path.basename(path) for path in saved ] == expected_reports
+    cover = read_deck(saved[0])["slides"][0]
+    assert cover["shapes"][0]["text"].startswith("AB1234")
+    assert cover["shapes"][1]["text"] == "01 Jan. 2020"
+    # Every slide made by Weaver is there, once, and filled in;
+    # image boxes are left for images to be placed by hand when no image directory is given
+    slides = read_deck(saved[0])["slides"]
+    owned = [ slide["name"] for slide in slides if slide["name"].startswith("weaver:") ]
+    assert [ ":".join([ role, key ]) for _, role, _, key in (name.split(":", 3) for name in owned) ] == expected_slides
+    texts = [ shape.get("text", "") for slide in slides for shape in slide["shapes"] ] + \
+            [ cell for slide in slides for shape in slide["shapes"] for row in shape.get("table", []) for cell in row ]
+    assert [ text for text in texts if render.PLACEHOLDER.search(text) and text != images.IMAGE_PLACEHOLDER ] == []
+
+    # (4) Teardown
+
+
+def test_fake_counts_calls(tmp_path, cache_dir, monkeypatch):
+
+    # (1) Setup
+    paths = synth.generate(str(tmp_path / "decks"), "si", interfaces=1, signals=2)
+    monkeypatch.setenv("TEMP_PATH", paths["templates"])
+    backend = FakeBackend()
+    monkeypatch.setattr(weaver, "get_backend", lambda name="": backend)
+
+    # (2) Execute
+    weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], "fake",
+                         { "date": "2020-01-01", "output_dir": str(tmp_path / "out") })
+
+    # (3) Verify
+    assert backend.calls["Table.Cell"] > 0
+    assert backend.calls["Presentation.SaveAs"] == 1
+
+    # (4) Teardown
+
+
+@pytest.mark.parametrize("backend_name", ["ooxml", "fake"])
+def test_workers(tmp_path, cache_dir, monkeypatch, backend_name):
+
+    # (1) Setup
+    paths = synth.generate(str(tmp_path / "decks"), "si", interfaces=3, signals=2)
+    monkeypatch.setenv("TEMP_PATH", paths["templates"])
+    params = { "date": "2020-01-01", "output_dir": str(tmp_path / "seq") }
+    sequential = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], backend_name, params)
+
+    # (2) Execute
+    params = { "date": "2020-01-01", "output_dir": str(tmp_path / "par") }
+    parallel = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], backend_name, params, workers=2)
+
+    # (3) Verify
+    # Reports built in worker processes, one per interface, match those built in this one
+    assert [ os.path.basename(path) for path in parallel ] == [ os.path.basename(path) for path in sequential ]
+    for seq_path, par_path in zip(sequential, parallel):
+        assert [ slide["name"] for slide in read_deck(par_path)["slides"] ] == \
+               [ slide["name"] for slide in read_deck(seq_path)["slides"] ]
+    # PowerPoint, shared by all processes, builds one report at a time
+    assert backends.max_workers(4, "com") == 1
+    assert backends.max_workers(4, backend_name) == 4
+
+    # (4) Teardown
+
+
+@pytest.mark.parametrize("workers", [ 1, 2 ])
+def test_incremental(tmp_path, cache_dir, monkeypatch, workers):
+
+    # (1) Setup
+    paths = synth.generate(str(tmp_path / "decks"), "si", interfaces=2, signals=2)
+    monkeypatch.setenv("TEMP_PATH", paths["templates"])
+    # Default if_exists policy (rename), not applied to stale reports saved to the same file again
+    params = { "date": "2020-01-01", "output_dir": str(tmp_path / "out") }
+    # Written as it is after editing below, so that only the edit tells the two apart
+    deck = read_deck(paths["conf_tools"])
+    synth.write_pptx(paths["conf_tools"], deck)
+    saved = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], "ooxml", params, workers, incremental=True)
+    mtimes = [ os.stat(path).st_mtime_ns for path in saved ]
+
+    # Edit the simulation target slide of the second interface only
+    slide_num = next(i for i, slide in enumerate(deck["slides"], start=1)
+                     if any("IF1" in shape.get("text", "") for shape in slide["shapes"]))
+    table = next(shape for shape in deck["slides"][slide_num - 1]["shapes"] if "table" in shape)["table"]
+    table[1][1] = "1600 MHz"
+    synth.write_pptx(paths["conf_tools"], deck)
+
+    # (2) Execute
+    rerun = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], "ooxml", params, workers, incremental=True)
+    again = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], "ooxml", params, workers, incremental=True)
+
+    # (3) Verify
+    # Only the report of the edited interface is built again
+    assert sorted(rerun) == sorted(saved) == sorted(again)
+    assert os.stat(saved[0]).st_mtime_ns == mtimes[0]
+    assert os.stat(saved[1]).st_mtime_ns != mtimes[1]
+    assert os.stat(saved[1]).st_mtime_ns == os.stat(rerun[0]).st_mtime_ns
+    # The stale report is replaced rather than saved alongside (e.g. as _1.pptx)
+    assert sorted(os.listdir(params["output_dir"])) == sorted([ os.path.basename(path) for path in saved ]
+                                                              + [ BUILD_LOG ])
+
+    # (4) Teardown
+
+
+@pytest.mark.parametrize("if_exists, expected_names", [ ("skip", []), ("rename", [ "AB1234_SI_IF0_final_1.pptx" ]),
+                                                       ("error", None) ])
+def test_incremental_renamed(tmp_path, cache_dir, monkeypatch, if_exists, expected_names):
+
+    # (1) Setup
+    paths = synth.generate(str(tmp_path / "decks"), "si", interfaces=1, signals=2)
+    monkeypatch.setenv("TEMP_PATH", paths["templates"])
+    params = { "date": "2020-01-01", "output_dir": str(tmp_path / "out") }
+    saved = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], "ooxml", params, incremental=True)
+    mtime = os.stat(saved[0]).st_mtime_ns
+    # Filename pattern changed, to that of a file made by hand
+    params = dict(params, filename="{proj_num}_{type}_{interface}_final.pptx", if_exists=if_exists)
+    manual_path = os.path.join(params["output_dir"], "AB1234_SI_IF0_final.pptx")
+    with open(manual_path, "wb") as f:
+        f.write(b"manual")
+
+    # (2) Execute
+    if expected_names is None:
+        with pytest.raises(FileExistsError):
+            weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], "ooxml", params, incremental=True)
+        rerun = None
+    else:
+        rerun = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], "ooxml", params, incremental=True)
+
+    # (3) Verify
+    # The report is saved to the new filename under the if_exists policy,
+    # leaving both the report built before and the file made by hand as they are
+    if rerun is not None:
+        assert [ os.path.basename(path) for path in rerun ] == expected_names
+    assert os.stat(saved[0]).st_mtime_ns == mtime
+    with open(manual_path, "rb") as f:
+        assert f.read() == b"manual"
+
+    # (4) Teardown
+
+
+@pytest.mark.parametrize("rep_type, header, owned_count", [ ("si", "Signal Group", 3), ("emc", "Power Net", 5),
+                                                           ("pi", "Power Net", 9) ])
+def test_update(tmp_path, cache_dir, monkeypatch, rep_type, header, owned_count):
+
+    # (1) Setup
+    paths = synth.generate(str(tmp_path / "decks"), rep_type, interfaces=1, signals=3, power_nets=3)
+    monkeypatch.setenv("TEMP_PATH", paths["templates"])
+    params = { "date": "2020-01-01", "output_dir": str(tmp_path / "out") }
+    deck = read_deck(paths["conf_tools"])
+    table = next(shape["table"] for slide in deck["slides"] for shape in slide["shapes"]
+                 if shape.get("table", [[""]])[0][0] == header)
+    # PI reports are built before impedance analysis is marked for any power net
+    marks = [ row[5] for row in table[1:] ] if rep_type == "pi" else []
+    for row in table[1:len(marks) + 1]:
+        row[5] = ""
+    synth.write_pptx(paths["conf_tools"], deck)
+    saved = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], "ooxml", params)
+
+    # Edit the report by hand...
+    pptx = OOXMLBackend().open(saved[0])
+    pptx.Slides(2).Shapes(1).TextFrame.TextRange.Text = "Revision History (edited)"
+    pptx.Save()
+    pptx.Close()
+    # ...and remove the second signal (power net) from the confirmation tools
+    for row, mark in zip(table[1:], marks):
+        row[5] = mark
+    removed = table.pop(2)[0].split(":")[-1]
+    synth.write_pptx(paths["conf_tools"], deck)
+
+    # (2) Execute
+    updated = weaver.update_reports(paths["conf_tools"], saved, paths["sim_dir"], "ooxml", params)
+
+    # (3) Verify
+    assert updated == saved
+    slides = read_deck(saved[0])["slides"]
+    assert slides[1]["shapes"][0]["text"] == "Revision History (edited)"
+    owned = [ slide["name"] for slide in slides if slide["name"].startswith("weaver:") ]
+    assert len(owned) == owned_count
+    assert not any(name.endswith(removed) for name in owned)
+    # Impedance analysis marked since the build has its result slides
+    assert len([ name for name in owned if ":result:" in name and "impedance" in name ]) == (2 if marks else 0)
+    texts = [ shape.get("text", "") for slide in slides for shape in slide["shapes"] ][4:]
+    if rep_type == "pi":
+        # Topologies and targets of the power nets are copied from the confirmation tools, left as they are
+        texts = [ shape.get("text", "") for slide in slides if slide["name"].startswith("weaver:")
+                  for shape in slide["shapes"] ]
+    assert not any(removed in text for text in texts)
+
+    # (4) Teardown
+
+
+def test_update_edited(tmp_path, cache_dir, monkeypatch):
+
+    # (1) Setup
+    paths = synth.generate(str(tmp_path / "decks"), "si", interfaces=1, signals=2)
+    monkeypatch.setenv("TEMP_PATH", paths["templates"])
+    params = { "date": "2020-01-01", "output_dir": str(tmp_path / "out") }
+    saved = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], "ooxml", params)
+    deck = read_deck(paths["conf_tools"])
+    table = next(shape["table"] for slide in deck["slides"] for shape in slide["shapes"]
+                 if shape.get("table", [[""]])[0][0] == "Signal Group")
+
+    def set_frequency(freq):
+        for row in table[1:]:
+            row[1] = freq
+        synth.write_pptx(paths["conf_tools"], deck)
+
+    def signal_texts():
+        return [ { shape["name"]: shape.get("text") or shape.get("table") for shape in slide["shapes"] }
+                 for slide in read_deck(saved[0])["slides"] if slide["name"].startswith("weaver:signal:") ]
+
+    # Edit a text Weaver rendered on the slide of the first signal by hand...
+    pptx = OOXMLBackend().open(saved[0])
+    slide = next(slide for slide in pptx.Slides if slide.Name.startswith("weaver:signal:"))
+    next(shape for shape in slide.Shapes if shape.Name == "TextBox 2").TextFrame.TextRange.Text = "Edited by hand"
+    pptx.Save()
+    pptx.Close()
+    # ...and change the frequency in the confirmation tools
+    set_frequency("1600 MHz")
+
+    # (2) Execute
+    weaver.update_reports(paths["conf_tools"], saved, paths["sim_dir"], "ooxml", params)
+    updated = signal_texts()
+    # Without a build log, nothing tells the texts rendered from those edited since
+    os.remove(os.path.join(params["output_dir"], BUILD_LOG))
+    set_frequency("2400 MHz")
+    weaver.update_reports(paths["conf_tools"], saved, paths["sim_dir"], "ooxml", params)
+    unrecorded = signal_texts()
+
+    # (3) Verify
+    # The edited text is left as it is, while the others (as rendered) are rewritten
+    assert updated[0]["TextBox 2"] == "Edited by hand"
+    assert updated[1]["TextBox 2"] == "IF0 at 1600 MHz"
+    assert updated[0]["Table 4"][1][1] == updated[1]["Table 4"][1][1] == "1600 MHz"
+    assert unrecorded == updated
+
+    # (4) Teardown
+
+
+@pytest.mark.parametrize("backend_name", ["ooxml", "fake"])
+def test_images(tmp_path, cache_dir, monkeypatch, backend_name):
+
+    # (1) Setup
+    paths = synth.generate(str(tmp_path / "decks"), "si", interfaces=1, signals=2)
+    image_dir = synth.make_image_dir(str(tmp_path / "images"), interfaces=2, signals=2)
+    monkeypatch.setenv("TEMP_PATH", paths["templates"])
+    params = { "date": "2020-01-01", "output_dir": str(tmp_path / "out"), "image_dir": image_dir }
+
+    # (2) Execute
+    saved = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], backend_name, params)
+    built = read_deck(saved[0])["slides"]
+    updated = weaver.update_reports(paths["conf_tools"], saved, paths["sim_dir"], backend_name, params)
+
+    # (3) Verify
+    # One image of the interface on each signal slide, in place of the placeholder;
+    # replaced, not added to, on update
+    for slides in [ built, read_deck(updated[0])["slides"] ]:
+        signals = [ slide for slide in slides if slide["name"].startswith("weaver:signal:") ]
+        pictures = [ [ shape for shape in slide["shapes"] if shape["name"] == "weaver:image" ] for slide in signals ]
+        assert [ len(p) for p in pictures ] == [ 1, 1 ]
+        assert not any(shape.get("text") == "<IMAGE>" for slide in signals for shape in slide["shapes"])
+        picture = pictures[0][0]
+        # 4:3 image (give or take a pixel once scaled) fit to the middle of its 680 x 140 pt box
+        assert picture["height"] == pytest.approx(140)
+        assert picture["left"] == pytest.approx(20 + (680 - 140 * 4 / 3) / 2, abs=1)
+        if backend_name == "fake":
+            # Scaled copy in the cache if Pillow is installed
+            assert picture["picture"] == os.path.join(image_dir, "IF0_DQ0_eye.png") or picture["picture"].startswith(cache_dir)
+
+    # (4) Teardown
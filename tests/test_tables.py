@@ -0,0 +1,288 @@
+import pytest
+
+import util
+from tables import TableSnapshot, block_cells, staggered
+from shapes import ShapeIndex
+from reports import PowerNets
+from reports.sim import PIReport
+from backends.fake import FakeBackend
+from backends.ooxml import OOXMLBackend
+from test_ooxml import make_pptx
+
+
+"""
+Tests for TableSnapshot and the readers built upon it,
+and for filling tables in bulk
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+TAR_AND_FREQ = [
+    ["Signal Group", "Frequency", "Transmission Line", "Topology", "PVT"],
+    ["DQ: DQ0", "800 MHz", "U1 ~ U2", "P2P", "SS / FF"],
+    ["DQ: DQ1", "800 MHz", "U1 ~ U3", "P2P", "SS / FF"],
+]
+IC_MODELS = [
+    ["Reference", "Type", "Part", "IC Model"],
+    ["U1", "SoC", "SoC ABC123", "soc.ibs"],
+    ["U2", "DRAM", "DRAM DEF456", "?"],
+    ["U3", "DRAM", "DRAM GHI789", "dram.ibs"],
+]
+PI_POWER_NETS = [
+    ["Power Net", "Reference IC", "Voltage", "DC Drop\rAnalysis", "AC Drop Analysis", "Impedance Analysis",
+     "Acceptable Target Voltage Margin"],
+    ["VDD_CPU", "U1 ~ U3", "0.9V", "○", "○ (U2)", "-", "±3%"],
+    ["", "", "", "", "", "", ""],
+    ["VDD_IO", "U1 ~ U4", "1.8V", "-", "○ (U4)", "○(U4)", "±5%"],
+]
+EMC_POWER_NETS = [
+    ["Net", "Source", "Voltage", "Resonance"],
+    ["VDD_CPU", "U1", "0.9V", u"〇"],
+    ["VDD_IO", "U1", "1.8V", "-"],
+]
+
+
+@pytest.fixture
+def tables(tmp_path):
+    """
+    Returns Table objects of an interface slide opened with the native backend
+    """
+    # (1) Setup
+    path = str(tmp_path / "AB1234_test_si_deck.pptx")
+    make_pptx(path, [ [ ("text", "Title 1", "Target & Condition: DDR"),
+                        ("table", "Table 1", TAR_AND_FREQ),
+                        ("table", "Table 2", IC_MODELS) ] ])
+    pptx = OOXMLBackend().open(path)
+    yield util._get_if_tables(pptx.Slides(1).Shapes)
+
+    # (4) Teardown
+    pptx.Close()
+
+
+class _ComTable():
+    """
+    Stand-in for a COM Table, exposing only per-cell access
+    """
+    class _Count():
+        def __init__(self, count):
+            self.Count = count
+
+    class _Cell():
+        def __init__(self, text):
+            self.Shape = self
+            self.TextFrame = self
+            self.TextRange = self
+            self.Text = text
+
+    def __init__(self, cells):
+        self.__cells = cells
+        self.Rows = self._Count(len(cells))
+        self.Columns = self._Count(len(cells[0]))
+
+    def Cell(self, row, col):
+        return self._Cell(self.__cells[row - 1][col - 1])
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_snapshot_from_com_table():
+
+    # (1) Setup
+    table = _ComTable(IC_MODELS)
+
+    # (2) Execute
+    snapshot = TableSnapshot.from_table(table)
+
+    # (3) Verify
+    assert (snapshot.rows, snapshot.cols) == (4, 4)
+    assert snapshot.column("ic model") == 4
+    assert snapshot.column("IC\rModel") == 4
+    assert snapshot.column("Missing") == 0
+    assert snapshot.get(3, "Part") == "DRAM DEF456"
+    assert [ row for row, _ in snapshot.body() ] == [2, 3, 4]
+    with pytest.raises(IndexError):
+        snapshot.cell(5, 1)
+
+    # (4) Teardown
+
+
+def test_set_signal(tables):
+
+    # (1) Setup
+    tar_and_freq = TableSnapshot.from_table(tables[0])
+    ic_models = util._index_ic_models(TableSnapshot.from_table(tables[1]))
+
+    # (2) Execute
+    signals = [ util._set_signal_devices(s, ic_models) for s in util._set_signal(tar_and_freq) ]
+
+    # (3) Verify
+    assert [ s.name.strip() for s in signals ] == ["DQ0", "DQ1"]
+    # Each row yields its own Signal
+    assert signals[0] is not signals[1]
+    assert signals[0].driver.part_name == "ABC123"
+    assert signals[0].receiver.ibis_model is None
+    assert signals[1].receiver.ibis_model == "dram.ibs"
+    assert signals[1].pvt == ["SS", "FF"]
+    assert ic_models["U3"] == ("GHI789", "dram.ibs")
+
+    # (4) Teardown
+
+
+def test_set_signal_reordered_columns():
+
+    # (1) Setup
+    # Columns of both tables in another order, as edited by hand
+    order = [4, 2, 0, 3, 1]
+    tar_and_freq = TableSnapshot.from_table(_ComTable([ [ row[i] for i in order ] for row in TAR_AND_FREQ ]))
+    ic_models = TableSnapshot.from_table(_ComTable([ [ row[i] for i in [3, 2, 1, 0] ] for row in IC_MODELS ]))
+
+    # (2) Execute
+    index = util._index_ic_models(ic_models)
+    signals = list(util._set_signal(tar_and_freq))
+
+    # (3) Verify
+    assert [ s.name.strip() for s in signals ] == ["DQ0", "DQ1"]
+    assert signals[0].frequency == ("800", "MHz")
+    assert (signals[1].driver.ref_num, signals[1].receiver.ref_num) == ("U1", "U3")
+    assert signals[1].pvt == ["SS", "FF"]
+    assert index["U3"] == ("GHI789", "dram.ibs")
+
+    # (4) Teardown
+
+
+def test_power_nets_by_header():
+
+    # (1) Setup
+    table = TableSnapshot.from_table(_ComTable(PI_POWER_NETS))
+    columns = { "name": "power net", "reference_ic": "reference ic", "voltage": "voltage",
+                "margin": "acceptable target voltage margin" }
+    analyses = { name: name for name in ["dc drop analysis", "ac drop analysis", "impedance analysis"] }
+
+    # (2) Execute
+    power_nets = PowerNets.from_table(table, columns, analyses)
+
+    # (3) Verify
+    # Rows without a net are left out
+    assert power_nets.names() == ["VDD_CPU", "VDD_IO"]
+    cpu = power_nets.get("VDD_CPU")
+    assert (cpu.reference_ic, cpu.voltage, cpu.margin) == ("U1 ~ U3", "0.9V", "±3%")
+    assert cpu.analyses == { "dc drop analysis": "", "ac drop analysis": "U2" }
+    assert power_nets[1].load("impedance analysis") == "U4"
+    assert power_nets.targets("ac drop analysis") == [ cpu, power_nets[1] ]
+    assert power_nets.targets("ac drop analysis", load="U4") == [ power_nets[1] ]
+    assert power_nets.targets("dc drop analysis") == [ cpu ]
+
+    # (4) Teardown
+
+
+def test_power_nets_marks():
+
+    # (1) Setup
+    # Last row is a net too, and either circle marks an analysis
+    table = TableSnapshot.from_table(_ComTable([
+        ["Power Net", "DC Drop Analysis", "AC Drop Analysis", "Impedance Analysis"],
+        ["VDD_CPU", "○", "○", "〇 (U3)"],
+        ["VDD_IO", "〇", "○ (U4)", "-"],
+    ]))
+    analyses = { name: name for name in ["dc drop analysis", "ac drop analysis", "impedance analysis"] }
+
+    # (2) Execute
+    power_nets = PowerNets.from_table(table, { "name": "power net" }, analyses,
+                                      loaded=["ac drop analysis", "impedance analysis"])
+
+    # (3) Verify
+    assert power_nets.names() == ["VDD_CPU", "VDD_IO"]
+    # AC drop and impedance analyses need their load IC
+    assert power_nets[0].analyses == { "dc drop analysis": "", "impedance analysis": "U3" }
+    assert power_nets[1].analyses == { "dc drop analysis": "", "ac drop analysis": "U4" }
+
+    # (4) Teardown
+
+
+def test_power_nets_by_index():
+
+    # (1) Setup
+    table = TableSnapshot.from_table(_ComTable(EMC_POWER_NETS))
+
+    # (2) Execute
+    power_nets = PowerNets.from_table(table, { "name": 1, "voltage": 3 }, { "power resonance": 4 })
+
+    # (3) Verify
+    assert [ (net.name, net.voltage) for net in power_nets ] == [ ("VDD_CPU", "0.9V"), ("VDD_IO", "1.8V") ]
+    assert [ net.name for net in power_nets.targets("power resonance") ] == ["VDD_CPU"]
+    assert len(power_nets) == 2
+
+    # (4) Teardown
+
+
+def test_power_nets_read_once(tmp_path):
+
+    # (1) Setup
+    path = str(tmp_path / "template.pptx")
+    slides = [ { "name": str(i), "shapes": [] } for i in range(6) ] + \
+             [ { "name": "6", "shapes": [ { "name": "Table 1", "table": PI_POWER_NETS } ] } ]
+    backend = FakeBackend(decks={ path: { "slides": slides } })
+    report = PIReport(backend.open(path), "AB1234")
+
+    # (2) Execute
+    names = report.net_names
+    backend.calls.clear()
+    for _ in range(4):
+        power_nets = report.power_nets
+
+    # (3) Verify
+    assert names == ["VDD_CPU", "VDD_IO"]
+    assert power_nets is report.power_nets
+    assert sum(backend.calls.values()) == 0
+
+    # (4) Teardown
+
+
+def test_block_cells():
+
+    # (1) Setup
+    block = staggered(["DQ0", "800 MHz"], ["SS", "FF"]) + [ ["DQ1", None, "SS FF"] ]
+
+    # (2) Execute
+    cells = block_cells(block, 5)
+
+    # (3) Verify
+    assert block[1] == [None, None, "FF"]
+    assert cells == [ (5, 1, "DQ0"), (5, 2, "800 MHz"), (5, 3, "SS"), (6, 3, "FF"), (7, 1, "DQ1"), (7, 3, "SS FF") ]
+
+    # (4) Teardown
+
+
+@pytest.mark.parametrize("native", [False, True])
+def test_fill(tmp_path, native):
+
+    # (1) Setup
+    path = str(tmp_path / "deck.pptx")
+    rows = [ ["Signal", "PVT"], ["", ""] ]
+    if native:
+        make_pptx(path, [ [ ("table", "Table 1", rows) ] ])
+        pptx = OOXMLBackend().open(path)
+    else:
+        backend = FakeBackend(decks={ path: { "slides": [ { "name": "1", "shapes": [ { "name": "Table 1", "table": rows } ] } ] } })
+        pptx = backend.open(path)
+    shapes = ShapeIndex(pptx.Slides(1).Shapes)
+    table = shapes.table()
+
+    # (2) Execute
+    shapes.fill(table, staggered(["DQ0"], ["SS", "FF"]) + [ ["DQ1", "TT"] ], 2)
+
+    # (3) Verify
+    assert TableSnapshot.from_table(table).row(4) == ["DQ1", "TT"]
+    assert [ TableSnapshot.from_table(table).row(row) for row in (2, 3) ] == [ ["DQ0", "SS"], ["", "FF"] ]
+    if not native:
+        # Cells left as they are are not written
+        assert backend.calls["TextRange.Text="] == 5
+        assert backend.calls["Rows.Add"] == 2
+
+    # (4) Teardown
+    pptx.Close()
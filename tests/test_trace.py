@@ -0,0 +1,116 @@
+import json
+import pytest
+
+import synth
+import weaver
+import tracing
+from backends.fake import read_deck
+
+
+"""
+Tests of tracing calls into PowerPoint per build phase
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def no_tracer():
+    # (1) Setup
+    tracing.disable()
+    yield
+    # (4) Teardown
+    tracing.disable()
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_record_histogram():
+
+    # (1) Setup
+    tracer = tracing.Tracer()
+
+    # (2) Execute
+    tracer.record("TextRange.Text", 0.5e-6)
+    tracer.enter("_make_cover")
+    tracer.record("TextRange.Text", 50e-6)
+    tracer.record("TextRange.Text", 2.0)
+    tracer.exit()
+
+    # (3) Verify
+    stats = tracer.to_dict()["phases"]
+    assert stats[tracing.OTHER_PHASE]["TextRange.Text"]["histogram"] == [1, 0, 0, 0, 0, 0, 0]
+    assert stats["_make_cover"]["TextRange.Text"]["histogram"] == [0, 0, 1, 0, 0, 0, 1]
+    assert stats["_make_cover"]["TextRange.Text"]["max_seconds"] == 2.0
+    assert tracer.calls() == 3
+    assert tracer.calls_per_phase() == { tracing.OTHER_PHASE: 1, "_make_cover": 2 }
+
+    # (4) Teardown
+
+
+def test_disabled_returns_backend():
+
+    # (1) Setup
+    backend = object()
+
+    # (2) Execute
+    wrapped = tracing.wrap_backend(backend)
+
+    # (3) Verify
+    assert wrapped is backend
+
+    # (4) Teardown
+
+
+def test_missing_phase(monkeypatch, no_tracer):
+
+    # (1) Setup
+    # A phase renamed (or removed) without updating PHASES
+    monkeypatch.setitem(tracing.PHASES, tracing.SIReport, tracing.PHASES[tracing.SIReport] + ["_fill_nothing"])
+
+    # (2) Execute
+    with pytest.raises(AttributeError, match=r"SIReport\._fill_nothing"):
+        tracing.enable()
+
+    # (3) Verify
+    assert tracing.disable() is None
+
+    # (4) Teardown
+
+
+@pytest.mark.parametrize("rep_type, phase", [
+    ("si", "_fill_results_table"),
+    ("pi", "_fill_analysis_tables"),
+    ("emc", "_fill_analysis_table"),
+])
+@pytest.mark.parametrize("backend_name", ["ooxml", "fake"])
+def test_weave_traced(tmp_path, cache_dir, monkeypatch, no_tracer, rep_type, phase, backend_name):
+
+    # (1) Setup
+    paths = synth.generate(str(tmp_path / "decks"), rep_type, interfaces=2, signals=3, power_nets=3)
+    monkeypatch.setenv("TEMP_PATH", paths["templates"])
+    params = { "date": "2020-01-01", "output_dir": str(tmp_path / "out"), "if_exists": "overwrite" }
+
+    # (2) Execute
+    expected = [ read_deck(path) for path in weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], backend_name, params) ]
+    tracer = tracing.enable()
+    saved = weaver.weave_reports(paths["conf_tools"], paths["sim_dir"], backend_name, params)
+    trace_path = str(tmp_path / "trace.json")
+    tracing.dump(trace_path)
+
+    # (3) Verify
+    # Tracing does not change the reports
+    assert [ read_deck(path) for path in saved ] == expected
+    calls = tracer.calls_per_phase()
+    assert calls[phase] > 0
+    assert calls["_make_cover"] > 0
+    assert calls["_save_report"] > 0
+    with open(trace_path, "r") as f:
+        phases = json.load(f)["phases"]
+    assert phases[tracing.OTHER_PHASE]["Presentations.Open"]["calls"] >= 2
+
+    # (4) Teardown
@@ -0,0 +1,119 @@
+import pytest
+
+import util
+from tables import TableSnapshot
+from simdir import SimDirIndex
+from test_tables import _ComTable, TAR_AND_FREQ, IC_MODELS
+from test_ibis import IBS
+
+
+"""
+Tests for the index of the IC Model table
+and the devices of signals resolved through it
+(and through the simulation directory)
+"""
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FIXTURE DEFINITIONS
+# //////////////////////
+
+@pytest.fixture
+def signals():
+    """
+    Returns Signals of the target and frequency table, devices not yet set
+    """
+    # (1) Setup
+    return list(util._set_signal(TableSnapshot.from_table(_ComTable(TAR_AND_FREQ))))
+
+
+# \\\\\\\\\\\\\\\\\\\\\\
+#  FUNCTIONS
+# //////////////////////
+
+def test_index_ic_models():
+
+    # (1) Setup
+    ic_models = TableSnapshot.from_table(_ComTable(IC_MODELS))
+
+    # (2) Execute
+    index = util._index_ic_models(ic_models)
+
+    # (3) Verify
+    # Part numbers without their type; unknown models ("?") left to the simulation directory
+    assert index == { "U1": ("ABC123", "soc.ibs"), "U2": ("DEF456", None), "U3": ("GHI789", "dram.ibs") }
+
+    # (4) Teardown
+
+
+def test_index_ic_models_duplicate_ref_num():
+
+    # (1) Setup
+    # Same IC listed twice, e.g. once per package variant
+    ic_models = TableSnapshot.from_table(_ComTable(IC_MODELS + [ ["U3", "DRAM", "DRAM JKL012", "dram_b.ibs"] ]))
+
+    # (2) Execute
+    index = util._index_ic_models(ic_models)
+
+    # (3) Verify
+    # Last row wins, as when the table was scanned for every signal
+    assert len(index) == 3
+    assert index["U3"] == ("JKL012", "dram_b.ibs")
+
+    # (4) Teardown
+
+
+def test_index_ic_models_missing_columns():
+
+    # (1) Setup
+    # No IC Model column, and a part without its type
+    ic_models = TableSnapshot.from_table(_ComTable([ ["Reference", "Type", "Part"],
+                                                     ["U1", "SoC", "SoC ABC123"],
+                                                     ["U2", "DRAM", "DEF456"] ]))
+
+    # (2) Execute
+    index = util._index_ic_models(ic_models)
+
+    # (3) Verify
+    assert index == { "U1": ("ABC123", ""), "U2": ("DEF456", "") }
+
+    # (4) Teardown
+
+
+def test_set_signal_devices_unknown_ref_num(signals):
+
+    # (1) Setup
+    # Receiver U3 of the second signal is not in the IC Model table
+    index = util._index_ic_models(TableSnapshot.from_table(_ComTable(IC_MODELS[:3])))
+
+    # (2) Execute
+    signal = util._set_signal_devices(signals[1], index)
+
+    # (3) Verify
+    # Device left as read from the transmission line, to be resolved from the simulation directory
+    assert (signal.driver.part_name, signal.driver.ibis_model) == ("ABC123", "soc.ibs")
+    assert (signal.receiver.ref_num, signal.receiver.part_name, signal.receiver.ibis_model) == ("U3", "", "")
+
+    # (4) Teardown
+
+
+def test_get_buffer_model_part_missing(signals, tmp_path):
+
+    # (1) Setup
+    # Only the SoC (driver) is modelled in the IBIS file of the signal
+    (tmp_path / "sim" / "DDR" / "DQ0").mkdir(parents=True)
+    (tmp_path / "sim" / "DDR" / "DQ0" / "soc.ibs").write_text(IBS)
+    sim_index = SimDirIndex(str(tmp_path / "sim"), str(tmp_path / "cache"))
+    index = util._index_ic_models(TableSnapshot.from_table(_ComTable(IC_MODELS)))
+    signal = util._set_signal_devices(signals[0], index)
+
+    # (2) Execute
+    driver = util._get_buffer_model("DDR", signal, signal.driver, sim_index)
+    receiver = util._get_buffer_model("DDR", signal, signal.receiver, sim_index)
+
+    # (3) Verify
+    # The receiver (DEF456) does not get the model of the driver
+    assert driver == "DQ_40OHM"
+    assert receiver == ""
+
+    # (4) Teardown
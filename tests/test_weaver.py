@@ -1,10 +1,10 @@
 import pytest
 import os
-import win32com.client as win32
+# Drives PowerPoint itself, through COM (Windows only)
+win32 = pytest.importorskip("win32com.client")
 
 from weaver import _load_template_paths, init_reports
-from weaver.reports import ConfirmationTools, SimulationReport
-from weaver import util 
+from weaver.reports import ConfirmationTools
 
 
 """ 
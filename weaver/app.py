@@ -1,8 +1,36 @@
 #!usr/bin/env python
-import argparse, sys
+import argparse, atexit, os, sys
 
-from time import sleep
-from weaver import weave_reports
+from time import perf_counter
+import tracing
+from weaver import weave_reports, update_reports
+from backends import BACKENDS, default_backend, max_workers
+from batch import read_manifest, glob_jobs, run_batch, print_summary
+from daemon import Daemon, SOCKET_PATH, submit, request
+from reports import SimulationReport
+from images import warn_unscaled
+
+# Options that may be given in a config file
+CONFIG_KEYS = ["simulation_dir", "image_dir", "backend", "jobs", "date", "output_dir", "filename", "if_exists"]
+
+
+def _load_config(file_path):
+    """
+    Reads a textfile of key=value lines (e.g. "date=today")
+    and returns dict of the options found.
+    Blank lines and lines starting with # are ignored
+    """
+    config = {}
+    with open(file_path, "r") as f:
+        for line in f.readlines():
+            line = line.strip()
+            if not line or line.startswith("#") or line.find("=") == -1:
+                continue
+            key, val = [ part.strip() for part in line.split("=", 1) ]
+            if key not in CONFIG_KEYS:
+                raise ValueError(f"Unknown option {key} in {file_path}")
+            config[key] = val
+    return config
 
 
 def main():
@@ -24,32 +52,231 @@ def main():
     parser.add_argument("conf_tools", help="Path to confirmation tools for simulation reports")
 
     # Optional args
-    parser.add_argument("-s", "--simulation_dir", nargs=1, help="Path to simulation directory") 
-    # TODO parser.add_argument("-i", "--image_dir", nargs=1, help="Path to directory of images to be included in the report(s)")
+    parser.add_argument("-c", "--config", help="Path to textfile of key=value lines setting defaults of the options below")
+    parser.add_argument("-s", "--simulation_dir", default="", help="Path to simulation directory") 
+    parser.add_argument("-b", "--backend", choices=list(BACKENDS), default=default_backend(),
+                        help="Document backend: PowerPoint via COM (Windows only) or native .pptx (OOXML)")
+    parser.add_argument("-j", "--jobs", type=int, default=1, 
+                        help="Number of SI reports built at once when no prompts are needed (native backends only)")
+    parser.add_argument("-d", "--date", default="", help="Report date as yyyy-MM-dd, or today")
+    parser.add_argument("-o", "--output_dir", default="", help="Directory to save reports in")
+    parser.add_argument("-f", "--filename", default="", 
+                        help="Filename pattern of reports, e.g. {proj_num}_{type}_{interface}.pptx (fields: proj_num, type, interface, date)")
+    parser.add_argument("-e", "--if_exists", choices=SimulationReport.if_exists_policies(), default="rename",
+                        help="What to do if a report of the same name already exists")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only build reports whose inputs changed since last built in the output directory")
+    parser.add_argument("-u", "--update", nargs="+", default=[], metavar="REPORT",
+                        help="Update these reports built from conf_tools in place, rewriting only what Weaver made of them")
+    parser.add_argument("-t", "--trace", nargs="?", const="-", default="",
+                        help="Count and time calls into PowerPoint per build phase; report to stdout, or a .txt/.json file if given")
+    parser.add_argument("-i", "--image_dir", default="", 
+                        help="Path to directory of images (e.g. eye diagrams) placed on the slides matching their filenames")
 
-    # Retrieve args
+    # Retrieve args, with defaults from config file if given
+    args, _ = parser.parse_known_args()
+    if args.config:
+        parser.set_defaults(**_load_config(args.config))
     args = parser.parse_args()   
 
     # Process input from positional args    
     conf_path = args.conf_tools 
 
     # Process input from optional args
-    # img_dir = args.image_dir 
-    sim_dir = args.simulation_dir if args.simulation_dir else ""
+    img_dir = args.image_dir
+    sim_dir = args.simulation_dir
+    params = {
+        "date": args.date,
+        "output_dir": args.output_dir,
+        "filename": args.filename,
+        "if_exists": args.if_exists,
+        "image_dir": img_dir,
+    }
+    warn_unscaled([ img_dir ])
+
+    # Trace calls in this process only, reporting them on exit
+    workers = args.jobs
+    if args.trace:
+        tracing.enable()
+        atexit.register(tracing.dump, args.trace)
+        workers = 1
 
     # Make reports based on inputs and print confirmation
     exit_code = 0
     try:
-        weave_reports(conf_path, sim_dir)
-    except:
+        if args.update:
+            update_reports(conf_path, args.update, sim_dir, args.backend, params)
+        else:
+            weave_reports(conf_path, sim_dir, args.backend, params, workers, incremental=args.incremental)
+    except Exception as e:
+        print(f"ERROR: {type(e).__name__}: {e}")
         exit_code = 1
     
     # Close program
     print()
-    _ = input("Press any key to quit.")
+    # Keep console open only if run interactively
+    if not (args.date and args.output_dir) and sys.stdin.isatty():
+        _ = input("Press any key to quit.")
     print(f"Weaver.py finished with Exit Code: {exit_code}")
     # Success
     sys.exit(exit_code)
 
+
+def batch_main():
+    """
+    Generates reports for many confirmation tools files,
+    listed in a manifest or matched by a glob pattern,
+    and prints a summary of the results
+    """
+    desc = """
+            Weaver.py batch mode takes either:
+                (1) a .csv manifest with the columns
+                    conf_tools, output_dir, date, filename, simulation_dir, if_exists, image_dir
+                (2) a glob pattern of confirmation tools files,
+                    e.g. "projects/**/*_si_*.pptx"
+
+            For more information refer to the README.
+           """
+    parser = argparse.ArgumentParser(description=desc, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    # Positional args
+    parser.add_argument("sources", help="Path to a .csv manifest or glob pattern of confirmation tools")
+
+    # Optional args (defaults for glob patterns)
+    parser.add_argument("-o", "--output_dir", default="", help="Directory to save reports in, one folder per file")
+    parser.add_argument("-d", "--date", default="", help="Report date as yyyy-MM-dd, or today")
+    parser.add_argument("-f", "--filename", default="", help="Filename pattern of reports, e.g. {proj_num}_{type}_{interface}.pptx")
+    parser.add_argument("-e", "--if_exists", choices=SimulationReport.if_exists_policies(), default="rename",
+                        help="What to do if a report of the same name already exists")
+    parser.add_argument("-s", "--simulation_dir", default="", help="Path to simulation directory")
+    parser.add_argument("-i", "--image_dir", default="", help="Path to directory of images placed on the slides matching their filenames")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="Number of files processed at once (native backends only)")
+    parser.add_argument("-b", "--backend", choices=list(BACKENDS), default=default_backend(),
+                        help="Document backend: PowerPoint via COM (Windows only) or native .pptx (OOXML)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only build reports whose inputs changed since last built in their output directory")
+
+    # Retrieve args
+    args = parser.parse_args()
+
+    if args.sources.lower().endswith(".csv") and os.path.isfile(args.sources):
+        jobs = read_manifest(args.sources)
+    else:
+        jobs = glob_jobs(args.sources, args.output_dir, args.date, args.simulation_dir, args.filename, args.if_exists,
+                         args.image_dir)
+    if not jobs:
+        print(f"No confirmation tools found for {args.sources}")
+        sys.exit(1)
+
+    warn_unscaled([ job.get("image_dir", "") for job in jobs ])
+    workers = max_workers(args.jobs, args.backend)
+    print(f"Processing {len(jobs)} confirmation tools with {min(workers, len(jobs))} worker(s)...\n")
+    start = perf_counter()
+    results = run_batch(jobs, workers, args.backend, args.incremental)
+    print_summary(results, perf_counter() - start)
+
+    sys.exit(0 if all(r["ok"] for r in results) else 1)
+
+def daemon_main():
+    """
+    Runs a Weaver daemon, building reports for jobs submitted with weaver-client
+    while keeping the backend and templates loaded between jobs
+    """
+    desc = """
+            Weaver.py daemon keeps the backend (e.g. PowerPoint) and templates loaded
+            and builds the reports of jobs received on a local Unix socket, one at a time.
+            Submit jobs with weaver-client.
+
+            For more information refer to the README.
+           """
+    parser = argparse.ArgumentParser(description=desc, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Path of the socket to listen on")
+    parser.add_argument("-b", "--backend", choices=list(BACKENDS), default=default_backend(),
+                        help="Document backend: PowerPoint via COM (Windows only) or native .pptx (OOXML)")
+    args = parser.parse_args()
+
+    try:
+        Daemon(args.socket, args.backend).serve()
+    except KeyboardInterrupt:
+        pass
+    except (OSError, RuntimeError) as e:
+        print(f"ERROR: {type(e).__name__}: {e}")
+        sys.exit(1)
+
+
+def client_main():
+    """
+    Submits jobs, listed in a manifest or matched by a glob pattern as in batch mode,
+    to a running Weaver daemon and prints a summary of the results
+    """
+    desc = """
+            Weaver.py client submits jobs to a running Weaver.py daemon (weaver-daemon),
+            taking either:
+                (1) a .csv manifest with the columns
+                    conf_tools, output_dir, date, filename, simulation_dir, if_exists, image_dir
+                (2) a glob pattern of confirmation tools files,
+                    e.g. "projects/**/*_si_*.pptx"
+
+            For more information refer to the README.
+           """
+    parser = argparse.ArgumentParser(description=desc, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    # Positional args
+    parser.add_argument("sources", nargs="?", default="", help="Path to a .csv manifest or glob pattern of confirmation tools")
+
+    # Optional args (defaults for glob patterns)
+    parser.add_argument("-o", "--output_dir", default="", help="Directory to save reports in, one folder per file")
+    parser.add_argument("-d", "--date", default="", help="Report date as yyyy-MM-dd, or today")
+    parser.add_argument("-f", "--filename", default="", help="Filename pattern of reports, e.g. {proj_num}_{type}_{interface}.pptx")
+    parser.add_argument("-e", "--if_exists", choices=SimulationReport.if_exists_policies(), default="rename",
+                        help="What to do if a report of the same name already exists")
+    parser.add_argument("-s", "--simulation_dir", default="", help="Path to simulation directory")
+    parser.add_argument("-i", "--image_dir", default="", help="Path to directory of images placed on the slides matching their filenames")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only build reports whose inputs changed since last built in their output directory")
+    parser.add_argument("--socket", default=SOCKET_PATH, help="Path of the socket the daemon listens on")
+    parser.add_argument("--command", choices=["ping", "stats", "shutdown"], 
+                        help="Send a command to the daemon instead of jobs")
+
+    # Retrieve args
+    args = parser.parse_args()
+
+    try:
+        if args.command:
+            reply = request({ "command": args.command }, args.socket)
+            print(", ".join(f"{k}: {v}" for k, v in reply.items()))
+            sys.exit(0 if reply["ok"] else 1)
+
+        if args.sources.lower().endswith(".csv") and os.path.isfile(args.sources):
+            jobs = read_manifest(args.sources)
+        else:
+            jobs = glob_jobs(args.sources, args.output_dir, args.date, args.simulation_dir, args.filename, args.if_exists,
+                             args.image_dir)
+        if not jobs:
+            print(f"No confirmation tools found for {args.sources}")
+            sys.exit(1)
+
+        # The daemon resolves paths against its own working directory
+        for job in jobs:
+            for field in ["conf_tools", "output_dir", "simulation_dir", "image_dir"]:
+                if job[field]:
+                    job[field] = os.path.abspath(job[field])
+
+        print(f"Submitting {len(jobs)} confirmation tools to the daemon at {args.socket}...\n")
+        start = perf_counter()
+        results = []
+        for result in submit([ dict(job, command="job", incremental=args.incremental) for job in jobs ], args.socket):
+            # Requests rejected by the daemon carry only an error
+            results.append({ "reports": [], "seconds": 0.0, "error": "", **result,
+                             "conf_tools": jobs[len(results)]["conf_tools"] })
+            status = "OK" if result["ok"] else "FAILED"
+            print(f"[{len(results)}/{len(jobs)}] {status}: {results[-1]['conf_tools']}")
+    except OSError as e:
+        print(f"ERROR: No daemon reachable at {args.socket} ({e})")
+        sys.exit(1)
+
+    print_summary(results, perf_counter() - start)
+    sys.exit(0 if all(r["ok"] for r in results) else 1)
+
 # if __name__ == "__main__":
 #     main()
\ No newline at end of file
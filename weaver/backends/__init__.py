@@ -0,0 +1,64 @@
+import sys
+
+from .base import Backend
+from .com import ComBackend, clone_slide as _com_clone_slide
+from .ooxml import OOXMLBackend
+from .fake import FakeBackend
+
+BACKENDS = {
+    ComBackend.name: ComBackend,
+    OOXMLBackend.name: OOXMLBackend,
+    FakeBackend.name: FakeBackend,
+}
+
+
+def default_backend():
+    """
+    Returns name of the backend used when none is specified
+    """
+    return ComBackend.name if sys.platform == "win32" else OOXMLBackend.name
+
+
+def get_backend(name=""):
+    """
+    Instantiates and returns the Backend registered under name
+    """
+    name = name or default_backend()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def max_workers(workers, name=""):
+    """
+    Returns number of processes to build in with the backend registered under name,
+    at most workers: one for backends that cannot be driven by several processes at once
+    """
+    backend = BACKENDS.get(name or default_backend())
+    if workers > 1 and backend is not None and not backend.concurrent:
+        print(f"The {backend.name} backend builds one report at a time; ignoring {workers} workers.")
+        return 1
+    return workers
+
+
+def clone_slide(slide, pptx, index=""):
+    """
+    Copies slide into pptx at index (appending if omitted)
+    along with its layout, media and relationships,
+    without using the system clipboard. Returns the new slide
+    """
+    # Native object models provide their own implementation
+    clone = getattr(pptx.Slides, "clone", None)
+    if clone:
+        return clone(slide, index)
+    return _com_clone_slide(slide, pptx, index)
+
+
+def copy_presentation(pptx):
+    """
+    Returns a copy of the open presentation pptx, leaving pptx as it is,
+    or None if its object model cannot make one (e.g. PowerPoint, which edits presentations in place)
+    """
+    # Native object models hold presentations in memory
+    copy = getattr(pptx, "copy", None)
+    return copy() if copy else None
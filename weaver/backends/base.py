@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+
+
+class Backend(ABC):
+    """
+    Base class for document backends;
+    a backend opens presentations exposing the subset of the
+    PowerPoint object model used by Report and its subclasses
+    """
+    name = ""
+    # Processes may each drive a backend of their own at once (see backends.max_workers)
+    concurrent = True
+
+    @abstractmethod
+    def open(self, path, with_window=True):
+        """
+        Opens the presentation at path and returns its Presentation object
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def quit(self):
+        """
+        Releases any resources (e.g. processes) held by the backend
+        """
+        raise NotImplementedError
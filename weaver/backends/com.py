@@ -0,0 +1,49 @@
+from .base import Backend
+
+
+class ComBackend(Backend):
+    """
+    Backend driving a PowerPoint process via win32com (Windows only)
+    """
+    name = "com"
+    # PowerPoint is a single instance shared between processes
+    concurrent = False
+
+    def __init__(self):
+        # Imported here so that other backends work without pywin32
+        import win32com.client as win32
+        self.__app = win32.Dispatch("PowerPoint.Application")
+
+    @property
+    def app(self):
+        """
+        Returns the PowerPoint.Application COM Object
+        """
+        return self.__app
+
+    def open(self, path, with_window=True):
+        return self.__app.Presentations.Open(path, WithWindow=with_window)
+
+    def quit(self):
+        # PowerPoint is a single instance shared between processes;
+        # leave it running while others still have presentations open
+        if self.__app.Presentations.Count == 0:
+            self.__app.Quit()
+
+
+def clone_slide(slide, pptx, index=""):
+    """
+    Copies a Slide COM Object into pptx at index without the clipboard.
+    Slides within the same presentation are duplicated; 
+    otherwise, the slide is inserted from the source file,
+    which must therefore be saved, and takes on the destination's design
+    """
+    count = pptx.Slides.Count
+    index = count + 1 if index in ("", None) else min(max(int(index), 1), count + 1)
+    src = slide.Parent
+    if src.FullName == pptx.FullName:
+        # Duplicate is placed right after the source slide
+        slide.Duplicate().MoveTo(index)
+    else:
+        pptx.Slides.InsertFromFile(src.FullName, index - 1, slide.SlideIndex, slide.SlideIndex)
+    return pptx.Slides(index)
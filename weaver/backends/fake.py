@@ -0,0 +1,602 @@
+import os
+import copy
+import time
+import pickle
+import zipfile
+from collections import Counter
+
+from .base import Backend
+from util import MSOTRUE, com_error
+
+# \\\\\\\\\\\\\\\\\\\\\\\\\\\\\\
+# *** GLOBAL CONSTANTS ****
+# //////////////////////////////
+
+MSOFALSE = 0
+# Milliseconds each call into the fake PowerPoint takes, unless given to FakeBackend
+LATENCY_ENV = "WEAVER_FAKE_LATENCY"
+FIRST_SLIDE_ID = 256
+
+
+# =======================
+# -- Helper Functions --
+# =======================
+
+def _out_of_range(collection, index):
+    return com_error(f"{collection}({index}): The index into the specified collection is out of bounds.")
+
+
+def _read_pptx(path):
+    """
+    Reads slides, shapes, texts and tables of a .pptx file into a deck spec
+    """
+    # Imported here, as only needed to load real decks
+    from .ooxml import OOXMLBackend
+
+    pptx = OOXMLBackend().open(path)
+    slides = []
+    for slide in pptx.Slides:
+        shapes = []
+        for shape in slide.Shapes:
+            spec = {
+                "name": shape.Name,
+                "left": shape.Left,
+                "top": shape.Top,
+                "width": shape.Width,
+                "height": shape.Height,
+            }
+            if shape.HasTable == MSOTRUE:
+                spec["table"] = shape.Table.read_all()
+            elif shape.HasTextFrame == MSOTRUE:
+                spec["text"] = shape.TextFrame.TextRange.Text
+            shapes.append(spec)
+        slides.append({ "name": slide.Name, "shapes": shapes })
+    pptx.Close()
+    return { "slides": slides }
+
+
+def read_deck(path):
+    """
+    Returns deck spec of a .pptx file or of a deck saved by the fake PowerPoint.
+
+    A deck spec is a dict of the form
+        { "slides": [ { "name": str, "shapes": [ shape, ... ] }, ... ] }
+    where each shape is a dict with a "name", optional "left", "top", "width"
+    and "height" in points, and either "text" (str), "table" (list of rows of str),
+    "picture" (path of the image placed by Shapes.AddPicture) or none of these
+    """
+    if zipfile.is_zipfile(path):
+        return _read_pptx(path)
+    with open(path, "rb") as f:
+        deck = pickle.load(f)
+    if not isinstance(deck, dict) or "slides" not in deck:
+        raise com_error(f"Presentations.Open: {path} is not a presentation.")
+    return deck
+
+
+# =======================
+# -- Class Definitions --
+# =======================
+
+class _FakeObject():
+    """
+    Base of the fake COM Objects.
+    Every access of a public (capitalized) member is counted,
+    and delayed as a call into the PowerPoint process would be
+    """
+    def __init__(self, app):
+        object.__setattr__(self, "_app", app)
+
+    def __getattribute__(self, name):
+        if name[:1].isupper():
+            object.__getattribute__(self, "_app")._call(type(self).__name__, name)
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+        if name[:1].isupper():
+            self._app._call(type(self).__name__, f"{name}=")
+        object.__setattr__(self, name, value)
+
+
+class FakeApplication(_FakeObject):
+    """
+    In-memory stand-in of the PowerPoint.Application COM Object
+    """
+    def __init__(self, latency=0.0, decks=None):
+        super().__init__(self)
+        self.latency = latency # Seconds per call
+        self.calls = Counter() # "Class.Member" -> count
+        self.clipboard = None
+        # Decks opened by path without reading a file (path -> deck spec)
+        self.decks = { os.path.abspath(path): deck for path, deck in (decks or {}).items() }
+        self._presentations = []
+        self._specs = {} # Decks read from files, by path and mtime
+
+    def _call(self, cls, member):
+        self.calls[f"{cls}.{member}"] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _deck(self, path):
+        """
+        Returns a copy of the deck spec at path
+        """
+        path = os.path.abspath(path)
+        if path in self.decks:
+            return copy.deepcopy(self.decks[path])
+        if not os.path.isfile(path):
+            raise com_error(f"Presentations.Open: PowerPoint could not open {path}.")
+        key = (path, os.stat(path).st_mtime_ns)
+        if key not in self._specs:
+            self._specs[key] = read_deck(path)
+        return copy.deepcopy(self._specs[key])
+
+    @property
+    def Presentations(self):
+        return Presentations(self)
+
+    def Quit(self):
+        self._presentations = []
+
+
+class Presentations(_FakeObject):
+    def __call__(self, index):
+        self._app._call("Presentations", "Item")
+        presentations = self._app._presentations
+        if not 1 <= index <= len(presentations):
+            raise _out_of_range("Presentations", index)
+        return presentations[index - 1]
+
+    def __len__(self):
+        return len(self._app._presentations)
+
+    def __iter__(self):
+        for pptx in list(self._app._presentations):
+            self._app._call("Presentations", "Item")
+            yield pptx
+
+    @property
+    def Count(self):
+        return len(self)
+
+    def Open(self, FileName, ReadOnly=False, Untitled=False, WithWindow=True):
+        pptx = Presentation(self._app, FileName, self._app._deck(FileName))
+        self._app._presentations.append(pptx)
+        return pptx
+
+
+class Presentation(_FakeObject):
+    def __init__(self, app, path, deck):
+        super().__init__(app)
+        self._path = os.path.abspath(path)
+        self._next_id = FIRST_SLIDE_ID
+        self._slides = [ self._new_slide(spec) for spec in deck["slides"] ]
+
+    def _new_slide(self, spec):
+        slide = Slide(self._app, self, spec, self._next_id)
+        self._next_id += 1
+        return slide
+
+    def _dump(self):
+        return { "slides": [ slide._dump() for slide in self._slides ] }
+
+    def _insert(self, specs, index):
+        """
+        Inserts slides made from specs so that the first is at index
+        and returns the first
+        """
+        slides = [ self._new_slide(copy.deepcopy(spec)) for spec in specs ]
+        self._slides[index - 1:index - 1] = slides
+        return slides[0]
+
+    @property
+    def Application(self):
+        return self._app
+
+    @property
+    def Name(self):
+        return os.path.basename(self._path)
+
+    @property
+    def FullName(self):
+        return self._path
+
+    @property
+    def Slides(self):
+        return Slides(self._app, self)
+
+    def Save(self):
+        with open(self._path, "wb") as f:
+            pickle.dump(self._dump(), f)
+
+    def SaveAs(self, FileName):
+        self._path = os.path.abspath(FileName)
+        self.Save()
+
+    def Close(self):
+        if self in self._app._presentations:
+            self._app._presentations.remove(self)
+
+
+class Slides(_FakeObject):
+    def __init__(self, app, pptx):
+        super().__init__(app)
+        self._pptx = pptx
+
+    def _index(self, index):
+        """
+        Returns index clamped to the positions slides can be inserted at
+        """
+        count = len(self._pptx._slides)
+        return count + 1 if index in ("", None, -1) else min(max(int(index), 1), count + 1)
+
+    def __call__(self, index):
+        self._app._call("Slides", "Item")
+        slides = self._pptx._slides
+        if not 1 <= index <= len(slides):
+            raise _out_of_range("Slides", index)
+        return slides[index - 1]
+
+    def __len__(self):
+        return len(self._pptx._slides)
+
+    def __iter__(self):
+        for slide in list(self._pptx._slides):
+            self._app._call("Slides", "Item")
+            yield slide
+
+    @property
+    def Count(self):
+        return len(self)
+
+    def Paste(self, Index=""):
+        """
+        Inserts the slide last copied with Slide.Copy at Index
+        """
+        if self._app.clipboard is None:
+            raise com_error("Slides.Paste: Clipboard is empty or contains data which may not be pasted here.")
+        return self._pptx._insert([ self._app.clipboard ], self._index(Index))
+
+    def InsertFromFile(self, FileName, Index, SlideStart=1, SlideEnd=-1):
+        """
+        Inserts slides SlideStart to SlideEnd of the file after slide Index
+        """
+        specs = self._app._deck(FileName)["slides"]
+        SlideEnd = len(specs) if SlideEnd == -1 else SlideEnd
+        if not 1 <= SlideStart <= SlideEnd <= len(specs):
+            raise _out_of_range("Slides.InsertFromFile", f"{SlideStart}-{SlideEnd}")
+        self._pptx._insert(specs[SlideStart - 1:SlideEnd], self._index(Index + 1))
+        return SlideEnd - SlideStart + 1
+
+
+class Slide(_FakeObject):
+    def __init__(self, app, pptx, spec, slide_id):
+        super().__init__(app)
+        self._pptx = pptx
+        self._id = slide_id
+        self._name = spec.get("name", "")
+        self._shapes = [ Shape(app, self, shape) for shape in spec.get("shapes", []) ]
+
+    def _dump(self):
+        return { "name": self._name, "shapes": [ shape._dump() for shape in self._shapes ] }
+
+    @property
+    def Parent(self):
+        return self._pptx
+
+    @property
+    def Shapes(self):
+        return Shapes(self._app, self)
+
+    @property
+    def SlideIndex(self):
+        return self._pptx._slides.index(self) + 1
+
+    @property
+    def SlideID(self):
+        return self._id
+
+    @property
+    def Name(self):
+        return self._name
+
+    @Name.setter
+    def Name(self, name):
+        self._name = name
+
+    def Copy(self):
+        self._app.clipboard = self._dump()
+
+    def Duplicate(self):
+        """
+        Inserts a copy right after the slide and returns it
+        """
+        return self._pptx._insert([ self._dump() ], self._pptx._slides.index(self) + 2)
+
+    def MoveTo(self, toPos):
+        slides = self._pptx._slides
+        if not 1 <= toPos <= len(slides):
+            raise _out_of_range("Slide.MoveTo", toPos)
+        slides.remove(self)
+        slides.insert(toPos - 1, self)
+
+    def Delete(self):
+        self._pptx._slides.remove(self)
+
+
+class Shapes(_FakeObject):
+    def __init__(self, app, slide):
+        super().__init__(app)
+        self._slide = slide
+
+    def __call__(self, index):
+        self._app._call("Shapes", "Item")
+        shapes = self._slide._shapes
+        if isinstance(index, str):
+            for shape in shapes:
+                if shape._name == index:
+                    return shape
+            raise com_error(f"Shapes({index!r}): Item not found.")
+        if not 1 <= index <= len(shapes):
+            raise _out_of_range("Shapes", index)
+        return shapes[index - 1]
+
+    def __len__(self):
+        return len(self._slide._shapes)
+
+    def __iter__(self):
+        for shape in list(self._slide._shapes):
+            self._app._call("Shapes", "Item")
+            yield shape
+
+    @property
+    def Count(self):
+        return len(self)
+
+    def AddPicture(self, FileName, LinkToFile, SaveWithDocument, Left, Top, Width=-1, Height=-1):
+        """
+        Appends a picture of the image at FileName and returns it
+        """
+        if not os.path.isfile(FileName):
+            raise com_error(f"Shapes.AddPicture: The specified file wasn't found: {FileName}")
+        spec = { "name": f"Picture {len(self._slide._shapes) + 1}", "picture": os.path.abspath(FileName),
+                 "left": Left, "top": Top, "width": Width, "height": Height }
+        shape = Shape(self._app, self._slide, spec)
+        self._slide._shapes.append(shape)
+        return shape
+
+
+class Shape(_FakeObject):
+    def __init__(self, app, slide, spec):
+        super().__init__(app)
+        self._slide = slide
+        self._name = spec.get("name", "")
+        self._position = [ spec.get(key, 0.0) for key in ["left", "top", "width", "height"] ]
+        self._text = spec.get("text")
+        self._rows = spec.get("table")
+        self._picture = spec.get("picture")
+
+    def _dump(self):
+        spec = { "name": self._name }
+        spec.update(zip(["left", "top", "width", "height"], self._position))
+        if self._rows is not None:
+            spec["table"] = [ list(row) for row in self._rows ]
+        elif self._text is not None:
+            spec["text"] = self._text
+        elif self._picture is not None:
+            spec["picture"] = self._picture
+        return spec
+
+    def _get_text(self):
+        return self._text
+
+    def _set_text(self, text):
+        self._text = text
+
+    @property
+    def Name(self):
+        return self._name
+
+    @Name.setter
+    def Name(self, name):
+        self._name = name
+
+    @property
+    def Left(self):
+        return self._position[0]
+
+    @property
+    def Top(self):
+        return self._position[1]
+
+    @property
+    def Width(self):
+        return self._position[2]
+
+    @property
+    def Height(self):
+        return self._position[3]
+
+    @property
+    def HasTextFrame(self):
+        return MSOTRUE if self._text is not None else MSOFALSE
+
+    @property
+    def HasTable(self):
+        return MSOTRUE if self._rows is not None else MSOFALSE
+
+    @property
+    def TextFrame(self):
+        if self._text is None:
+            raise com_error("Shape.TextFrame: This shape does not have a text frame.")
+        return TextFrame(self._app, self._get_text, self._set_text)
+
+    @property
+    def Table(self):
+        if self._rows is None:
+            raise com_error("Shape.Table: This shape does not have a table.")
+        return Table(self._app, self)
+
+    def Delete(self):
+        self._slide._shapes.remove(self)
+
+
+class TextFrame(_FakeObject):
+    def __init__(self, app, get_text, set_text):
+        super().__init__(app)
+        self._get_text = get_text
+        self._set_text = set_text
+
+    @property
+    def HasText(self):
+        return MSOTRUE if self._get_text() else MSOFALSE
+
+    @property
+    def TextRange(self):
+        return TextRange(self._app, self._get_text, self._set_text)
+
+
+class TextRange(_FakeObject):
+    def __init__(self, app, get_text, set_text):
+        super().__init__(app)
+        self._get_text = get_text
+        self._set_text = set_text
+
+    @property
+    def Text(self):
+        # Paragraphs are delimited by \r, as in PowerPoint
+        return self._get_text().replace("\r\n", "\r").replace("\n", "\r")
+
+    @Text.setter
+    def Text(self, text):
+        self._set_text(str(text))
+
+
+class Table(_FakeObject):
+    def __init__(self, app, shape):
+        super().__init__(app)
+        self._shape = shape
+
+    @property
+    def Parent(self):
+        return self._shape
+
+    @property
+    def Rows(self):
+        return Rows(self._app, self._shape._rows)
+
+    @property
+    def Columns(self):
+        return Columns(self._app, self._shape._rows)
+
+    def Cell(self, Row, Column):
+        rows = self._shape._rows
+        if not (1 <= Row <= len(rows) and 1 <= Column <= len(rows[Row - 1])):
+            raise _out_of_range("Table.Cell", f"{Row}, {Column}")
+        return Cell(self._app, rows[Row - 1], Column - 1)
+
+
+class Rows(_FakeObject):
+    def __init__(self, app, rows):
+        super().__init__(app)
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def Count(self):
+        return len(self)
+
+    def Add(self, BeforeRow=-1):
+        """
+        Inserts an empty row before BeforeRow (appending if -1)
+        """
+        width = len(self._rows[-1]) if self._rows else 0
+        index = len(self._rows) if BeforeRow == -1 else BeforeRow - 1
+        if not 0 <= index <= len(self._rows):
+            raise _out_of_range("Rows.Add", BeforeRow)
+        self._rows.insert(index, [ "" ] * width)
+
+
+class Columns(_FakeObject):
+    def __init__(self, app, rows):
+        super().__init__(app)
+        self._rows = rows
+
+    def __len__(self):
+        return max([ len(row) for row in self._rows ], default=0)
+
+    @property
+    def Count(self):
+        return len(self)
+
+
+class Cell(_FakeObject):
+    def __init__(self, app, row, col):
+        super().__init__(app)
+        self._row = row
+        self._col = col
+
+    def _get_text(self):
+        return self._row[self._col]
+
+    def _set_text(self, text):
+        self._row[self._col] = text
+
+    @property
+    def Shape(self):
+        return _CellShape(self._app, self)
+
+
+class _CellShape(_FakeObject):
+    """
+    Shape of a table Cell, which only holds text
+    """
+    def __init__(self, app, cell):
+        super().__init__(app)
+        self._cell = cell
+
+    @property
+    def HasTextFrame(self):
+        return MSOTRUE
+
+    @property
+    def TextFrame(self):
+        return TextFrame(self._app, self._cell._get_text, self._cell._set_text)
+
+
+class FakeBackend(Backend):
+    """
+    Backend driving an in-memory stand-in of PowerPoint,
+    which counts calls into its object model and optionally
+    delays each by a latency, e.g. to benchmark on platforms without PowerPoint.
+
+    Presentations are read from .pptx files (or from decks saved by the fake),
+    or from deck specs given by path in decks; see read_deck for their format.
+    Slides are copied between presentations as PowerPoint would,
+    via Duplicate, InsertFromFile or Copy and Paste
+    """
+    name = "fake"
+
+    def __init__(self, latency=None, decks=None):
+        if latency is None:
+            latency = float(os.getenv(LATENCY_ENV) or 0) / 1000
+        self.__app = FakeApplication(latency, decks)
+
+    @property
+    def app(self):
+        return self.__app
+
+    @property
+    def calls(self):
+        """
+        Returns Counter of calls made, by "Class.Member"
+        """
+        return self.__app.calls
+
+    def open(self, path, with_window=True):
+        return self.__app.Presentations.Open(path, WithWindow=with_window)
+
+    def quit(self):
+        self.__app.Quit()
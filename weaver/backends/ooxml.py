@@ -0,0 +1,1165 @@
+import io
+import os
+import re
+import copy
+import hashlib
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+from .base import Backend
+from .zipwriter import write_zip
+from util import MSOTRUE, com_error
+
+# \\\\\\\\\\\\\\\\\\\\\\\\\\\\\\
+# *** GLOBAL CONSTANTS ****
+# //////////////////////////////
+
+MSOFALSE = 0
+EMU_PER_POINT = 12700
+
+NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "mc": "http://schemas.openxmlformats.org/markup-compatibility/2006",
+    "pr": "http://schemas.openxmlformats.org/package/2006/relationships",
+    "ct": "http://schemas.openxmlformats.org/package/2006/content-types",
+}
+
+RT_OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+RT_SLIDE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide"
+RT_SLIDE_LAYOUT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout"
+RT_SLIDE_MASTER = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideMaster"
+RT_NOTES_SLIDE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/notesSlide"
+RT_IMAGE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/image"
+
+CT_SLIDE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+CT_RELS = "application/vnd.openxmlformats-package.relationships+xml"
+CT_IMAGES = { "png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg", "gif": "image/gif", "bmp": "image/bmp" }
+
+# Prefixes kept on serialization so that mc:Ignorable et al. stay valid
+for _prefix, _uri in {
+    "a": NS["a"],
+    "p": NS["p"],
+    "r": NS["r"],
+    "mc": NS["mc"],
+    "p14": "http://schemas.microsoft.com/office/powerpoint/2010/main",
+    "p15": "http://schemas.microsoft.com/office/powerpoint/2012/main",
+    "a14": "http://schemas.microsoft.com/office/drawing/2010/main",
+    "a16": "http://schemas.microsoft.com/office/drawing/2014/main",
+    "v": "urn:schemas-microsoft-com:vml",
+}.items():
+    ET.register_namespace(_prefix, _uri)
+
+XML_DECLARATION = b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n'
+
+
+def _qn(tag):
+    """
+    Converts a prefixed tag (e.g. 'a:t') to ElementTree's {uri}local form
+    """
+    prefix, local = tag.split(":")
+    return f"{{{NS[prefix]}}}{local}"
+
+
+# =======================
+# -- XML Helpers --
+# =======================
+
+def _parse_xml(blob):
+    """
+    Parses blob and returns its root Element
+    along with the namespace declarations of the document
+    """
+    nsmap = []
+    events = ET.iterparse(io.BytesIO(blob), events=("start-ns",))
+    for _, (prefix, uri) in events:
+        nsmap.append((prefix, uri))
+        if prefix and not re.match(r"ns\d+$", prefix):
+            ET.register_namespace(prefix, uri)
+    return events.root, nsmap
+
+
+def _serialize_xml(root, nsmap):
+    """
+    Serializes root, restoring declarations that ElementTree drops
+    because they are only referenced by name (e.g. in mc:Ignorable)
+    """
+    xml = ET.tostring(root, encoding="unicode")
+    end = xml.index(">")
+    if xml[end - 1] == "/":
+        end -= 1
+    start_tag = xml[:end]
+    missing = ""
+    for prefix, uri in nsmap:
+        attr = f"xmlns:{prefix}=" if prefix else "xmlns="
+        if attr not in start_tag:
+            missing += f" {attr}{quoteattr(uri)}"
+    return XML_DECLARATION + (start_tag + missing + xml[end:]).encode("utf-8")
+
+
+def _get_text(tx_body):
+    """
+    Returns text of a:txBody the way TextRange.Text does,
+    i.e. paragraphs delimited by \\r and line breaks by \\v
+    """
+    if tx_body is None:
+        return ""
+    paragraphs = []
+    for p in tx_body.iterfind(_qn("a:p")):
+        text = ""
+        for child in p:
+            if child.tag in (_qn("a:r"), _qn("a:fld")):
+                t = child.find(_qn("a:t"))
+                if t is not None:
+                    text += t.text or ""
+            elif child.tag == _qn("a:br"):
+                text += "\v"
+        paragraphs.append(text)
+    return "\r".join(paragraphs)
+
+
+def _set_text(tx_body, text):
+    """
+    Replaces the paragraphs of a:txBody with text,
+    keeping the formatting of the first paragraph and run
+    """
+    paragraphs = tx_body.findall(_qn("a:p"))
+    # Formatting to carry over into the new paragraphs
+    p_pr = r_pr = end_pr = None
+    if paragraphs:
+        first = paragraphs[0]
+        p_pr = first.find(_qn("a:pPr"))
+        run = first.find(_qn("a:r"))
+        r_pr = run.find(_qn("a:rPr")) if run is not None else None
+        end_pr = first.find(_qn("a:endParaRPr"))
+        pos = list(tx_body).index(first)
+    else:
+        # a:p must precede a:tcPr in table cells
+        pos = len(tx_body)
+        for i, child in enumerate(tx_body):
+            if child.tag == _qn("a:tcPr"):
+                pos = i
+                break
+    for p in paragraphs:
+        tx_body.remove(p)
+
+    for i, line in enumerate(re.split(r"\r\n|\r|\n", str(text))):
+        p = ET.Element(_qn("a:p"))
+        if p_pr is not None:
+            p.append(copy.deepcopy(p_pr))
+        for j, segment in enumerate(line.split("\v")):
+            if j:
+                br = ET.SubElement(p, _qn("a:br"))
+                if r_pr is not None:
+                    br.append(copy.deepcopy(r_pr))
+            if segment:
+                r = ET.SubElement(p, _qn("a:r"))
+                if r_pr is not None:
+                    r.append(copy.deepcopy(r_pr))
+                ET.SubElement(r, _qn("a:t")).text = segment
+        if end_pr is not None:
+            p.append(copy.deepcopy(end_pr))
+        tx_body.insert(pos + i, p)
+
+
+def _new_tx_body(tag):
+    """
+    Returns an empty text body (p:txBody for shapes, a:txBody for cells)
+    """
+    tx_body = ET.Element(_qn(tag))
+    ET.SubElement(tx_body, _qn("a:bodyPr"))
+    ET.SubElement(tx_body, _qn("a:lstStyle"))
+    ET.SubElement(tx_body, _qn("a:p"))
+    return tx_body
+
+
+# =======================
+# -- Package Model --
+# =======================
+
+class _Relationship():
+    def __init__(self, r_id, rel_type, target, external=False):
+        self.r_id = r_id
+        self.rel_type = rel_type
+        # Target is a _Part unless external, in which case it is the raw reference
+        self.target = target
+        self.external = external
+
+
+class _Part():
+    """
+    A single part (file) of an OPC package;
+    given the package it was opened from, its blob and relationships are only read
+    therefrom on first access
+    """
+    def __init__(self, partname, content_type, blob=b"", source=None):
+        self.partname = partname
+        self.content_type = content_type
+        self.modified = False
+        self.__source = source
+        self.__blob = None if source else blob
+        self.__rels = None if source else {}
+        self.__element = None
+        self.__nsmap = []
+
+    @property
+    def is_loaded(self):
+        """
+        Checks if the blob of the part has been read
+        """
+        return self.__blob is not None
+
+    @property
+    def rels(self):
+        """
+        Returns dict of rId -> _Relationship, reading them on first access
+        """
+        if self.__rels is None:
+            self.__rels = self.__read_rels()
+        return self.__rels
+
+    @rels.setter
+    def rels(self, rels):
+        self.__rels = rels
+
+    def load(self):
+        """
+        Reads whatever of the part has not been read yet
+        """
+        if self.__source is None:
+            return
+        if self.__blob is None:
+            self.__blob = self.__source.read(self.partname)
+        if self.__rels is None:
+            self.__rels = self.__read_rels()
+        self.__source = None
+
+    def __read_rels(self):
+        return self.__source._load_rels(self.__source.read(_rels_partname(self.partname)),
+                                        posixpath.dirname(self.partname))
+
+    @property
+    def is_xml(self):
+        return self.content_type.endswith("xml")
+
+    @property
+    def element(self):
+        """
+        Returns root Element of the part, parsing its blob on first access
+        """
+        if self.__element is None:
+            self.__element, self.__nsmap = _parse_xml(self.blob)
+        return self.__element
+
+    @property
+    def blob(self):
+        """
+        Returns current contents of the part as bytes
+        """
+        if self.modified and self.__element is not None:
+            self.__blob = _serialize_xml(self.__element, self.__nsmap)
+            self.modified = False
+        elif self.__blob is None:
+            self.__blob = self.__source.read(self.partname)
+        return self.__blob
+
+    def touch(self):
+        """
+        Marks the part as modified so its element is reserialized on save
+        """
+        self.modified = True
+
+    def next_r_id(self):
+        ids = [ int(r_id[3:]) for r_id in self.rels if re.match(r"rId\d+$", r_id) ]
+        return f"rId{max(ids, default=0) + 1}"
+
+    def relate_to(self, target, rel_type, external=False):
+        """
+        Returns rId of a relationship to target, adding one if necessary
+        """
+        for rel in self.rels.values():
+            if rel.target is target and rel.rel_type == rel_type:
+                return rel.r_id
+        r_id = self.next_r_id()
+        self.rels[r_id] = _Relationship(r_id, rel_type, target, external)
+        return r_id
+
+    def related(self, rel_type):
+        """
+        Returns parts related to this part by rel_type
+        """
+        return [ rel.target for rel in self.rels.values()
+                 if rel.rel_type == rel_type and not rel.external ]
+
+
+def _rels_partname(partname):
+    """
+    Returns name of the .rels part belonging to partname
+    """
+    directory, filename = posixpath.split(partname)
+    return posixpath.join(directory, "_rels", filename + ".rels")
+
+
+class _Package():
+    """
+    OPC (zip) package, e.g. a .pptx file, held in memory.
+    Parts of a package opened from a file are read therefrom as they are used,
+    so that only the slides (and media) touched cost their size
+    """
+    def __init__(self):
+        self.parts = {}
+        self.rels = {}
+        self.defaults = {}
+        self.__path = ""
+        self.__zip = None # Opened from, until all parts are read
+
+    @classmethod
+    def open(cls, path):
+        package = cls()
+        package.__path = os.path.abspath(path)
+        package.__zip = zipfile.ZipFile(path)
+        names = [ "/" + name for name in package.__zip.namelist() if not name.endswith("/") ]
+
+        content_types, _ = _parse_xml(package.read("/[Content_Types].xml"))
+        overrides = {}
+        for item in content_types:
+            if item.tag == _qn("ct:Default"):
+                package.defaults[item.get("Extension").lower()] = item.get("ContentType")
+            elif item.tag == _qn("ct:Override"):
+                overrides[item.get("PartName")] = item.get("ContentType")
+
+        # Parts are read, along with their relationships, on first use
+        for name in names:
+            if name.endswith(".rels") or name == "/[Content_Types].xml":
+                continue
+            ext = posixpath.splitext(name)[1][1:].lower()
+            content_type = overrides.get(name, package.defaults.get(ext, "application/octet-stream"))
+            package.parts[name] = _Part(name, content_type, source=package)
+
+        package.rels = package._load_rels(package.read("/_rels/.rels"), "/")
+        return package
+
+    def read(self, partname):
+        """
+        Returns blob of partname in the file opened from, or None if not found
+        """
+        if self.__zip is None:
+            raise com_error(f"{posixpath.basename(self.__path)} was closed before {partname} was read.")
+        try:
+            return self.__zip.read(partname[1:])
+        except KeyError:
+            return None
+
+    def load(self):
+        """
+        Reads every part not read yet and closes the file opened from,
+        e.g. before it is written to
+        """
+        if self.__zip is None:
+            return
+        for part in list(self.parts.values()):
+            part.load()
+        self.close()
+
+    def copy(self):
+        """
+        Returns a copy of the package sharing no parts with it (but their blobs),
+        e.g. to build on while this one is kept as it is;
+        parts not read yet are read first
+        """
+        self.load()
+        package = _Package()
+        package.__path = self.__path
+        package.defaults = dict(self.defaults)
+        package.parts = { name: _Part(name, part.content_type, part.blob) for name, part in self.parts.items() }
+
+        def copy_rels(rels):
+            return { r_id: _Relationship(r_id, rel.rel_type, rel.target if rel.external else package.parts[rel.target.partname],
+                                         rel.external) for r_id, rel in rels.items() }
+        for name, part in self.parts.items():
+            package.parts[name].rels = copy_rels(part.rels)
+        package.rels = copy_rels(self.rels)
+        return package
+
+    def close(self):
+        """
+        Closes the file opened from; parts not read by then are no longer available
+        """
+        if self.__zip is not None:
+            self.__zip.close()
+            self.__zip = None
+
+    def _load_rels(self, blob, base_dir):
+        rels = {}
+        if not blob:
+            return rels
+        root, _ = _parse_xml(blob)
+        for item in root.iterfind(_qn("pr:Relationship")):
+            r_id, rel_type, ref = item.get("Id"), item.get("Type"), item.get("Target")
+            if item.get("TargetMode") == "External":
+                rels[r_id] = _Relationship(r_id, rel_type, ref, external=True)
+                continue
+            partname = ref if ref.startswith("/") else posixpath.normpath(posixpath.join(base_dir, ref))
+            if partname in self.parts:
+                rels[r_id] = _Relationship(r_id, rel_type, self.parts[partname])
+        return rels
+
+    def part_related(self, rel_type):
+        for rel in self.rels.values():
+            if rel.rel_type == rel_type:
+                return rel.target
+        return None
+
+    def next_partname(self, template):
+        """
+        Returns an unused partname from a template like /ppt/slides/slide%d.xml
+        """
+        i = 1
+        while template % i in self.parts:
+            i += 1
+        return template % i
+
+    def add_part(self, part):
+        self.parts[part.partname] = part
+        return part
+
+    def _reachable_parts(self):
+        """
+        Returns parts reachable from the package relationships;
+        anything else (e.g. deleted slides) is dropped on save
+        """
+        seen = {}
+        stack = [ rel.target for rel in self.rels.values() if not rel.external ]
+        while stack:
+            part = stack.pop()
+            if part.partname in seen:
+                continue
+            seen[part.partname] = part
+            stack.extend(rel.target for rel in part.rels.values() if not rel.external)
+        return sorted(seen.values(), key=lambda part: part.partname)
+
+    def _rels_xml(self, rels, base_dir):
+        xml = '<Relationships xmlns="%s">' % NS["pr"]
+        for rel in rels.values():
+            if rel.external:
+                xml += "<Relationship Id=%s Type=%s Target=%s TargetMode=\"External\"/>" % (
+                    quoteattr(rel.r_id), quoteattr(rel.rel_type), quoteattr(rel.target))
+            else:
+                target = posixpath.relpath(rel.target.partname, base_dir)
+                xml += "<Relationship Id=%s Type=%s Target=%s/>" % (
+                    quoteattr(rel.r_id), quoteattr(rel.rel_type), quoteattr(target))
+        xml += "</Relationships>"
+        return XML_DECLARATION + xml.encode("utf-8")
+
+    def _content_types_xml(self, parts):
+        defaults = dict(self.defaults)
+        defaults.setdefault("rels", CT_RELS)
+        defaults.setdefault("xml", "application/xml")
+        xml = '<Types xmlns="%s">' % NS["ct"]
+        for ext, content_type in sorted(defaults.items()):
+            xml += "<Default Extension=%s ContentType=%s/>" % (quoteattr(ext), quoteattr(content_type))
+        for part in parts:
+            ext = posixpath.splitext(part.partname)[1][1:].lower()
+            if defaults.get(ext) != part.content_type:
+                xml += "<Override PartName=%s ContentType=%s/>" % (
+                    quoteattr(part.partname), quoteattr(part.content_type))
+        xml += "</Types>"
+        return XML_DECLARATION + xml.encode("utf-8")
+
+    def _dedupe_media(self, digests=None):
+        """
+        Points relationships to media whose contents match those of another media part
+        (e.g. images of slides pasted more than once) to that part instead,
+        so that each image is stored once; returns number of duplicates dropped.
+        digests, if given, is filled with the sha1 of every media part by partname
+        """
+        parts = self._reachable_parts()
+        digests = {} if digests is None else digests
+        originals, duplicates = {}, {}
+        for part in parts:
+            if part.partname.startswith("/ppt/media/"):
+                digests[part.partname] = hashlib.sha1(part.blob).digest()
+                key = (posixpath.splitext(part.partname)[1].lower(), digests[part.partname])
+                original = originals.setdefault(key, part)
+                if original is not part:
+                    duplicates[part.partname] = original
+        if duplicates:
+            for part in parts:
+                for rel in part.rels.values():
+                    if not rel.external and rel.target.partname in duplicates:
+                        rel.target = duplicates[rel.target.partname]
+        return len(duplicates)
+
+    def save(self, path):
+        if self.__zip is not None and os.path.abspath(path) == self.__path:
+            self.load()
+        digests = {}
+        self._dedupe_media(digests)
+        parts = self._reachable_parts()
+        entries = [ ("[Content_Types].xml", self._content_types_xml(parts), None),
+                    ("_rels/.rels", self._rels_xml(self.rels, "/"), None) ]
+        for part in parts:
+            # Media are the same across reports, so compressed once per run,
+            # keyed by the digest taken when deduplicated
+            blob = part.blob
+            digest = None if part.is_xml else digests.get(part.partname) or hashlib.sha1(blob).digest()
+            entries.append((part.partname[1:], blob, digest))
+            if part.rels:
+                entries.append((_rels_partname(part.partname)[1:],
+                                self._rels_xml(part.rels, posixpath.dirname(part.partname)), None))
+        write_zip(path, entries)
+
+
+def _layout_name(layout):
+    c_sld = layout.element.find(_qn("p:cSld"))
+    return c_sld.get("name", "") if c_sld is not None else ""
+
+
+def _import_slide(src_part, blob, dst_package):
+    """
+    Copies a slide part into dst_package along with the parts it relates to.
+    Slide layouts are matched by name (and imported if missing),
+    media and other parts are shared within a package or copied across packages,
+    and notes are dropped.
+    Returns the new slide part
+    """
+    same_package = dst_package.parts.get(src_part.partname) is src_part
+    slide = dst_package.add_part(_Part(dst_package.next_partname("/ppt/slides/slide%d.xml"), CT_SLIDE, blob))
+    copies = {} # Memoizes parts copied from the source package
+
+    def copy_part(part):
+        if same_package:
+            return part
+        if part.partname in copies:
+            return copies[part.partname]
+        directory, filename = posixpath.split(part.partname)
+        stem, ext = posixpath.splitext(filename)
+        template = posixpath.join(directory, re.sub(r"\d+$", "", stem) + "%d" + ext)
+        new = dst_package.add_part(_Part(dst_package.next_partname(template), part.content_type, part.blob))
+        copies[part.partname] = new
+        for r_id, rel in part.rels.items():
+            if rel.external:
+                new.rels[r_id] = _Relationship(r_id, rel.rel_type, rel.target, True)
+            elif rel.rel_type == RT_SLIDE_MASTER:
+                # Imported layouts are attached to the destination's first master
+                master = _first_master(dst_package)
+                new.rels[r_id] = _Relationship(r_id, rel.rel_type, master)
+                _register_layout(master, new)
+            elif rel.rel_type not in (RT_SLIDE, RT_NOTES_SLIDE):
+                new.rels[r_id] = _Relationship(r_id, rel.rel_type, copy_part(rel.target))
+        return new
+
+    dropped = []
+    for r_id, rel in src_part.rels.items():
+        if rel.external:
+            slide.rels[r_id] = _Relationship(r_id, rel.rel_type, rel.target, True)
+        elif rel.rel_type == RT_SLIDE_LAYOUT and not same_package:
+            name = _layout_name(rel.target)
+            matches = [ layout for layout in _layouts(dst_package) if _layout_name(layout) == name ]
+            layout = matches[0] if matches else copy_part(rel.target)
+            slide.rels[r_id] = _Relationship(r_id, rel.rel_type, layout)
+        elif rel.rel_type == RT_NOTES_SLIDE or (rel.rel_type == RT_SLIDE and not same_package):
+            dropped.append(r_id)
+        else:
+            slide.rels[r_id] = _Relationship(r_id, rel.rel_type, copy_part(rel.target))
+
+    # Remove references (e.g. hyperlinks) to relationships that were not carried over
+    if dropped:
+        for parent in list(slide.element.iter()):
+            for child in list(parent):
+                if any(v in dropped for k, v in child.attrib.items() if k.startswith(f"{{{NS['r']}}}")):
+                    parent.remove(child)
+        slide.touch()
+    return slide
+
+
+def _first_master(package):
+    presentation = package.part_related(RT_OFFICE_DOCUMENT)
+    return presentation.related(RT_SLIDE_MASTER)[0]
+
+
+def _layouts(package):
+    return [ part for part in package.parts.values() if part.partname.startswith("/ppt/slideLayouts/") ]
+
+
+def _register_layout(master, layout):
+    """
+    Lists layout in the master's p:sldLayoutIdLst
+    """
+    id_list = master.element.find(_qn("p:sldLayoutIdLst"))
+    if id_list is None:
+        return
+    ids = [ int(item.get("id")) for item in master.element.iter(_qn("p:sldLayoutId")) ]
+    item = ET.SubElement(id_list, _qn("p:sldLayoutId"))
+    item.set("id", str(max(ids, default=2147483648) + 1))
+    item.set(_qn("r:id"), master.relate_to(layout, RT_SLIDE_LAYOUT))
+    master.touch()
+
+
+# =======================
+# -- Object Model --
+# =======================
+
+def _out_of_range(collection, index):
+    return com_error(f"{collection}({index}): The index into the specified collection is out of bounds.")
+
+
+class Presentation():
+    """
+    Native counterpart of the PowerPoint Presentation COM Object
+    """
+    def __init__(self, app, package, path):
+        self.__app = app
+        self.__package = package
+        self.__path = os.path.abspath(path)
+        self.__part = package.part_related(RT_OFFICE_DOCUMENT)
+
+    @property
+    def Application(self):
+        return self.__app
+
+    @property
+    def Name(self):
+        return os.path.basename(self.__path)
+
+    @property
+    def FullName(self):
+        return self.__path
+
+    @property
+    def Slides(self):
+        return Slides(self)
+
+    @property
+    def package(self):
+        return self.__package
+
+    @property
+    def part(self):
+        return self.__part
+
+    def Save(self):
+        self.__package.save(self.__path)
+
+    def SaveAs(self, path):
+        self.__path = os.path.abspath(path)
+        self.Save()
+
+    def copy(self):
+        """
+        Returns a copy of the presentation held in memory, at the same path until saved as another;
+        this one is left as it is (e.g. a template kept open for reports to be built on)
+        """
+        return Presentation(self.__app, self.__package.copy(), self.__path)
+
+    def Close(self):
+        if self.__package is not None:
+            self.__package.close()
+        self.__package = None
+
+
+class Slides():
+    def __init__(self, pptx):
+        self.__pptx = pptx
+
+    def _id_list(self):
+        return self.__pptx.part.element.find(_qn("p:sldIdLst"))
+
+    def _parts(self):
+        id_list = self._id_list()
+        if id_list is None:
+            return []
+        rels = self.__pptx.part.rels
+        return [ rels[item.get(_qn("r:id"))].target for item in id_list ]
+
+    def __call__(self, index):
+        parts = self._parts()
+        if not 1 <= index <= len(parts):
+            raise _out_of_range("Slides", index)
+        return Slide(self.__pptx, parts[index - 1])
+
+    def __len__(self):
+        return len(self._parts())
+
+    def __iter__(self):
+        for part in self._parts():
+            yield Slide(self.__pptx, part)
+
+    @property
+    def Count(self):
+        return len(self)
+
+    def _insert(self, part, index=""):
+        """
+        Adds slide part to the presentation at index (appending if omitted)
+        """
+        presentation = self.__pptx.part
+        id_list = self._id_list()
+        if id_list is None:
+            id_list = ET.Element(_qn("p:sldIdLst"))
+            # p:sldIdLst follows p:sldMasterIdLst and p:notesMasterIdLst
+            pos = 0
+            for i, child in enumerate(presentation.element):
+                if child.tag in (_qn("p:sldMasterIdLst"), _qn("p:notesMasterIdLst"), _qn("p:handoutMasterIdLst")):
+                    pos = i + 1
+            presentation.element.insert(pos, id_list)
+        ids = [ int(item.get("id")) for item in id_list ]
+        item = ET.Element(_qn("p:sldId"))
+        item.set("id", str(max(ids, default=255) + 1))
+        item.set(_qn("r:id"), presentation.relate_to(part, RT_SLIDE))
+        index = len(id_list) + 1 if index in ("", None) else int(index)
+        id_list.insert(min(max(index, 1), len(id_list) + 1) - 1, item)
+        presentation.touch()
+        return Slide(self.__pptx, part)
+
+    def _remove(self, part):
+        presentation = self.__pptx.part
+        id_list = self._id_list()
+        for item in list(id_list):
+            r_id = item.get(_qn("r:id"))
+            if presentation.rels[r_id].target is part:
+                id_list.remove(item)
+                del presentation.rels[r_id]
+        presentation.touch()
+
+    def clone(self, slide, index=""):
+        """
+        Inserts a copy of slide (from this or another presentation) at index
+        without going through the clipboard and returns the new Slide
+        """
+        part = _import_slide(slide.part, slide.part.blob, self.__pptx.package)
+        return self._insert(part, index)
+
+    def Paste(self, Index=""):
+        """
+        Inserts the slide last copied with Slide.Copy at Index
+        """
+        clipboard = self.__pptx.Application.clipboard
+        if clipboard is None:
+            raise com_error("Slides.Paste: Clipboard is empty or contains data which may not be pasted here.")
+        src_part, blob = clipboard
+        part = _import_slide(src_part, blob, self.__pptx.package)
+        return self._insert(part, Index)
+
+
+class Slide():
+    def __init__(self, pptx, part):
+        self.__pptx = pptx
+        self.__part = part
+
+    @property
+    def part(self):
+        return self.__part
+
+    @property
+    def Parent(self):
+        return self.__pptx
+
+    @property
+    def Shapes(self):
+        return Shapes(self.__part, self.__pptx.package)
+
+    @property
+    def SlideIndex(self):
+        return Slides(self.__pptx)._parts().index(self.__part) + 1
+
+    @property
+    def SlideID(self):
+        presentation = self.__pptx.part
+        for item in presentation.element.iter(_qn("p:sldId")):
+            if presentation.rels[item.get(_qn("r:id"))].target is self.__part:
+                return int(item.get("id"))
+        return 0
+
+    @property
+    def Name(self):
+        return self.__part.element.find(_qn("p:cSld")).get("name", "")
+
+    @Name.setter
+    def Name(self, name):
+        self.__part.element.find(_qn("p:cSld")).set("name", name)
+        self.__part.touch()
+
+    def Copy(self):
+        self.__pptx.Application.clipboard = (self.__part, self.__part.blob)
+
+    def Delete(self):
+        Slides(self.__pptx)._remove(self.__part)
+
+
+_SHAPE_TAGS = [ _qn(tag) for tag in ["p:sp", "p:graphicFrame", "p:pic", "p:grpSp", "p:cxnSp"] ]
+
+
+class Shapes():
+    def __init__(self, part, package=None):
+        self.__part = part
+        self.__package = package
+
+    def _elements(self):
+        sp_tree = self.__part.element.find(f"{_qn('p:cSld')}/{_qn('p:spTree')}")
+        elements = []
+        for child in sp_tree:
+            if child.tag in _SHAPE_TAGS:
+                elements.append(child)
+            elif child.tag == _qn("mc:AlternateContent"):
+                choice = child.find(_qn("mc:Choice"))
+                if choice is not None and len(choice):
+                    elements.append(choice[0])
+        return elements
+
+    def __call__(self, index):
+        elements = self._elements()
+        if isinstance(index, str):
+            for element in elements:
+                shape = Shape(self.__part, element)
+                if shape.Name == index:
+                    return shape
+            raise com_error(f"Shapes({index!r}): Item not found.")
+        if not 1 <= index <= len(elements):
+            raise _out_of_range("Shapes", index)
+        return Shape(self.__part, elements[index - 1])
+
+    def __len__(self):
+        return len(self._elements())
+
+    def __iter__(self):
+        for element in self._elements():
+            yield Shape(self.__part, element)
+
+    @property
+    def Count(self):
+        return len(self)
+
+    def AddPicture(self, FileName, LinkToFile, SaveWithDocument, Left, Top, Width=-1, Height=-1):
+        """
+        Embeds the image at FileName at Left, Top (in points), Width by Height
+        (its size at 96 dpi if omitted) and returns the new Shape
+        """
+        ext = posixpath.splitext(FileName)[1][1:].lower()
+        if LinkToFile != MSOFALSE or ext not in CT_IMAGES:
+            raise com_error(f"Shapes.AddPicture: Only images embedded from {', '.join(CT_IMAGES)} files are supported.")
+        with open(FileName, "rb") as f:
+            blob = f.read()
+        if Width == -1 or Height == -1:
+            # Imported here, as only needed for images of unknown size
+            from images import image_size
+            size = image_size(FileName) or (96, 96)
+            Width, Height = size[0] * 72 / 96, size[1] * 72 / 96
+
+        media = self.__package.add_part(_Part(self.__package.next_partname(f"/ppt/media/image%d.{ext}"), CT_IMAGES[ext], blob))
+        r_id = self.__part.relate_to(media, RT_IMAGE)
+        sp_tree = self.__part.element.find(f"{_qn('p:cSld')}/{_qn('p:spTree')}")
+        shape_id = max([ int(c_nv_pr.get("id", 0)) for c_nv_pr in sp_tree.iter(_qn("p:cNvPr")) ], default=0) + 1
+        x, y, cx, cy = [ str(round(value * EMU_PER_POINT)) for value in (Left, Top, Width, Height) ]
+
+        pic = ET.SubElement(sp_tree, _qn("p:pic"))
+        nv_pic_pr = ET.SubElement(pic, _qn("p:nvPicPr"))
+        ET.SubElement(nv_pic_pr, _qn("p:cNvPr"), { "id": str(shape_id), "name": f"Picture {shape_id - 1}" })
+        ET.SubElement(ET.SubElement(nv_pic_pr, _qn("p:cNvPicPr")), _qn("a:picLocks"), { "noChangeAspect": "1" })
+        ET.SubElement(nv_pic_pr, _qn("p:nvPr"))
+        blip_fill = ET.SubElement(pic, _qn("p:blipFill"))
+        ET.SubElement(blip_fill, _qn("a:blip"), { _qn("r:embed"): r_id })
+        ET.SubElement(ET.SubElement(blip_fill, _qn("a:stretch")), _qn("a:fillRect"))
+        sp_pr = ET.SubElement(pic, _qn("p:spPr"))
+        xfrm = ET.SubElement(sp_pr, _qn("a:xfrm"))
+        ET.SubElement(xfrm, _qn("a:off"), { "x": x, "y": y })
+        ET.SubElement(xfrm, _qn("a:ext"), { "cx": cx, "cy": cy })
+        ET.SubElement(ET.SubElement(sp_pr, _qn("a:prstGeom"), { "prst": "rect" }), _qn("a:avLst"))
+        self.__part.touch()
+        return Shape(self.__part, pic)
+
+
+class Shape():
+    def __init__(self, part, element):
+        self.__part = part
+        self.__element = element
+
+    @property
+    def element(self):
+        return self.__element
+
+    def _c_nv_pr(self):
+        return self.__element.find(f"*/{_qn('p:cNvPr')}")
+
+    def _xfrm(self):
+        if self.__element.tag == _qn("p:graphicFrame"):
+            return self.__element.find(_qn("p:xfrm"))
+        return self.__element.find(f"*/{_qn('a:xfrm')}")
+
+    def _xfrm_value(self, child, attr):
+        xfrm = self._xfrm()
+        item = xfrm.find(_qn(child)) if xfrm is not None else None
+        return int(item.get(attr)) / EMU_PER_POINT if item is not None else 0.0
+
+    @property
+    def Name(self):
+        c_nv_pr = self._c_nv_pr()
+        return c_nv_pr.get("name", "") if c_nv_pr is not None else ""
+
+    @Name.setter
+    def Name(self, name):
+        self._c_nv_pr().set("name", name)
+        self.__part.touch()
+
+    @property
+    def Left(self):
+        return self._xfrm_value("a:off", "x")
+
+    @property
+    def Top(self):
+        return self._xfrm_value("a:off", "y")
+
+    @property
+    def Width(self):
+        return self._xfrm_value("a:ext", "cx")
+
+    @property
+    def Height(self):
+        return self._xfrm_value("a:ext", "cy")
+
+    @property
+    def HasTextFrame(self):
+        return MSOTRUE if self.__element.tag == _qn("p:sp") else MSOFALSE
+
+    @property
+    def HasTable(self):
+        return MSOTRUE if self._tbl() is not None else MSOFALSE
+
+    def _tbl(self):
+        return self.__element.find(f"{_qn('a:graphic')}/{_qn('a:graphicData')}/{_qn('a:tbl')}")
+
+    @property
+    def TextFrame(self):
+        if not self.HasTextFrame == MSOTRUE:
+            raise com_error("Shape.TextFrame: This type of shape cannot have a TextFrame.")
+        return TextFrame(self.__part, self.__element, "p:txBody")
+
+    @property
+    def Table(self):
+        tbl = self._tbl()
+        if tbl is None:
+            raise com_error("Shape.Table: This shape does not have a table.")
+        return Table(self.__part, tbl, self)
+
+    def Delete(self):
+        for parent in self.__part.element.iter():
+            if self.__element in list(parent):
+                parent.remove(self.__element)
+                self.__part.touch()
+                return
+
+
+class TextFrame():
+    def __init__(self, part, owner, tag):
+        self.__part = part
+        self.__owner = owner
+        self.__tag = tag
+
+    @property
+    def HasText(self):
+        return MSOTRUE if self.TextRange.Text else MSOFALSE
+
+    @property
+    def TextRange(self):
+        return TextRange(self.__part, self.__owner, self.__tag)
+
+
+class TextRange():
+    def __init__(self, part, owner, tag):
+        self.__part = part
+        self.__owner = owner
+        self.__tag = tag
+
+    @property
+    def Text(self):
+        return _get_text(self.__owner.find(_qn(self.__tag)))
+
+    @Text.setter
+    def Text(self, text):
+        tx_body = self.__owner.find(_qn(self.__tag))
+        if tx_body is None:
+            tx_body = _new_tx_body(self.__tag)
+            # a:txBody precedes a:tcPr in cells; p:txBody is last in shapes
+            self.__owner.insert(0 if self.__tag == "a:txBody" else len(self.__owner), tx_body)
+        _set_text(tx_body, text)
+        self.__part.touch()
+
+
+class Table():
+    def __init__(self, part, tbl, parent):
+        self.__part = part
+        self.__tbl = tbl
+        self.__parent = parent
+
+    @property
+    def element(self):
+        return self.__tbl
+
+    @property
+    def part(self):
+        return self.__part
+
+    @property
+    def Parent(self):
+        return self.__parent
+
+    @property
+    def Rows(self):
+        return Rows(self)
+
+    @property
+    def Columns(self):
+        return Columns(self)
+
+    def _rows(self):
+        return self.__tbl.findall(_qn("a:tr"))
+
+    def read_all(self):
+        """
+        Returns text of every cell as a list of rows in a single pass
+        (native fast path for TableSnapshot)
+        """
+        return [ [ _get_text(tc.find(_qn("a:txBody"))) for tc in tr.iterfind(_qn("a:tc")) ]
+                 for tr in self._rows() ]
+
+    def write_all(self, cells):
+        """
+        Writes each (row, col, text) of cells in a single pass
+        (native fast path for tables.write_cells)
+        """
+        rows = self._rows()
+        row_cells = {}
+        for row, column, text in cells:
+            if row not in row_cells:
+                if not 1 <= row <= len(rows):
+                    raise _out_of_range("Table.Cell", (row, column))
+                row_cells[row] = rows[row - 1].findall(_qn("a:tc"))
+            if not 1 <= column <= len(row_cells[row]):
+                raise _out_of_range("Table.Cell", (row, column))
+            tc = row_cells[row][column - 1]
+            tx_body = tc.find(_qn("a:txBody"))
+            if tx_body is None:
+                tx_body = _new_tx_body("a:txBody")
+                tc.insert(0, tx_body)
+            _set_text(tx_body, text)
+        self.__part.touch()
+
+    def Cell(self, row, column):
+        rows = self._rows()
+        if not 1 <= row <= len(rows):
+            raise _out_of_range("Table.Cell", (row, column))
+        cells = rows[row - 1].findall(_qn("a:tc"))
+        if not 1 <= column <= len(cells):
+            raise _out_of_range("Table.Cell", (row, column))
+        return Cell(self.__part, cells[column - 1])
+
+
+class Rows():
+    def __init__(self, table):
+        self.__table = table
+
+    def __len__(self):
+        return len(self.__table._rows())
+
+    @property
+    def Count(self):
+        return len(self)
+
+    def Add(self, BeforeRow=-1):
+        """
+        Adds a row formatted like the last row
+        and returns it
+        """
+        rows = self.__table._rows()
+        new = copy.deepcopy(rows[-1])
+        for tc in new.iterfind(_qn("a:tc")):
+            tx_body = tc.find(_qn("a:txBody"))
+            if tx_body is not None:
+                _set_text(tx_body, "")
+        tbl = self.__table.element
+        anchor = rows[-1] if BeforeRow == -1 else rows[BeforeRow - 1]
+        pos = list(tbl).index(anchor) + (1 if BeforeRow == -1 else 0)
+        tbl.insert(pos, new)
+        self.__table.part.touch()
+        return new
+
+    def extend(self, count):
+        """
+        Appends count rows formatted like the last row at once
+        (native fast path for tables.ensure_rows)
+        """
+        rows = self.__table._rows()
+        blank = copy.deepcopy(rows[-1])
+        for tc in blank.iterfind(_qn("a:tc")):
+            tx_body = tc.find(_qn("a:txBody"))
+            if tx_body is not None:
+                _set_text(tx_body, "")
+        tbl = self.__table.element
+        pos = list(tbl).index(rows[-1]) + 1
+        for i in range(count):
+            tbl.insert(pos + i, copy.deepcopy(blank))
+        self.__table.part.touch()
+
+
+class Columns():
+    def __init__(self, table):
+        self.__table = table
+
+    def __len__(self):
+        grid = self.__table.element.find(_qn("a:tblGrid"))
+        return len(grid) if grid is not None else 0
+
+    @property
+    def Count(self):
+        return len(self)
+
+
+class Cell():
+    def __init__(self, part, tc):
+        self.__part = part
+        self.__tc = tc
+
+    @property
+    def Shape(self):
+        return _CellShape(self.__part, self.__tc)
+
+
+class _CellShape():
+    """
+    Shape of a table Cell, which only exposes its TextFrame
+    """
+    def __init__(self, part, tc):
+        self.__part = part
+        self.__tc = tc
+
+    @property
+    def HasTextFrame(self):
+        return MSOTRUE
+
+    @property
+    def TextFrame(self):
+        return TextFrame(self.__part, self.__tc, "a:txBody")
+
+
+# =======================
+# -- Backend --
+# =======================
+
+class OOXMLBackend(Backend):
+    """
+    Backend reading and writing .pptx files (Office Open XML) directly,
+    without PowerPoint
+    """
+    name = "ooxml"
+
+    def __init__(self):
+        self.clipboard = None
+
+    def open(self, path, with_window=True):
+        return Presentation(self, _Package.open(path), path)
+
+    def quit(self):
+        self.clipboard = None
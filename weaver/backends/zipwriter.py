@@ -0,0 +1,115 @@
+import os
+import time
+import zlib
+import struct
+import hashlib
+import zipfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# \\\\\\\\\\\\\\\\\\\\\\\\\\\\\\
+# *** GLOBAL CONSTANTS ****
+# //////////////////////////////
+
+# Media already compressed by their format, stored as they are
+STORED_EXTENSIONS = { ".png", ".jpg", ".jpeg", ".gif", ".mp4", ".m4a", ".mp3", ".wdp" }
+# Bytes of compressed media kept across the files written in this process
+CACHE_BYTES = 64 * 1024 * 1024
+# Threads compressing the entries of a file
+WORKERS = min(8, os.cpu_count() or 1)
+
+# Limits of zip files without ZIP64 extensions
+_MAX_ENTRIES = 0xFFFF
+_MAX_SIZE = 0xFFFFFFFF
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_OF_CENTRAL_DIR = struct.Struct("<IHHHHIIH")
+
+# (extension, sha1 of blob) -> (method, crc, data) of media compressed so far, least recently used first
+_cache = OrderedDict()
+_cache_bytes = 0
+_cache_lock = threading.Lock()
+
+
+def _compress(name, blob):
+    """
+    Returns (method, crc, data) of the entry name holding blob
+    """
+    crc = zlib.crc32(blob)
+    if os.path.splitext(name)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED, crc, blob
+    # Raw deflate stream, as zip entries hold no zlib header
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return zipfile.ZIP_DEFLATED, crc, compressor.compress(blob) + compressor.flush()
+
+
+def _compress_cached(name, blob, digest=None):
+    """
+    Returns _compress(name, blob), reusing the result for a blob compressed before;
+    digest is the sha1 of blob, if already known
+    """
+    global _cache_bytes
+    key = (os.path.splitext(name)[1].lower(), digest or hashlib.sha1(blob).digest())
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    result = _compress(name, blob)
+    with _cache_lock:
+        if key not in _cache:
+            _cache[key] = result
+            _cache_bytes += len(result[2])
+        while _cache_bytes > CACHE_BYTES and len(_cache) > 1:
+            _, (_, _, data) = _cache.popitem(last=False)
+            _cache_bytes -= len(data)
+    return result
+
+
+def _dos_time(timestamp):
+    """
+    Returns (time, date) of timestamp as stored in zip headers
+    """
+    t = time.localtime(timestamp)
+    return (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2), \
+           ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+
+
+def write_zip(path, entries):
+    """
+    Writes entries, a list of (name, blob, digest), to a zip file at path in order.
+    Entries are compressed in a pool of threads while those before them are written,
+    and those given the sha1 of their blob as digest (e.g. media; None otherwise)
+    are compressed only once per process.
+    Files beyond the limits of plain zip files are written by zipfile instead
+    """
+    if len(entries) > _MAX_ENTRIES or sum(len(blob) for _, blob, _ in entries) > _MAX_SIZE:
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as z:
+            for name, blob, _ in entries:
+                z.writestr(name, blob)
+        return
+
+    mod_time, mod_date = _dos_time(time.time())
+    central_dir = []
+    with open(path, "wb") as f, ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        futures = [ pool.submit(_compress_cached, name, blob, digest) if digest else pool.submit(_compress, name, blob)
+                    for name, blob, digest in entries ]
+        for (name, blob, _), future in zip(entries, futures):
+            method, crc, data = future.result()
+            encoded = name.encode("utf-8")
+            flags = 0 if encoded.isascii() else 0x800 # UTF-8 names
+            offset = f.tell()
+            f.write(_LOCAL_HEADER.pack(0x04034B50, 20, flags, method, mod_time, mod_date,
+                                       crc, len(data), len(blob), len(encoded), 0))
+            f.write(encoded)
+            f.write(data)
+            central_dir.append(_CENTRAL_HEADER.pack(0x02014B50, 20, 20, flags, method, mod_time, mod_date,
+                                                    crc, len(data), len(blob), len(encoded), 0, 0, 0, 0, 0, offset)
+                               + encoded)
+
+        start = f.tell()
+        for header in central_dir:
+            f.write(header)
+        f.write(_END_OF_CENTRAL_DIR.pack(0x06054B50, 0, 0, len(central_dir), len(central_dir),
+                                         f.tell() - start, start, 0))
@@ -0,0 +1,129 @@
+import os
+import io
+import csv
+import glob
+import time
+import traceback
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from weaver import weave_reports
+from backends import max_workers
+
+# Columns of a batch manifest (.csv); only conf_tools is required
+MANIFEST_FIELDS = ["conf_tools", "output_dir", "date", "filename", "simulation_dir", "if_exists", "image_dir"]
+
+
+def read_manifest(path):
+    """
+    Reads a .csv manifest with a header row of MANIFEST_FIELDS
+    and returns a list of job dicts.
+    Relative paths are resolved against the directory of the manifest
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            job = { field: (row.get(field) or "").strip() for field in MANIFEST_FIELDS }
+            if not job["conf_tools"]:
+                continue
+            for field in ["conf_tools", "output_dir", "simulation_dir", "image_dir"]:
+                if job[field]:
+                    job[field] = os.path.join(base_dir, job[field])
+            jobs.append(job)
+    return jobs
+
+
+def glob_jobs(pattern, output_dir="", date="", simulation_dir="", filename="", if_exists="", image_dir=""):
+    """
+    Returns a job dict for every confirmation tools file matching pattern,
+    each saving its reports to a folder of output_dir named after the file
+    """
+    jobs = []
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        jobs.append({
+            "conf_tools": os.path.abspath(path),
+            "output_dir": os.path.join(output_dir, stem) if output_dir else "",
+            "date": date,
+            "filename": filename,
+            "simulation_dir": simulation_dir,
+            "if_exists": if_exists,
+            "image_dir": image_dir,
+        })
+    return jobs
+
+
+def run_job(job, backend_name="", backend=None, incremental=False):
+    """
+    Weaves the reports of a single job and returns a result dict,
+    with backend if given and only as needed if incremental (see weave_reports).
+    Output of the job is written to a .log file next to its reports
+    """
+    result = { "conf_tools": job["conf_tools"], "ok": False, "reports": [], "seconds": 0.0, "error": "" }
+    params = { field: job.get(field, "") for field in ["date", "output_dir", "filename", "if_exists", "image_dir"] }
+    log = io.StringIO()
+    start = time.perf_counter()
+    try:
+        if not job["output_dir"]:
+            raise ValueError("No output directory given")
+        if not job["date"]:
+            raise ValueError("No report date given")
+        with redirect_stdout(log):
+            result["reports"] = weave_reports(job["conf_tools"], job["simulation_dir"], backend_name, params,
+                                              backend=backend, incremental=incremental)
+        result["ok"] = True
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        log.write(traceback.format_exc())
+    result["seconds"] = time.perf_counter() - start
+
+    if job["output_dir"]:
+        os.makedirs(job["output_dir"], exist_ok=True)
+        stem = os.path.splitext(os.path.basename(job["conf_tools"]))[0]
+        with open(os.path.join(job["output_dir"], f"{stem}.log"), "w", encoding="utf-8") as f:
+            f.write(log.getvalue())
+    return result
+
+
+def run_batch(jobs, workers=1, backend_name="", incremental=False):
+    """
+    Runs jobs in a pool of at most workers processes
+    and returns their results in the order of jobs
+    """
+    workers = max_workers(workers, backend_name)
+    if workers <= 1:
+        return [ run_job(job, backend_name, incremental=incremental) for job in jobs ]
+
+    results = [ None ] * len(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = { pool.submit(run_job, job, backend_name, None, incremental): i for i, job in enumerate(jobs) }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            # e.g. a worker process died
+            except Exception as e:
+                results[i] = { "conf_tools": jobs[i]["conf_tools"], "ok": False, "reports": [],
+                               "seconds": 0.0, "error": f"{type(e).__name__}: {e}" }
+            status = "OK" if results[i]["ok"] else "FAILED"
+            print(f"[{sum(r is not None for r in results)}/{len(jobs)}] {status}: {jobs[i]['conf_tools']}")
+    return results
+
+
+def print_summary(results, wall_time=None):
+    """
+    Prints a table of successes, failures and timings
+    """
+    name_width = max([ len(os.path.basename(r["conf_tools"])) for r in results ] + [ 18 ])
+    print()
+    print(f"{'CONFIRMATION TOOLS':<{name_width}}  {'STATUS':<6}  {'REPORTS':>7}  {'TIME [s]':>8}  ERROR")
+    for r in results:
+        status = "OK" if r["ok"] else "FAILED"
+        print(f"{os.path.basename(r['conf_tools']):<{name_width}}  {status:<6}  {len(r['reports']):>7}  "
+              f"{r['seconds']:>8.1f}  {r['error']}")
+    succeeded = sum(r["ok"] for r in results)
+    print()
+    print(f"SUCCEEDED: {succeeded}  FAILED: {len(results) - succeeded}  "
+          f"REPORTS: {sum(len(r['reports']) for r in results)}  "
+          f"TOTAL TIME: {sum(r['seconds'] for r in results):.1f} s", end="")
+    print(f"  WALL TIME: {wall_time:.1f} s" if wall_time is not None else "")
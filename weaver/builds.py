@@ -0,0 +1,192 @@
+import os
+import json
+import hashlib
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+
+from datetime import date
+from cache import file_digest, _write_atomic, EXTRACTOR_VERSION
+from images import ImageDir
+
+# Bump whenever reports are built differently from the same inputs,
+# so that reports of previous versions are rebuilt
+BUILD_VERSION = 2
+# Record of the reports built in an output directory
+BUILD_LOG = ".weaver-builds.json"
+
+_NS = {
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+
+
+def _rels_name(partname):
+    """
+    Returns name of the relationships part of partname
+    """
+    folder, name = posixpath.split(partname)
+    return posixpath.join(folder, "_rels", f"{name}.rels")
+
+
+def _related(package, partname):
+    """
+    Returns names of the parts within package that partname relates to
+    """
+    rels_name = _rels_name(partname)
+    if rels_name not in package.namelist():
+        return []
+    targets = []
+    for rel in ET.fromstring(package.read(rels_name)).iterfind("rel:Relationship", _NS):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target")
+        if target.startswith("/"):
+            targets.append(target[1:])
+        else:
+            targets.append(posixpath.normpath(posixpath.join(posixpath.dirname(partname), target)))
+    return targets
+
+
+def slide_digests(path):
+    """
+    Returns sha256 of every slide of the .pptx file at path, in slide order,
+    covering the slide along with the parts it relates to (e.g. images and its layout);
+    or an empty list if path is not a .pptx file
+    """
+    if not zipfile.is_zipfile(path):
+        return []
+    digests = []
+    with zipfile.ZipFile(path) as package:
+        names = set(package.namelist())
+        targets = { rel.get("Id"): rel.get("Target")
+                    for rel in ET.fromstring(package.read("ppt/_rels/presentation.xml.rels")).iterfind("rel:Relationship", _NS) }
+        presentation = ET.fromstring(package.read("ppt/presentation.xml"))
+        for sld_id in presentation.iterfind("p:sldIdLst/p:sldId", _NS):
+            partname = posixpath.normpath(posixpath.join("ppt", targets[sld_id.get(f"{{{_NS['r']}}}id")]))
+            sha = hashlib.sha256(package.read(partname))
+            for related in [ _rels_name(partname) ] + sorted(_related(package, partname)):
+                if related in names:
+                    sha.update(related.encode("utf-8"))
+                    sha.update(package.read(related))
+            digests.append(sha.hexdigest())
+    return digests
+
+
+def _plain(value):
+    """
+    Returns value (e.g. an Interface) as JSON-serializable data
+    """
+    if isinstance(value, (list, tuple)):
+        return [ _plain(v) for v in value ]
+    if isinstance(value, dict):
+        return { str(k): _plain(v) for k, v in value.items() }
+    if hasattr(value, "__dict__"):
+        return { k: _plain(v) for k, v in sorted(vars(value).items()) }
+    return value
+
+
+def fingerprint(conf_tools, slides, template_path, params, data=None, cache_dir=""):
+    """
+    Returns digest of everything a report is built from:
+    slides (numbers) of conf_tools, its TOC, the template at template_path,
+    the params affecting its contents (including the images of their image directory)
+    and data read elsewhere (e.g. an Interface).
+    Returns "" if the slides of conf_tools cannot be told apart
+    """
+    if conf_tools.cache is None:
+        return ""
+    digests = conf_tools.slide_digests()
+    # Any change to a file whose slides cannot be read on their own affects all of its reports
+    sources = { num: digests[num - 1] if 0 < num <= len(digests) else conf_tools.cache.digest for num in slides }
+    report_date = params.get("date", "")
+    if report_date == "today":
+        report_date = date.today().isoformat()
+    parts = {
+        "version": [ BUILD_VERSION, EXTRACTOR_VERSION ],
+        "slides": sources,
+        "toc": conf_tools.get_toc(),
+        "template": file_digest(template_path, cache_dir),
+        "params": { "date": report_date, "filename": params.get("filename", "") },
+        "data": _plain(data),
+    }
+    if params.get("image_dir"):
+        parts["images"] = ImageDir(params["image_dir"]).digest()
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class BuildLog():
+    """
+    Record of the reports built in an output directory,
+    each under a key (e.g. report type and interface) with the fingerprint of its inputs,
+    the path it was saved to and the digests of the texts rendered therein
+    (see SimulationReport.rendered)
+    """
+    def __init__(self, output_dir):
+        self.__path = os.path.join(os.path.abspath(output_dir), BUILD_LOG)
+        self.__modified = False
+        try:
+            with open(self.__path, "r", encoding="utf-8") as f:
+                self.__entries = json.load(f)
+        except (OSError, ValueError):
+            self.__entries = {}
+
+    @property
+    def path(self):
+        return self.__path
+
+    def current(self, key, fingerprint):
+        """
+        Returns path of the report built under key from inputs of fingerprint,
+        or "" if it is to be built (again)
+        """
+        entry = self.__entries.get(key)
+        if not fingerprint or not entry or entry["fingerprint"] != fingerprint:
+            return ""
+        return entry["path"] if os.path.isfile(entry["path"]) else ""
+
+    def recorded(self, key):
+        """
+        Returns path of the report last built under key, whatever its inputs,
+        or "" if none is there
+        """
+        entry = self.__entries.get(key)
+        return entry["path"] if entry and os.path.isfile(entry["path"]) else ""
+
+    def rendered(self, path):
+        """
+        Returns digests of the texts rendered in the report saved to path,
+        or None if it is not recorded
+        """
+        path = os.path.abspath(path)
+        entry = next((entry for entry in self.__entries.values() if entry["path"] == path), None)
+        return None if entry is None else entry.get("rendered")
+
+    def record(self, key, fingerprint, path, rendered=None):
+        """
+        Records report built under key from inputs of fingerprint ("" if unknown, i.e. to be built again
+        if incremental) and saved to path, with the digests of the texts rendered therein
+        """
+        if not path:
+            return
+        self.__entries[key] = { "fingerprint": fingerprint, "path": os.path.abspath(path),
+                                "rendered": rendered or {} }
+        self.__modified = True
+
+    def record_update(self, key, path, rendered):
+        """
+        Records the digests of the texts rendered in the report of key saved to path
+        when updated in place, keeping the fingerprint it was built from
+        """
+        entry = self.__entries.get(key)
+        fingerprint = entry["fingerprint"] if entry and entry["path"] == os.path.abspath(path) else ""
+        self.record(key, fingerprint, path, rendered)
+
+    def save(self):
+        """
+        Writes the log if any report was recorded
+        """
+        if self.__modified:
+            _write_atomic(self.__path, json.dumps(self.__entries, indent=1).encode("utf-8"))
+            self.__modified = False
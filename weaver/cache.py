@@ -0,0 +1,181 @@
+import os
+import re
+import json
+import pickle
+import hashlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows locks files through msvcrt instead
+    fcntl = None
+    import msvcrt
+
+# Bump whenever extraction from confirmation tools changes,
+# so that results of previous versions are not reused
+EXTRACTOR_VERSION = 3
+# Name of the files of ExtractionCache: digest of the file extracted from, EXTRACTOR_VERSION
+EXTRACTION_FILE = re.compile(r"extract-([0-9a-f]+)-v(\d+)\.pickle")
+# Cache directories pruned by this process (see prune)
+_pruned = set()
+
+
+def file_digest(path, cache_dir=""):
+    """
+    Returns the sha256 of the contents of path.
+    If cache_dir is given, digests are memoized there by path, size and mtime
+    so unchanged files are not read again
+    """
+    return file_digests([ path ], cache_dir)[0]
+
+
+def file_digests(paths, cache_dir=""):
+    """
+    Returns list of the sha256 of the contents of each of paths (see file_digest),
+    reading and writing the memo in cache_dir once for all of them.
+    The memo is shared by processes: digests computed here are merged into it as it is
+    when written, under a lock, and those of files no longer there are dropped
+    """
+    memo_path = os.path.join(cache_dir, "digests.json") if cache_dir else ""
+    memo = _read_memo(memo_path) if memo_path else {}
+
+    digests = []
+    computed = {}
+    for path in paths:
+        stat = os.stat(path)
+        path = os.path.abspath(path)
+        stamp = [ stat.st_size, stat.st_mtime_ns ]
+        if path in memo and memo[path][:2] == stamp:
+            digests.append(memo[path][2])
+            continue
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                sha.update(chunk)
+        computed[path] = stamp + [ sha.hexdigest() ]
+        digests.append(computed[path][2])
+
+    if memo_path and computed:
+        with _locked(memo_path):
+            memo = _read_memo(memo_path)
+            memo.update(computed)
+            memo = { path: entry for path, entry in memo.items() if os.path.exists(path) }
+            _write_atomic(memo_path, json.dumps(memo).encode("utf-8"))
+    return digests
+
+
+def _read_memo(memo_path):
+    try:
+        with open(memo_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@contextmanager
+def _locked(path):
+    """
+    Holds an exclusive lock on path (through a lock file beside it) until exited,
+    e.g. while reading, merging into and writing a file shared by processes
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.lock", "a+b") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def prune(cache_dir):
+    """
+    Removes the files of ExtractionCache in cache_dir made by previous EXTRACTOR_VERSIONs,
+    or extracted from contents no longer digested (e.g. files since edited or deleted; see file_digests).
+    Returns number of files removed
+    """
+    with _locked(os.path.join(cache_dir, "digests.json")):
+        digests = { entry[2] for entry in _read_memo(os.path.join(cache_dir, "digests.json")).values() }
+        removed = 0
+        for name in os.listdir(cache_dir):
+            match = EXTRACTION_FILE.fullmatch(name)
+            if match and (int(match.group(2)) != EXTRACTOR_VERSION or match.group(1) not in digests):
+                try:
+                    os.remove(os.path.join(cache_dir, name))
+                    removed += 1
+                except OSError:
+                    pass
+    return removed
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ExtractionCache():
+    """
+    Persistent store of data extracted from a file,
+    keyed on the file's content hash and EXTRACTOR_VERSION.
+    Values are pickled when set, so later changes to them are not cached
+    """
+    def __init__(self, path, cache_dir):
+        self.__cache_dir = cache_dir
+        self.__digest = file_digest(path, cache_dir)
+        self.__path = os.path.join(cache_dir, f"extract-{self.__digest}-v{EXTRACTOR_VERSION}.pickle")
+        self.__modified = False
+        try:
+            with open(self.__path, "rb") as f:
+                self.__entries = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            self.__entries = {}
+
+    @property
+    def digest(self):
+        return self.__digest
+
+    def __contains__(self, name):
+        return name in self.__entries
+
+    def get(self, name, default=None):
+        """
+        Returns a fresh copy of the value stored under name
+        """
+        if name not in self.__entries:
+            return default
+        return pickle.loads(self.__entries[name])
+
+    def set(self, name, value):
+        self.__entries[name] = pickle.dumps(value)
+        self.__modified = True
+
+    def fetch(self, name, extract):
+        """
+        Returns value stored under name, calling extract to produce it if missing
+        """
+        if name not in self.__entries:
+            self.set(name, extract())
+        return self.get(name)
+
+    def save(self):
+        """
+        Writes the cache file if any value was added,
+        and the first time in this process, prunes those of cache_dir (see prune)
+        """
+        if self.__modified:
+            _write_atomic(self.__path, pickle.dumps(self.__entries))
+            self.__modified = False
+            if self.__cache_dir not in _pruned:
+                _pruned.add(self.__cache_dir)
+                prune(self.__cache_dir)
@@ -0,0 +1,207 @@
+import os
+import json
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+import tracing
+from render import RenderPlan
+from weaver import _load_template_paths, keep_templates, release_templates
+from backends import get_backend
+from batch import run_job, MANIFEST_FIELDS
+
+# Socket the daemon listens on unless another is given
+SOCKET_PATH = os.getenv("WEAVER_SOCKET", os.path.join(os.path.expanduser("~"), ".weaver", "weaver.sock"))
+
+
+class Daemon():
+    """
+    Long-lived process building the reports of jobs received on a local Unix socket.
+    The backend (e.g. PowerPoint) is started, and the templates loaded, once for all jobs;
+    templates are kept open where the backend allows, and opened again only once changed.
+    Jobs are run one at a time in the thread that started the backend, as COM requires,
+    while connections are served in threads of their own.
+
+    Requests and replies are JSON objects, one per line:
+        { "command": "job", <MANIFEST_FIELDS>, "incremental": bool } -> result of batch.run_job
+        { "command": "ping" } -> { "ok": true }
+        { "command": "stats" } -> { "ok": true, "jobs": ..., "failed": ..., "seconds": ..., "uptime": ... }
+        { "command": "shutdown" } -> { "ok": true }, shutting down after the jobs queued so far
+    """
+    def __init__(self, socket_path="", backend_name=""):
+        self.__socket_path = socket_path or SOCKET_PATH
+        self.__backend_name = backend_name
+        self.__jobs = queue.Queue() # (request, queue for its reply)
+        self.__stats = { "jobs": 0, "failed": 0, "seconds": 0.0 }
+        self.__started = time.time()
+        self.__warm = False # Render plans of the templates compiled
+
+    @property
+    def socket_path(self):
+        return self.__socket_path
+
+    def serve(self, ready=None):
+        """
+        Starts the backend, then runs the jobs received on the socket until shut down.
+        ready (a threading.Event) is set once the socket accepts connections
+        """
+        if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+            raise OSError("Unix sockets are not supported on this platform")
+        self.__claim_socket()
+
+        backend = tracing.wrap_backend(get_backend(self.__backend_name))
+        server = None
+        try:
+            self.__warm_up(backend)
+            server = socketserver.ThreadingUnixStreamServer(self.__socket_path, _Handler)
+            server.daemon_threads = True
+            server.weaver_daemon = self
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            print(f"Weaver daemon listening on {self.__socket_path}")
+            if ready is not None:
+                ready.set()
+
+            while True:
+                request, reply = self.__jobs.get()
+                if request is None:
+                    break
+                reply.put(self.__run(request, backend))
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+            if os.path.exists(self.__socket_path):
+                os.remove(self.__socket_path)
+            release_templates()
+            backend.quit()
+        print("Weaver daemon shut down.")
+
+    def respond(self, request):
+        """
+        Returns reply to request; called from the thread of a connection
+        """
+        command = request.get("command", "job")
+        if command == "ping":
+            return { "ok": True }
+        if command == "stats":
+            return dict(self.__stats, ok=True, uptime=time.time() - self.__started)
+        if command == "shutdown":
+            return { "ok": True } # Shut down once replied (see _Handler)
+        if command != "job":
+            return { "ok": False, "error": f"Unknown command {command}" }
+        # Jobs are queued for the thread holding the backend
+        reply = queue.Queue(maxsize=1)
+        self.__jobs.put((request, reply))
+        return reply.get()
+
+    def shutdown(self):
+        """
+        Stops serving once the jobs queued so far are done
+        """
+        self.__jobs.put((None, None))
+
+    def __run(self, request, backend):
+        """
+        Runs job of request with backend and returns its result
+        """
+        job = { field: str(request.get(field) or "") for field in MANIFEST_FIELDS }
+        if not job["conf_tools"]:
+            return { "ok": False, "error": "No confirmation tools given" }
+        self.__warm_up(backend)
+        result = run_job(job, backend=backend, incremental=bool(request.get("incremental")))
+        self.__stats["jobs"] += 1
+        self.__stats["failed"] += not result["ok"]
+        self.__stats["seconds"] += result["seconds"]
+        status = "OK" if result["ok"] else "FAILED"
+        print(f"[{self.__stats['jobs']}] {status}: {job['conf_tools']} ({result['seconds']:.1f} s)")
+        return result
+
+    def __warm_up(self, backend):
+        """
+        Loads the templates, along with their render plans, keeping them open for the jobs
+        (see weaver.keep_templates); templates changed since are opened again.
+        Templates a backend cannot keep open (e.g. PowerPoint) are opened once for their plans
+        """
+        file_path = os.getenv("TEMP_PATH")
+        if not file_path or not os.path.isfile(file_path):
+            return
+        kept = keep_templates(backend, file_path)
+        for pptx in kept:
+            RenderPlan.of(pptx)
+        if self.__warm:
+            return
+        kept = { pptx.FullName for pptx in kept }
+        for path in _load_template_paths(file_path).values():
+            if path and os.path.isfile(path) and os.path.abspath(path) not in kept:
+                pptx = backend.open(path, with_window=False)
+                try:
+                    RenderPlan.of(pptx)
+                finally:
+                    pptx.Close()
+        self.__warm = True
+
+    def __claim_socket(self):
+        """
+        Removes socket file left by a daemon no longer running;
+        raises if one is
+        """
+        if os.path.exists(self.__socket_path):
+            try:
+                request({ "command": "ping" }, self.__socket_path)
+            except OSError:
+                os.remove(self.__socket_path)
+            else:
+                raise RuntimeError(f"A daemon is already listening on {self.__socket_path}")
+        os.makedirs(os.path.dirname(os.path.abspath(self.__socket_path)), exist_ok=True)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """
+    Replies to each request line of a connection in turn
+    """
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            message = {}
+            try:
+                message = json.loads(line)
+                if not isinstance(message, dict):
+                    raise ValueError("Request is not an object")
+                reply = self.server.weaver_daemon.respond(message)
+            except ValueError as e:
+                reply = { "ok": False, "error": f"Invalid request: {e}" }
+            self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            if reply.get("ok") and message.get("command") == "shutdown":
+                self.server.weaver_daemon.shutdown()
+
+
+def submit(requests, socket_path=""):
+    """
+    Sends requests (dicts; see Daemon) over a single connection to the daemon
+    and yields their replies in order
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path or SOCKET_PATH)
+        with sock.makefile("rwb") as f:
+            for message in requests:
+                f.write((json.dumps(message) + "\n").encode("utf-8"))
+                f.flush()
+                line = f.readline()
+                if not line:
+                    raise ConnectionError("Daemon closed the connection")
+                yield json.loads(line)
+
+
+def request(message, socket_path=""):
+    """
+    Sends a single request to the daemon and returns its reply
+    """
+    replies = submit([ message ], socket_path)
+    try:
+        return next(replies)
+    finally:
+        replies.close()
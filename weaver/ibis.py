@@ -0,0 +1,119 @@
+import os
+import re
+import mmap
+from functools import lru_cache
+
+# Keyword lines, e.g. "[Component] ABC123", at the start of a line
+KEYWORD = re.compile(rb"^[ \t]*\[([^\]\r\n]+)\][ \t]*([^\r\n]*)", re.M)
+
+
+def _normalize_keyword(keyword):
+    """
+    Keywords are case-insensitive and treat spaces and underscores alike
+    """
+    return re.sub(r"[\s_]+", " ", keyword.strip().lower())
+
+
+class Component():
+    def __init__(self, name):
+        self.name = name
+        # pin_name -> (signal_name, model_name)
+        self.pins = {}
+
+    def model_for(self, signal_name="", pin_name=""):
+        """
+        Returns name of the model connected to a pin, looked up by pin or signal name
+        """
+        if pin_name and pin_name in self.pins:
+            return self.pins[pin_name][1]
+        signal_name = signal_name.strip().lower()
+        for signal, model in self.pins.values():
+            if signal.lower() == signal_name:
+                return model
+        return ""
+
+
+class IbisFile():
+    """
+    [Component], [Pin] and [Model] data of an IBIS (.ibs) file.
+
+    The file is memory-mapped and scanned for keyword lines;
+    only the bodies of the sections of interest are decoded,
+    so the (often very large) waveform tables are never read into memory.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.components = {}
+        self.models = {} # model name -> Model_type
+        self.selectors = {} # [Model Selector] name -> list of model names
+        self._parse()
+
+    def _parse(self):
+        if not os.path.getsize(self.path):
+            return
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            comment_char = "|"
+            component = None
+            matches = KEYWORD.finditer(mm)
+            match = next(matches, None)
+            while match:
+                following = next(matches, None)
+                keyword = _normalize_keyword(match.group(1).decode("latin-1"))
+                arg = match.group(2).decode("latin-1").split(comment_char)[0].strip()
+                end = following.start() if following else len(mm)
+
+                if keyword == "comment char" and arg:
+                    comment_char = arg[0]
+                elif keyword == "component":
+                    component = Component(arg)
+                    self.components[arg] = component
+                elif keyword == "pin" and component is not None:
+                    for row in self._rows(mm[match.end():end], comment_char):
+                        if len(row) >= 3:
+                            component.pins[row[0]] = (row[1], row[2])
+                elif keyword == "model":
+                    self.models[arg] = ""
+                    for row in self._rows(mm[match.end():end], comment_char):
+                        if row[0].lower() == "model_type" and len(row) > 1:
+                            self.models[arg] = row[1]
+                            break
+                elif keyword == "model selector":
+                    self.selectors[arg] = [ row[0] for row in self._rows(mm[match.end():end], comment_char) ]
+                match = following
+
+    @staticmethod
+    def _rows(body, comment_char):
+        """
+        Yields whitespace-separated fields of the non-comment lines in body
+        """
+        for line in body.decode("latin-1").splitlines():
+            line = line.split(comment_char)[0].strip()
+            if line:
+                yield line.split()
+
+    def buffer_model(self, signal_name="", part_name="", pin_name=""):
+        """
+        Returns name of the buffer model driving signal_name (or pin_name)
+        of the component matching part_name (any if omitted), or "" if not found
+        """
+        components = list(self.components.values())
+        if part_name:
+            components = [ c for c in components if c.name.lower().find(part_name.lower()) > -1 ]
+        for component in components:
+            model = component.model_for(signal_name, pin_name)
+            if model:
+                return model
+        return ""
+
+
+@lru_cache(maxsize=32)
+def _load(path, mtime, size):
+    return IbisFile(path)
+
+
+def load(path):
+    """
+    Returns IbisFile for path, reusing files already parsed during this run
+    """
+    stat = os.stat(path)
+    return _load(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
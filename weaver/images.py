@@ -0,0 +1,246 @@
+import os
+import io
+import re
+import math
+import json
+import struct
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from util import get_cache_dir
+from cache import file_digests, _write_atomic
+
+try:
+    from PIL import Image
+except ImportError:
+    # Pillow is optional;
+    # without it, images are placed at their full size
+    Image = None
+
+# \\\\\\\\\\\\\\\\\\\\\\\\\\\\\\
+# *** GLOBAL CONSTANTS ****
+# //////////////////////////////
+
+IMAGE_EXTENSIONS = { ".png", ".jpg", ".jpeg", ".gif", ".bmp" }
+# Text of the template shapes images are placed in
+IMAGE_PLACEHOLDER = "<IMAGE>"
+# Resolution images are scaled to for the box they are placed in
+IMAGE_DPI = 150
+# Processes scaling images at once
+WORKERS = min(4, os.cpu_count() or 1)
+
+_JPEG_SOF = { 0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF }
+
+
+def _tokens(text):
+    """
+    Returns the words of text (e.g. a filename) in lowercase,
+    split at anything other than letters and digits
+    """
+    return [ token for token in re.split(r"[^0-9a-z]+", text.lower()) if token ]
+
+
+def _contains(tokens, words):
+    """
+    Checks if words appear in tokens, one after another
+    """
+    n = len(words)
+    return n > 0 and any(tokens[i:i + n] == words for i in range(len(tokens) - n + 1))
+
+
+class ImageDir():
+    """
+    Images found in a directory and its subfolders, matched to the items of a report
+    (e.g. an interface and signal) by the words of their paths relative to the directory:
+    DDR4_DQ0_eye.png and DDR4/DQ0/eye.png are both matched by ["DDR4", "DQ0"],
+    but neither by ["DDR4", "DQ1"] nor ["DDR4", "DQ"]
+    """
+    def __init__(self, image_dir):
+        self.__image_dir = os.path.abspath(image_dir)
+        if not os.path.isdir(self.__image_dir):
+            raise FileNotFoundError(f"Image directory {image_dir} not found")
+        self.__images = [] # (path, tokens of its relative path)
+        for root, folders, files in os.walk(self.__image_dir):
+            folders.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                    path = os.path.join(root, name)
+                    rel = os.path.splitext(os.path.relpath(path, self.__image_dir))[0]
+                    self.__images.append((path, _tokens(rel)))
+
+    @property
+    def image_dir(self):
+        return self.__image_dir
+
+    def __len__(self):
+        return len(self.__images)
+
+    def match(self, names):
+        """
+        Returns paths of the images matched by every one of names, in path order
+        """
+        words = [ _tokens(name) for name in names ]
+        if not words or not all(words):
+            return []
+        return [ path for path, tokens in self.__images if all(_contains(tokens, w) for w in words) ]
+
+    def digest(self):
+        """
+        Returns digest of the paths, sizes and modification times of the images
+        """
+        stamps = []
+        for path, _ in self.__images:
+            stat = os.stat(path)
+            stamps.append([ os.path.relpath(path, self.__image_dir), stat.st_size, stat.st_mtime_ns ])
+        return hashlib.sha256(json.dumps(stamps).encode("utf-8")).hexdigest()
+
+
+def image_size(path):
+    """
+    Returns (width, height) in pixels of the image at path,
+    or None if it cannot be told (e.g. without Pillow, of a format other than PNG, JPEG, GIF and BMP)
+    """
+    if Image is not None:
+        try:
+            with Image.open(path) as image:
+                return image.size
+        except OSError:
+            return None
+    with open(path, "rb") as f:
+        head = f.read(26)
+        if head[:8] == b"\x89PNG\r\n\x1a\n":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:2] == b"BM":
+            width, height = struct.unpack("<ii", head[18:26])
+            return width, abs(height)
+        if head[:2] == b"\xff\xd8":
+            # Size is given by the first start of frame segment
+            f.seek(2)
+            while True:
+                marker = f.read(4)
+                if len(marker) < 4 or marker[0] != 0xFF:
+                    return None
+                length = struct.unpack(">H", marker[2:])[0]
+                if marker[1] in _JPEG_SOF:
+                    height, width = struct.unpack(">xHH", f.read(5))
+                    return width, height
+                f.seek(length - 2, os.SEEK_CUR)
+    return None
+
+
+def box_pixels(width, height, dpi=IMAGE_DPI):
+    """
+    Returns (width, height) in pixels of a box of width and height in points at dpi
+    """
+    return max(1, round(width * dpi / 72)), max(1, round(height * dpi / 72))
+
+
+def tile(box, count):
+    """
+    Returns count boxes (left, top, width, height) side by side,
+    filling box from left to right
+    """
+    left, top, width, height = box
+    return [ (left + i * width / count, top, width / count, height) for i in range(count) ]
+
+
+def fit(box, size):
+    """
+    Returns (left, top, width, height) of an image of size (in pixels; None if unknown)
+    scaled to fit box while keeping its aspect ratio, centered therein
+    """
+    left, top, width, height = box
+    if not size or not all(size):
+        return box
+    scale = min(width / size[0], height / size[1])
+    w, h = size[0] * scale, size[1] * scale
+    return left + (width - w) / 2, top + (height - h) / 2, w, h
+
+
+def spread(paths, boxes):
+    """
+    Returns list of (path, box) placing paths across boxes in order,
+    each box holding an equal share of them side by side
+    """
+    if not paths or not boxes:
+        return []
+    share = math.ceil(len(paths) / len(boxes))
+    placed = []
+    for i, box in enumerate(boxes):
+        chunk = paths[i * share:(i + 1) * share]
+        placed += list(zip(chunk, tile(box, len(chunk)))) if chunk else []
+    return placed
+
+
+def _scale(path, size, scaled_path):
+    """
+    Writes the image at path to scaled_path, downsampled to fit within size (in pixels)
+    unless already smaller; run in a worker process
+    """
+    jpeg = scaled_path.endswith(".jpg")
+    with Image.open(path) as image:
+        if image.width <= size[0] and image.height <= size[1] and image.format == ("JPEG" if jpeg else "PNG"):
+            with open(path, "rb") as f:
+                _write_atomic(scaled_path, f.read())
+            return
+        resample = getattr(Image, "Resampling", Image).LANCZOS
+        image.thumbnail(size, resample)
+        buffer = io.BytesIO()
+        if jpeg:
+            image.convert("RGB").save(buffer, "JPEG", quality=90)
+        else:
+            image.save(buffer, "PNG")
+    _write_atomic(scaled_path, buffer.getvalue())
+
+
+def warn_unscaled(image_dirs):
+    """
+    Warns if any of image_dirs is given (e.g. with -i) while Pillow is not installed,
+    as images are then placed at their full size; returns whether it did
+    """
+    if Image is None and any(image_dirs):
+        print("WARNING: Pillow not installed, images are placed without scaling "
+              "(pip install -e \"weaver[images]\" to install it).")
+        return True
+    return False
+
+
+def scale_images(jobs, cache_dir="", workers=WORKERS):
+    """
+    Returns paths of the images of jobs, a list of (path, (width, height) in pixels),
+    each downsampled to fit within its size, in order.
+    Scaled images are cached by the content hash of the image and size,
+    so only those not scaled before are, in a pool of up to workers processes.
+    Without Pillow, the images are returned as they are
+    """
+    if Image is None:
+        if jobs:
+            print("Pillow not installed, images placed without scaling.")
+        return [ path for path, _ in jobs ]
+
+    cache_dir = cache_dir or get_cache_dir()
+    scaled, missing = [], {}
+    digests = file_digests([ path for path, _ in jobs ], cache_dir)
+    for (path, size), digest in zip(jobs, digests):
+        ext = ".jpg" if os.path.splitext(path)[1].lower() in (".jpg", ".jpeg") else ".png"
+        scaled_path = os.path.join(cache_dir, "images", f"{digest}-{size[0]}x{size[1]}{ext}")
+        if not os.path.isfile(scaled_path):
+            missing[scaled_path] = (path, size)
+        scaled.append(scaled_path)
+
+    if missing:
+        print(f"Scaling {len(missing)} of {len(jobs)} images...")
+        # Processes already working for a pool (e.g. SI reports built in parallel) scale their own
+        if workers > 1 and len(missing) > 1 and multiprocessing.parent_process() is None:
+            with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as pool:
+                futures = [ pool.submit(_scale, path, size, scaled_path)
+                            for scaled_path, (path, size) in missing.items() ]
+                for future in futures:
+                    future.result()
+        else:
+            for scaled_path, (path, size) in missing.items():
+                _scale(path, size, scaled_path)
+    return scaled
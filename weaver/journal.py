@@ -0,0 +1,117 @@
+from collections import Counter
+
+from tables import write_cells
+
+
+class WriteJournal():
+    """
+    Texts written to shapes and table cells of a presentation during a build,
+    applied in one pass per slide instead of as they are made.
+    Writes are keyed by slide (SlideID), shape (z-order) and cell (row, col; 0 for none),
+    so that a write superseded by a later one to the same target is never made,
+    and one leaving the text of its target as it was is dropped altogether
+    """
+    def __init__(self):
+        # SlideID -> { (shape index, row, col): [target, text, old text] }, in order of first write
+        self.__slides = {}
+        # Writes applied so far, as (SlideID, shape index, row, col, text)
+        self.__changes = []
+        self.__counts = Counter()
+
+    def __len__(self):
+        return sum(len(writes) for writes in self.__slides.values())
+
+    @property
+    def counts(self):
+        """
+        Returns Counter of writes "recorded", "dropped" (no-op), "superseded" and "applied"
+        """
+        return Counter(self.__counts)
+
+    def changes(self):
+        """
+        Returns list of (SlideID, shape index, row, col, text) of the writes applied,
+        in order of application
+        """
+        return list(self.__changes)
+
+    def pending(self, slide_id=None):
+        """
+        Returns list of (SlideID, shape index, row, col, text) of the writes yet to be applied
+        (to slide slide_id only, if given)
+        """
+        slide_ids = list(self.__slides) if slide_id is None else [ slide_id ]
+        return [ (key, *target, text) for key in slide_ids
+                 for target, (_, text, _) in self.__slides.get(key, {}).items() ]
+
+    def set_text(self, slide_id, index, shape, text, old=None):
+        """
+        Records write of text to Shape shape, the index-th (in z-order) of slide slide_id,
+        whose current text is old if known
+        """
+        self.__record(slide_id, (index, 0, 0), shape, text, old)
+
+    def set_cell(self, slide_id, index, table, row, col, text, old=None):
+        """
+        Records write of text to cell (row, col) of Table table,
+        that of the index-th shape (in z-order) of slide slide_id,
+        whose current text is old if known
+        """
+        self.__record(slide_id, (index, row, col), table, text, old)
+
+    def text(self, slide_id, index, row=0, col=0):
+        """
+        Returns text pending for the given target, or None if there is none
+        """
+        write = self.__slides.get(slide_id, {}).get((index, row, col))
+        return None if write is None else write[1]
+
+    def flush(self, slide_id=None):
+        """
+        Applies writes pending for slide slide_id (or all slides if omitted),
+        slide by slide in order of their first write
+        """
+        slide_ids = list(self.__slides) if slide_id is None else [ slide_id ]
+        for key in slide_ids:
+            # Cells are written table by table, all at once where the backend allows
+            tables = {}
+            for (index, row, col), (target, text, _) in self.__slides.pop(key, {}).items():
+                if row:
+                    tables.setdefault(index, (target, []))[1].append((row, col, text))
+                else:
+                    target.TextFrame.TextRange.Text = text
+                self.__changes.append((key, index, row, col, text))
+                self.__counts["applied"] += 1
+            for table, cells in tables.values():
+                write_cells(table, cells)
+
+    def discard(self, slide_id):
+        """
+        Drops writes pending for slide slide_id, e.g. before the slide is deleted
+        """
+        self.__counts["dropped"] += len(self.__slides.pop(slide_id, {}))
+
+    def summary(self):
+        """
+        Returns one-line summary of the writes
+        """
+        counts = self.__counts
+        slides = len({ change[0] for change in self.__changes })
+        return (f"{counts['applied']} of {counts['recorded']} writes applied to {slides} slides "
+                f"({counts['dropped']} dropped, {counts['superseded']} superseded)")
+
+    def __record(self, slide_id, key, target, text, old):
+        self.__counts["recorded"] += 1
+        writes = self.__slides.setdefault(slide_id, {})
+        if key in writes:
+            write = writes[key]
+            self.__counts["superseded"] += 1
+            write[1] = text
+            if text == write[2]:
+                # Back to the text the target had to begin with
+                del writes[key]
+                self.__counts["dropped"] += 1
+        elif text == old:
+            self.__counts["dropped"] += 1
+        else:
+            writes[key] = [target, text, old]
@@ -0,0 +1,59 @@
+import queue
+import threading
+
+# Items a stage may compute ahead of its consumer
+PREFETCH = 2
+
+# Marks the end of the items of a stage
+_DONE = object()
+
+
+def _put(items, item, stop):
+    """
+    Puts item into the bounded queue items, waiting for room unless stop is set;
+    returns False if stopped
+    """
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def prefetch(items, func, depth=PREFETCH, name="stage"):
+    """
+    Yields func(item) for each of items, in order, computed in a thread of its own
+    at most depth items ahead of the consumer, so that the two overlap
+    while no more than depth results are held at once.
+    items is iterated in that thread too, so neither may call into a backend (e.g. COM).
+    Exceptions raised there are raised to the consumer
+    """
+    results = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def produce():
+        error = None
+        try:
+            for item in items:
+                if not _put(results, (func(item), None), stop):
+                    return
+        except Exception as e:
+            error = e
+        _put(results, (_DONE, error), stop)
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            result, error = results.get()
+            if result is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield result
+    finally:
+        # Consumer done (or gone): let the thread finish
+        stop.set()
+        thread.join()
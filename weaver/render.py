@@ -0,0 +1,160 @@
+import os
+import re
+import hashlib
+
+from util import get_cache_dir, MSOTRUE
+from tables import TableSnapshot
+from cache import ExtractionCache
+
+# Placeholders of templates, e.g. <INTERFACE>, <POWER_NET[i]> or <i>
+PLACEHOLDER = re.compile(r"<\w+(?:\[i\])?>")
+
+# Plans compiled or loaded in this process, by digest of their template
+_plans = {}
+
+
+def substitute(text, values):
+    """
+    Returns text with every placeholder found in values replaced in a single pass;
+    others are left as they are
+    """
+    return PLACEHOLDER.sub(lambda match: values.get(match.group(0), match.group(0)), text)
+
+
+def text_digest(text):
+    """
+    Returns digest of text, as recorded for the texts rendered (see RenderPlan.render)
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _shape_indices(shapes):
+    """
+    Returns dict of shape name -> list of the indices (in z-order) of the shapes so named
+    """
+    indices = {}
+    for i, shape in enumerate(shapes, start=1):
+        indices.setdefault(shape.Name, []).append(i)
+    return indices
+
+
+class RenderPlan():
+    """
+    Locations of the placeholders of a template, compiled once per template:
+    for every slide (by SlideID), the shapes (by z-order and name) and table cells
+    whose text holds placeholders, along with that text.
+    Filling a slide is then a matter of writing texts, without reading any
+    """
+    def __init__(self, slides):
+        # SlideID -> [ (shape index, shape name, row, col, text) ], where row and col are 0 unless a table cell
+        self.__slides = slides
+
+    @classmethod
+    def compile(cls, pptx):
+        """
+        Reads every text of pptx and returns plan of its placeholders
+        """
+        slides = {}
+        for slide in pptx.Slides:
+            targets = []
+            for i, shape in enumerate(slide.Shapes, start=1):
+                cells = []
+                if shape.HasTable == MSOTRUE:
+                    table = TableSnapshot.from_table(shape.Table)
+                    for row in range(1, table.rows + 1):
+                        for col, text in enumerate(table.row(row), start=1):
+                            if PLACEHOLDER.search(text):
+                                cells.append((row, col, text))
+                elif shape.HasTextFrame == MSOTRUE:
+                    text = shape.TextFrame.TextRange.Text[:]
+                    if PLACEHOLDER.search(text):
+                        cells.append((0, 0, text))
+                if cells:
+                    name = shape.Name
+                    targets += [ (i, name, row, col, text) for row, col, text in cells ]
+            if targets:
+                slides[slide.SlideID] = targets
+        return cls(slides)
+
+    @classmethod
+    def of(cls, pptx, cache_dir=""):
+        """
+        Returns plan of pptx, unchanged since opened,
+        reusing that of any template with the same contents
+        """
+        if not os.path.isfile(pptx.FullName):
+            return cls.compile(pptx)
+        cache = ExtractionCache(pptx.FullName, cache_dir or get_cache_dir())
+        if cache.digest not in _plans:
+            _plans[cache.digest] = cache.fetch("render_plan", lambda: cls.compile(pptx))
+            cache.save()
+        return _plans[cache.digest]
+
+    @property
+    def slide_ids(self):
+        return list(self.__slides)
+
+    def tokens(self, slide_id):
+        """
+        Returns set of placeholders on template slide slide_id
+        """
+        return { token for *_, text in self.__slides.get(slide_id, []) for token in PLACEHOLDER.findall(text) }
+
+    def render(self, slide, values, slide_id, journal=None, target_id=None, by_name=False, rendered=None):
+        """
+        Writes the texts of template slide slide_id onto slide
+        (the template slide itself or a copy thereof), with values substituted.
+        Texts left unchanged by values are not written.
+        If by_name (e.g. slide was made before and may have been edited since),
+        shapes are matched by name rather than z-order, and those not matched are skipped.
+        Given rendered, a dict of "index:row:col" (of the template) -> digest (see text_digest)
+        of the text last rendered there, it is updated with the texts written;
+        if also by_name, those whose text is no longer the one last rendered there
+        (nor that of the template), e.g. edited by hand, are skipped.
+        Given a WriteJournal, the writes are recorded therein
+        under target_id (the SlideID of slide) instead of made.
+        Returns number of texts written
+        """
+        written = 0
+        shapes, indices = None, None
+        shape, shape_index = None, 0
+        for i, name, row, col, text in self.__slides.get(slide_id, []):
+            new_text = substitute(text, values)
+            if new_text == text:
+                continue
+            if shapes is None:
+                shapes = slide.Shapes
+                if journal is not None and target_id is None:
+                    target_id = slide.SlideID
+                if by_name:
+                    indices = _shape_indices(shapes)
+            target = f"{i}:{row}:{col}"
+            if by_name:
+                # The shape at the same z-order is preferred if more than one is so named
+                matches = indices.get(name, [])
+                if i not in matches:
+                    if len(matches) != 1:
+                        print(f"Shape {name} of template slide {slide_id} not found, left as is.")
+                        continue
+                    i = matches[0]
+            if shape_index != i:
+                shape, shape_index = shapes(i), i
+            if rendered is not None:
+                if by_name:
+                    text_range = (shape.Table.Cell(row, col).Shape if row else shape).TextFrame.TextRange
+                    current = text_digest(text_range.Text[:])
+                    if current not in (rendered.get(target, text_digest(text)), text_digest(new_text)):
+                        print(f"Shape {name} of template slide {slide_id} edited since rendered, left as is.")
+                        continue
+                rendered[target] = text_digest(new_text)
+            if journal is not None:
+                if row:
+                    journal.set_cell(target_id, i, shape.Table, row, col, new_text)
+                else:
+                    journal.set_text(target_id, i, shape, new_text)
+            elif row:
+                shape.Table.Cell(row, col).Shape.TextFrame.TextRange.Text = new_text
+            else:
+                shape.TextFrame.TextRange.Text = new_text
+            written += 1
+        return written
@@ -1,6 +1,16 @@
+import os
 import re
 from .report import Report
-from util import COVER_SLIDE, TITLE_NAME, TABLE_COORDS, TOC, com_error
+from util import COVER_SLIDE, TITLE_NAME, TABLE_COORDS, TOC, get_cache_dir
+from tables import TableSnapshot
+from cache import ExtractionCache
+from builds import slide_digests
+
+# Columns of the TOC table: field -> (header names, usual column)
+TOC_COLUMNS = {
+    "section": (["Section", "Contents", "Title"], 1),
+    "page": (["Page", "Pages", "Slide", "Slides"], 2),
+}
 
 
 # =======================
@@ -34,21 +44,48 @@ class ConfirmationTools(Report):
     """
     Class for initial, pre-simulation report
     """
-    def __init__(self, pptx):
+    def __init__(self, pptx, use_cache=True):
         super().__init__(pptx)
+        # Extracted data is reused for as long as the file is unchanged
+        self.__cache = None
+        if use_cache and os.path.isfile(pptx.FullName):
+            self.__cache = ExtractionCache(pptx.FullName, get_cache_dir())
         # Regex project number from title
         self.__proj_num = re.search(r"(^\w{2}\d{4})", self.title).group(1)[:] 
         self.__toc = None
         self.__type = _set_type(self.pptx)
 
+    @property
+    def proj_num(self):
+        return self.__proj_num
+
+    @property
+    def cache(self):
+        """
+        Returns ExtractionCache of the file, or None if caching is disabled
+        """
+        return self.__cache
+
+    def _cached(self, name, extract):
+        """
+        Returns result of extract, using the cache if enabled
+        """
+        if self.__cache is None:
+            return extract()
+        return self.__cache.fetch(name, extract)
+
+    def save_cache(self):
+        if self.__cache is not None:
+            self.__cache.save()
+
     @property
     def title(self):
         """
         Fetches title from cover slide
         """
         # Pull title from cover slide
-        return self.pptx.Slides(COVER_SLIDE).\
-               Shapes(TITLE_NAME).TextFrame.TextRange.Text[:] 
+        return self._cached("title", lambda: self.pptx.Slides(COVER_SLIDE).\
+                            Shapes(TITLE_NAME).TextFrame.TextRange.Text[:])
     
     @property
     def type(self):
@@ -57,11 +94,20 @@ class ConfirmationTools(Report):
         """
         return self.__type
 
+    def slide_digests(self):
+        """
+        Returns digest of every slide in slide order (see builds.slide_digests)
+        """
+        return self._cached("slide_digests", lambda: slide_digests(self.pptx.FullName))
+
     def get_creators(self):
         """
         Gets list of authors, reviewers, and approvers 
         from Confirmation Tools object
         """
+        return self._cached("creators", self._read_creators)
+
+    def _read_creators(self):
         creators = {
             "preparers": "",
             "reviewers": "",
@@ -70,7 +116,7 @@ class ConfirmationTools(Report):
 
         for party, coords in TABLE_COORDS.items():
             if party in creators.keys():
-                creators_table = self._get_table(self.pptx.Slides(COVER_SLIDE).Shapes)
+                creators_table = self._get_table(self.shape_index(self.pptx.Slides(COVER_SLIDE)))
                 creators[party] = creators_table.\
                                   Cell(coords[0], coords[1]).Shape.TextFrame.TextRange.Text[:]
 
@@ -82,68 +128,67 @@ class ConfirmationTools(Report):
         """
         # TODO: unmemoize if not needed
         if not self.__toc:
-            toc = self._get_table(self.pptx.Slides(TOC).Shapes)
-            # To be populated with slide nums
-            toc_dict = { "sim_target": None }
-
-            # Add depending on type
-            if self.type == "si":
-                toc_dict["topology"] = None 
-                toc_dict["eye_mask_judgement"] = None
-            elif self.type == "pi":
-                toc_dict["curr_consumption"] = None
-                toc_dict["voltage_margin"] = None
-                toc_dict["appendix"] = None
-
-            row = 2 # Starting y coord of table traversal
-            while True:
-                section_name = toc.Cell(row, 1).Shape.TextFrame.TextRange.Text[:]
-                section_name = section_name.lower()
-                # Only contents in section 2 is of interest
-                try:
-                    if re.search(r"^\s*\d?\.?\d?\w+", section_name):
-                        for key in toc_dict.keys():
-                            target = key.split("_")[-1] if key.find("_") > -1 else key
-                            if self.type == "si":
-                                section_name = section_name.split("&")[0].strip()
-                            if section_name.endswith(target):
-                                slide_num = toc.Cell(row, 2).Shape.TextFrame.TextRange.Text[:]
-                                toc_dict[key] = slide_num
-                    # Check if end of TOC in order to end loop
-                    elif section_name == "":
-                        break
-                    # Move down TOC
-                    row += 1 
-                # In case pointer has reached end of TOC
-                except com_error:
-                    break
-
-            # Convert str slide_nums to int for slide indexing
-            for section, slide_nums in toc_dict.items():
-                # Check if range of slide_nums
-                # In case of hyphen type -
-                if slide_nums.find("-") > -1:
-                    slide_nums = slide_nums.split("-")
-                    toc_dict[section] = [ int(num) for num in slide_nums ]
-                # In case of hyphen type ―    
-                elif slide_nums.find("\u2013") > -1:
-                    slide_nums = slide_nums.split("\u2013") 
-                    toc_dict[section] = [ int(num) for num in slide_nums ]
-                # If single number
-                else:
-                    # Keep returned data structures consistent by keeping values as list type
-                    num = [ int(slide_nums) ] * 2
-                    toc_dict[section] = num
-
-            print()
-            print("Loaded page numbers of the following sections:")
-            for k in toc_dict:
-                print(f"  {k.upper()}: {toc_dict[k][0]} - {toc_dict[k][1]}")
-            print()
-            self.__toc = toc_dict
+            self.__toc = self._cached("toc", self._read_toc)
 
         return self.__toc
 
+    def _read_toc(self):
+        """
+        Reads the TOC table into a dict of section->slide_num(s)
+        """
+        toc = TableSnapshot.from_table(self._get_table(self.shape_index(self.pptx.Slides(TOC))))
+        # To be populated with slide nums
+        toc_dict = { "sim_target": None }
+
+        # Add depending on type
+        if self.type == "si":
+            toc_dict["topology"] = None 
+            toc_dict["eye_mask_judgement"] = None
+        elif self.type == "pi":
+            toc_dict["curr_consumption"] = None
+            toc_dict["voltage_margin"] = None
+            toc_dict["appendix"] = None
+
+        cols = toc.locate(TOC_COLUMNS)
+        for row, _ in toc.body():
+            section_name = toc.value(row, cols["section"]).lower()
+            # Only contents in section 2 is of interest
+            if re.search(r"^\s*\d?\.?\d?\w+", section_name):
+                for key in toc_dict.keys():
+                    target = key.split("_")[-1] if key.find("_") > -1 else key
+                    if self.type == "si":
+                        section_name = section_name.split("&")[0].strip()
+                    if section_name.endswith(target):
+                        toc_dict[key] = toc.value(row, cols["page"])
+            # Check if end of TOC in order to end loop
+            elif section_name == "":
+                break
+
+        # Convert str slide_nums to int for slide indexing
+        for section, slide_nums in toc_dict.items():
+            # Check if range of slide_nums
+            # In case of hyphen type -
+            if slide_nums.find("-") > -1:
+                slide_nums = slide_nums.split("-")
+                toc_dict[section] = [ int(num) for num in slide_nums ]
+            # In case of hyphen type ―    
+            elif slide_nums.find("\u2013") > -1:
+                slide_nums = slide_nums.split("\u2013") 
+                toc_dict[section] = [ int(num) for num in slide_nums ]
+            # If single number
+            else:
+                # Keep returned data structures consistent by keeping values as list type
+                num = [ int(slide_nums) ] * 2
+                toc_dict[section] = num
+
+        print()
+        print("Loaded page numbers of the following sections:")
+        for k in toc_dict:
+            print(f"  {k.upper()}: {toc_dict[k][0]} - {toc_dict[k][1]}")
+        print()
+
+        return toc_dict
+
 
 class FilenameError(Exception):
     pass
\ No newline at end of file
@@ -1,5 +1,11 @@
+import re
 from abc import ABC
 
+# Mark of a power net being a target of an analysis, e.g. "○ (U2)" with its load IC;
+# either circle (U+25CB, U+3007) is accepted, as both are used in confirmation tools
+ANALYSIS_MARK = re.compile(r"[○〇]\s*(?:\((.+?)\))?")
+
+
 class Interface():
     def __init__(self, name):
         self.__name = name
@@ -53,4 +59,101 @@ class Signal():
     
     @property
     def receiver(self):
-        return self.__receiver
\ No newline at end of file
+        return self.__receiver
+
+
+class PowerNet():
+    def __init__(self, name, reference_ic="", voltage="", margin="", analyses=None):
+        self.__name = name
+        self.__reference_ic = reference_ic
+        self.__voltage = voltage
+        self.__margin = margin
+        # Analysis (e.g. "ac drop analysis") -> load IC, or "" if none given,
+        # for each analysis the net is a target of
+        self.__analyses = dict(analyses or {})
+
+    @property
+    def name(self):
+        return self.__name[:]
+
+    @property
+    def reference_ic(self):
+        return self.__reference_ic[:]
+
+    @property
+    def voltage(self):
+        return self.__voltage[:]
+
+    @property
+    def margin(self):
+        return self.__margin[:]
+
+    @property
+    def analyses(self):
+        return dict(self.__analyses)
+
+    def needs(self, analysis):
+        return analysis in self.__analyses
+
+    def load(self, analysis):
+        return self.__analyses.get(analysis, "")
+
+
+class PowerNets():
+    """
+    Power nets of a power net (simulation target) table, in order of rows
+    """
+    def __init__(self, nets=None):
+        self.__nets = list(nets or [])
+        self.__by_name = { net.name: net for net in self.__nets }
+
+    @classmethod
+    def from_table(cls, table, columns, analyses, loaded=()):
+        """
+        Parses a TableSnapshot of a power net table, where columns maps
+        PowerNet fields (name, reference_ic, voltage, margin)
+        and analyses maps analyses to a header name or column index.
+        Nets are targets of the analyses of loaded only if their load IC
+        is given along with the mark, e.g. "○ (U2)" but not "○".
+        Every row below the header is read, down to the last
+        """
+        def cell(row, col):
+            return table.cell(row, col) if isinstance(col, int) else table.get(row, col)
+
+        nets = []
+        for row, _ in table.body():
+            fields = { field: cell(row, col) for field, col in columns.items() }
+            fields["name"] = fields["name"].strip()
+            if not fields["name"]:
+                continue
+            marks = {}
+            for analysis, col in analyses.items():
+                match = ANALYSIS_MARK.search(cell(row, col))
+                if match and (match.group(1) or analysis not in loaded):
+                    marks[analysis] = match.group(1) or ""
+            nets.append(PowerNet(analyses=marks, **fields))
+        return cls(nets)
+
+    def __iter__(self):
+        return iter(self.__nets)
+
+    def __len__(self):
+        return len(self.__nets)
+
+    def __getitem__(self, index):
+        return self.__nets[index]
+
+    def get(self, name):
+        """
+        Returns PowerNet named name, or None if not found
+        """
+        return self.__by_name.get(name)
+
+    def names(self):
+        return [ net.name for net in self.__nets ]
+
+    def targets(self, analysis, load=None):
+        """
+        Returns list of nets that are targets of analysis (with load IC load, if given)
+        """
+        return [ net for net in self.__nets if net.needs(analysis) and (load is None or net.load(analysis) == load) ]
@@ -1,4 +1,6 @@
-from util import MSOTRUE
+from shapes import ShapeIndex
+from journal import WriteJournal
+from backends import clone_slide
 
 
 class Report():
@@ -9,6 +11,10 @@ class Report():
         self.__pptx = pptx_obj
         self.__title = ""
         self.__proj_num = ""
+        # SlideID -> ShapeIndex of slides scanned so far
+        self.__shape_indexes = {}
+        # Writes to the report, made when it is saved
+        self.__journal = WriteJournal()
     
     @property
     def pptx(self):
@@ -17,6 +23,13 @@ class Report():
         """
         return self.__pptx
     
+    @property
+    def journal(self):
+        """
+        Returns WriteJournal of the texts written to the report
+        """
+        return self.__journal
+
     @property
     def proj_num(self):
         """
@@ -28,13 +41,50 @@ class Report():
     def title(self):
         raise NotImplementedError
 
+    def shape_index(self, slide):
+        """
+        Returns ShapeIndex of slide, scanning its Shapes on first use only;
+        writes made through it are recorded in the journal
+        """
+        key = slide.SlideID
+        if key not in self.__shape_indexes:
+            self.__shape_indexes[key] = ShapeIndex(slide.Shapes, self.__journal, key)
+        return self.__shape_indexes[key]
+
+    def _forget_slide(self, slide_id):
+        """
+        Drops ShapeIndex of slide slide_id, e.g. after writing to its shapes directly
+        """
+        self.__shape_indexes.pop(slide_id, None)
+
+    def _delete_slide(self, index):
+        """
+        Deletes slide at index along with its ShapeIndex and pending writes
+        """
+        slide = self.pptx.Slides(index)
+        slide_id = slide.SlideID
+        self._forget_slide(slide_id)
+        self.__journal.discard(slide_id)
+        slide.Delete()
+
+    def _clone_slide(self, slide, index=""):
+        """
+        Copies slide of the report to index (see clone_slide),
+        applying the writes pending for it first
+        """
+        self.__journal.flush(slide.SlideID)
+        return clone_slide(slide, self.pptx, index)
+
+    def _apply_writes(self):
+        """
+        Applies all writes pending in the journal, e.g. before saving
+        """
+        self.__journal.flush()
+
     def _get_table(self, shapes): 
         """
-        Iterates over a Slide's collection of Shapes 
-        and returns first shape found to have a Table object
+        Returns first Table found in a Slide's collection of Shapes
+        (or ShapeIndex thereof)
         """
-        for shape in shapes:
-            if shape.HasTable == MSOTRUE:
-                return shape.Table
-        return None 
+        return ShapeIndex.of(shapes).table()
 
@@ -1,17 +1,23 @@
-from time import sleep
 from ..simreport import SimulationReport
-from util import TITLE_NAME, MSOTRUE, com_error
 
 SIM_TARGETS = 6
 
+# Columns of the power net table by index
+POWER_NET_COLUMNS = {
+    "name": 1,
+    "voltage": 3,
+}
+ANALYSES = {
+    "power resonance": 4,
+}
+
 
 class EMCReport(SimulationReport):
     """
     Class for PCB EMC report
     """
-    def __init__(self, template, proj_num):
-        super().__init__(template, proj_num)
-        self.__power_nets = []
+    def __init__(self, template, proj_num, params=None):
+        super().__init__(template, proj_num, params)
         # TODO: implement a toc prop for random access
 
     def __str__(self):
@@ -25,10 +31,6 @@ class EMCReport(SimulationReport):
     def report_type(self):
         return "EMC"
 
-    @property
-    def power_nets(self):
-        return self.__power_nets[:]
-
     def _update_toc(self):
         """Updates table of contents after appending slides to a section"""
         # TODO
@@ -42,97 +44,65 @@ class EMCReport(SimulationReport):
         new_slides = tar_pages[1] - tar_pages[0]
         self._curr_slide = 6
 
+        sec_num = "3.1"
         for slide in (self._curr_slide, self._curr_slide + new_slides):
-            for shape in self.pptx.Slides(slide).Shapes:
-                if shape.HasTextFrame == MSOTRUE:
-                    sec_num = "3.1"
-                    curr_text = shape.TextFrame.TextRange.Text[:]
-                    if curr_text.strip().startswith(sec_num):
-                        shape.TextFrame.TextRange.Text = curr_text.replace(sec_num, "")
+            shapes = self.shape_index(self.pptx.Slides(slide))
+            for shape, curr_text in shapes.texts():
+                if curr_text.strip().startswith(sec_num):
+                    shapes.set_text(shape, curr_text.replace(sec_num, ""))
         
         self._curr_slide += new_slides
-        
-        sim_tar_table = self._get_table(self.pptx.Slides(SIM_TARGETS).Shapes)
-        row = 2 # Initial row for scan
-        while True:
-            try:
-                net_col = 1 # For net names
-                voltage_col = 3
-                resonance_col = 4 # For y/n power resonance analysis
-                has_resonance = False 
-                net = sim_tar_table.Cell(row, net_col).Shape.TextFrame.TextRange.Text[:]
-                voltage = sim_tar_table.Cell(row, voltage_col).Shape.TextFrame.TextRange.Text[:]
-                if sim_tar_table.Cell(row, resonance_col).Shape.TextFrame.TextRange.Text[:] == u"〇":
-                    has_resonance = True
-                self.__power_nets.append((net, voltage, has_resonance))
-                row += 1 # Move down table
-            # Found end of table
-            except com_error:
-                break
-
         return self.power_nets
 
-    def _fill_analysis_table(self):
+    def _read_power_nets(self, conf_tools=None):
+        if conf_tools is None:
+            return self._parse_power_nets(SIM_TARGETS, POWER_NET_COLUMNS, ANALYSES)
+        # First slide of the simulation targets, copied to SIM_TARGETS
+        return self._parse_power_nets(conf_tools.get_toc()["sim_target"][0], POWER_NET_COLUMNS, ANALYSES, conf_tools)
+
+    def _fill_analysis_table(self, slide=None):
         """Populates resonance analysis table with power net names"""
-        self._curr_slide += 2 # Move past divider (assumes execution after get_power_nets)
-        index = self._curr_slide        
+        if slide is None:
+            self._curr_slide += 2 # Move past divider (assumes execution after get_power_nets)
+            slide = self.pptx.Slides(self._curr_slide)
 
         # Grab table from slide
-        slide = self.pptx.Slides(index)
-        table = self._get_table(slide.Shapes)
+        shapes = self.shape_index(slide)
+        table = self._get_table(shapes)
 
-        row = 3 # init row
-        count = 0
-        item_num = 1
-
-        # Make sure table has same number of rows as power nets,
-        # excluding the header and accounting for two rows per power net
-        while len(table.Rows) - 1 < len(self.power_nets) * 2:
-            table.Rows.Add()
-
-        while True:
-            try:
-                if row % 2 != 0:
-                    if row > 3: item_num += 1
-                    table.Cell(row, 1).Shape.TextFrame.TextRange.Text = str(item_num)
-                new = self.power_nets[item_num - 1][0]
-                table.Cell(row, 2).Shape.TextFrame.TextRange.Text = new
-                count += 1
-                row += 1
-            except com_error:
-                break
+        # Two rows for each power net below the header,
+        # the first of which holds its item number
+        block = []
+        for item_num, net in enumerate(self.power_nets, start=1):
+            block += [ [ str(item_num), net.name ], [ None, net.name ] ]
+        self._fill_table(shapes, table, block, 3)
+        self._own_slide(slide, "analysis", "power resonance")
 
     def _make_reson_analysis(self):
         """Copy template for resonance analysis and fill in table and title"""
         self._curr_slide += 3 # move to next (needs better error-proofing)
         index = self._curr_slide
-        shapes = self.pptx.Slides(index).Shapes
 
-        # Exclude init template slide and calc number of times to copy
-        num_nets = len(self.power_nets) - 1
+        # One copy of the template slide per power net, the template itself being deleted
+        num_nets = len(self.power_nets)
         count = 0
-        self.pptx.Slides(index).Copy()
-        sleep(.25)
+        template = self.pptx.Slides(index)
+        template_id = template.SlideID
         # Use filter to only get those nets that need resonance analysis
         p_nets = self.power_nets
         while count < num_nets:
-            self.pptx.Slides.Paste(index + 1 + count) # Place right after current
-            shapes = self.pptx.Slides(index + 1 + count).Shapes
-            for s in shapes:
-                if s.HasTextFrame == MSOTRUE:
-                    text = s.TextFrame.TextRange.Text[:]
-                    if text.startswith("Target"):
-                        # TODO: use boolean to make sure only nets needing resonance analysis are used
-                        new = text.replace("<V[i]>", p_nets[count][1][:])
-                        new = new.replace("<POWER_NET[i]>", p_nets[count][0][:])
-                        s.TextFrame.TextRange.Text = new
-                elif s.HasTable == MSOTRUE:
-                    s.Table.Cell(2, 1).Shape.TextFrame.TextRange.Text = p_nets[count][0]
+            slide = self._clone_slide(template, index + 1 + count) # Place right after current
+            # TODO: use boolean to make sure only nets needing resonance analysis are used
+            self._render(slide, self._reson_placeholders(p_nets[count]), template_id)
+            shapes = self.shape_index(slide)
+            for table in shapes.tables():
+                shapes.set_cell(table, 2, 1, p_nets[count].name)
+            self._own_slide(slide, "result", p_nets[count].name, template_id)
 
             # Move to next power net        
             count += 1
 
-        self.pptx.Slides(index).Delete()
+        self._delete_slide(index)
 
         # Move pointer to the last slide
         self._curr_slide += count
@@ -143,31 +113,25 @@ class EMCReport(SimulationReport):
         start = self._curr_slide + 1
         p_nets = self.power_nets
 
-        self.pptx.Slides(start).Copy()
-        sleep(.25)
+        template = self.pptx.Slides(start)
+        template_id = template.SlideID
 
-        # start from 1 to account for init template slide
-        for i in range(1, len(p_nets) - 1):
+        # start from 1 to account for init template slide, filled in for the first power net
+        for i in range(1, len(p_nets)):
             index = start + i
-            self.pptx.Slides.Paste(index)
+            self._clone_slide(template, index)
         
         # Move pointer at start of section to end
-        for j in range(0, len(p_nets) - 1):
-            shapes = self.pptx.Slides(start + j).Shapes
-            for s in shapes:
-                if s.HasTextFrame == MSOTRUE:
-                    text = s.TextFrame.TextRange.Text[:]
-                    if text.startswith("Appendix"):
-                        new = text.replace("<i>", str(j + 1))
-                        new.replace("<POWER_NET[i]>", p_nets[j][0])
-                        s.TextFrame.TextRange.Text = new
-                elif s.HasTable == MSOTRUE:
-                    text_range = s.Table.Cell(2,2).Shape.TextFrame.TextRange
-                    text = text_range.Text[:]
-                    new = text.replace("<POWER_NET[i]>", p_nets[j][0])
-                    text_range.Text = new
-
-        self.pptx.Slides(start).Delete()
+        for j in range(0, len(p_nets)):
+            slide = self.pptx.Slides(start + j)
+            self._render(slide, self._appendix_placeholders(j), template_id)
+            self._own_slide(slide, "appendix", p_nets[j].name, template_id)
+
+    def _reson_placeholders(self, net):
+        return { "<V[i]>": net.voltage, "<POWER_NET[i]>": net.name }
+
+    def _appendix_placeholders(self, i):
+        return { "<i>": str(i + 1), "<POWER_NET[i]>": self.power_nets[i].name }
     
     def _build_slides(self, conf_tools):
         self._get_power_nets(conf_tools)
@@ -175,7 +139,20 @@ class EMCReport(SimulationReport):
         self._make_reson_analysis()
         self._add_appendix()
 
+    def _update_slides(self, conf_tools, template, owned):
+        self._load_power_nets(conf_tools)
+        for slide, role, _, _ in owned:
+            if role == "analysis":
+                self._fill_analysis_table(slide)
+        template_ids = { role: template_id for _, role, _, template_id in owned }
+        reson = [ (net.name, template_ids.get("result", 0), self._reson_placeholders(net)) for net in self.power_nets ]
+        self._sync_slides(owned, "result", reson, template)
+        appendix = [ (net.name, template_ids.get("appendix", 0), self._appendix_placeholders(i))
+                     for i, net in enumerate(self.power_nets) ]
+        self._sync_slides(owned, "appendix", appendix, template)
+
     def build_pptx(self, conf_tools):
+        self._load_render_plan()
         self._make_cover(conf_tools)
         self._copy_slides(conf_tools)
         self._build_slides(conf_tools)
@@ -1,7 +1,5 @@
-import re
-from time import sleep
 from ..simreport import SimulationReport
-from util import MSOTRUE
+from backends import clone_slide
 
 SIM_TARGET = 6
 SIM_TARGET_REP = 7
@@ -9,13 +7,29 @@ DC_DROP = 12
 AC_DROP = 13
 IMPEDANCE = 14
 
+# Columns of the power net table by header name
+POWER_NET_COLUMNS = {
+    "name": "power net",
+    "reference_ic": "reference ic",
+    "voltage": "voltage",
+    "margin": "acceptable target voltage margin",
+}
+ANALYSES = ["dc drop analysis", "ac drop analysis", "impedance analysis"]
+# Analyses marked only along with their load IC, e.g. "○ (U2)"
+LOADED_ANALYSES = ["ac drop analysis", "impedance analysis"]
+# Result slide of each analysis in the template, copied for every power net needing it
+RESULT_TEMPLATES = {
+    "dc drop analysis": 13,
+    "ac drop analysis": 14,
+    "impedance analysis": 15,
+}
+
 class PIReport(SimulationReport):
     """
     Class for PCB power integrity report
     """
-    def __init__(self, template, proj_num):
-        super().__init__(template, proj_num)
-        self.__power_nets = {}
+    def __init__(self, template, proj_num, params=None):
+        super().__init__(template, proj_num, params)
         self.__counter = 1
 
     def __str__(self):
@@ -31,99 +45,66 @@ class PIReport(SimulationReport):
     
     @property
     def net_names(self):
-        return self.__power_nets[:]
-
-    def _get_power_nets(self):
-        # TODO reuse from EMC and abstract to SimulationReport
-        pass
+        return self.power_nets.names()
     
     def _copy_slides(self, conf_tools):
         toc = conf_tools.get_toc()
         appendix = toc["appendix"]
         for i in range(appendix[0], appendix[1] + 1):
-            # Check all shapes
-            for shape in conf_tools.pptx.Slides(i).Shapes:
-                if shape.HasTextFrame == MSOTRUE:
-                    curr_text = shape.TextFrame.TextRange.Text[:]
-                    if curr_text.find("Topology") > -1:
-                        start = curr_text.find(":")
-                        new_text = curr_text[start+1:]
-                        shape.TextFrame.TextRange.Text = new_text.strip()
-                        conf_tools.pptx.Slides(i).Copy()
-                        sleep(.25)
-                        self.pptx.Slides.Paste(len(self.pptx.Slides) - 1) # Put at second to last slide
+            # Check all shapes for a topology
+            src = conf_tools.pptx.Slides(i)
+            is_topology = any(text.find("Topology") > -1 for _, text in conf_tools.shape_index(src).texts())
+            if not is_topology:
+                continue
+            # Put at second to last slide and edit the copy, leaving the source intact
+            slide = clone_slide(src, self.pptx, len(self.pptx.Slides) - 1)
+            shapes = self.shape_index(slide)
+            for shape, curr_text in shapes.texts():
+                if curr_text.find("Topology") > -1:
+                    start = curr_text.find(":")
+                    new_text = curr_text[start+1:]
+                    shapes.set_text(shape, new_text.strip())
 
         pages = ( toc["sim_target"][0], toc["voltage_margin"][1] )
         for j in range(pages[0], pages[1] + 1):
             # Skip impedance table
             if j - pages[0] == 1:
                 j += 1
-            conf_tools.pptx.Slides(j).Copy()
-            sleep(.25)
-            self.pptx.Slides.Paste(j + 1) # Offset by one
+            clone_slide(conf_tools.pptx.Slides(j), self.pptx, j + 1) # Offset by one
             self.__counter += 1
         
 
-    def _read_power_nets(self):
-        slide = self.pptx.Slides(SIM_TARGET_REP)
-        table = self._get_table(slide.Shapes)
-
-        for i in range(2, len(table.Rows)):
-            net = {
-                "power net": "",
-                "reference ic": "",
-                "voltage": "",
-                "dc drop analysis": False,
-                "ac drop analysis": [ False, "" ],
-                "impedance analysis": [ False, "" ],
-                "acceptable target voltage margin": ""
-            }
-
-            for j in range(1, len(table.Columns) + 1):
-                col_name = table.Cell(1, j).Shape.TextFrame.TextRange.Text[:].lower()
-                if col_name.find("\r") > -1:
-                    col_name = " ".join(col_name.split("\r"))
-                text = table.Cell(i, j).Shape.TextFrame.TextRange.Text[:]
-                if col_name in ["ac drop analysis", "impedance analysis"]:
-                    match = re.search(r"○\s*\((.+)\)", text)
-                    if match:
-                        net[col_name][0] = True
-                        load = match.group(1) # Get load IC
-                        net[col_name][1] = load 
-                elif col_name == "dc drop analysis" and text.find("○") > -1:
-                    net[col_name] = True
-                else:
-                    net[col_name] = text[:]
-
-            print("\nLoaded the following net:\n")
-            for k, v in net.items():
-                print(f"  {k.upper()}: {v}")
-            print("\n---------------" * 5)
-            yield net
+    def _read_power_nets(self, conf_tools=None):
+        analyses = { analysis: analysis for analysis in ANALYSES }
+        if conf_tools is None:
+            return self._parse_power_nets(SIM_TARGET_REP, POWER_NET_COLUMNS, analyses, loaded=LOADED_ANALYSES)
+        # First slide of the simulation targets, copied to SIM_TARGET_REP
+        return self._parse_power_nets(conf_tools.get_toc()["sim_target"][0], POWER_NET_COLUMNS, analyses, conf_tools,
+                                      LOADED_ANALYSES)
     
     def _parse_net_info(self, net, analysis_type, item_num):
-        tar_info = net[analysis_type] if analysis_type == "dc drop analysis" else net[analysis_type][0]
-        if not tar_info: 
+        if not net.needs(analysis_type): 
             return None
-        reference = net["reference ic"][:]
+        reference = net.reference_ic[:]
+        load = net.load(analysis_type)
         # Change in case load is set to "all"
-        if analysis_type.startswith("ac"):
-            if net["reference ic"].lower().find("all load ic"):
+        if analysis_type.startswith("ac") and load:
+            if net.reference_ic.lower().find("all load ic"):
                 reference = reference.split("~")[0]
-                reference += net[analysis_type][1][:]
-        elif analysis_type.startswith("imp"):
+                reference += load
+        elif analysis_type.startswith("imp") and load:
             reference = reference.split("~")[0]
-            reference += net[analysis_type][1][:]
+            reference += load
         # Info to be filled into table
         net_info = {
             "no.": item_num,
-            "power net": net["power net"],
+            "power net": net.name,
             "reference ic": reference,
-            "source voltage": net["voltage"]
+            "source voltage": net.voltage
         }
         return net_info
 
-    def _fill_analysis_tables(self, type_):
+    def _fill_analysis_tables(self, type_, slide=None):
 
         index = None # To be used later for finding target slide
         anal_type = ""
@@ -140,87 +121,84 @@ class PIReport(SimulationReport):
 
         target_nets = []
         item_num = 1
-        for n in self._read_power_nets():
+        for n in self.power_nets:
             target_nets.append(self._parse_net_info(n, anal_type, item_num))
             item_num += 1
         
-        slide = self.pptx.Slides(index)
-        table = self._get_table(slide.Shapes)
+        if slide is None:
+            slide = self.pptx.Slides(index)
+        shapes = self.shape_index(slide)
+        table = self._get_table(shapes)
 
-        while len(table.Rows) < len(target_nets):
-            table.Rows.Add()
-        
         num_cols = 3 if type_ == "imp" else 4
-        for i in range(len(target_nets)):
-            # Only iterating first four columns
-            if not target_nets[i]:
-                continue
-            for j in range(num_cols):
-                col = j + 1
-                row = i + 3
-                header = 1 if col <= 1 else 2 # To accomodate different header sizes
-                col_name = table.Cell(header, col).Shape.TextFrame.TextRange.Text[:].lower()
-                # To ensure consistency with net_info dict
-                # if analysis type is impedance
-                if not type_ == "imp":
-                    if col_name == "simulation target":
-                        col_name = "power net"
-                    elif col_name == "simulation portion":
-                        col_name = "reference ic"
-                    elif col_name == "item":
-                        col_name = "no."
-                try:
-                    table.Cell(row, col).Shape.TextFrame.TextRange.Text = target_nets[i][col_name]
-                except KeyError:
+        # Only filling first four columns, read by their header
+        col_names = []
+        for col in range(1, num_cols + 1):
+            header = 1 if col <= 1 else 2 # To accomodate different header sizes
+            col_name = table.Cell(header, col).Shape.TextFrame.TextRange.Text[:].lower()
+            # To ensure consistency with net_info dict
+            # if analysis type is impedance
+            if not type_ == "imp":
+                if col_name == "simulation target":
+                    col_name = "power net"
+                elif col_name == "simulation portion":
+                    col_name = "reference ic"
+                elif col_name == "item":
+                    col_name = "no."
+            col_names.append(col_name)
+
+        # One row per power net below the two header rows,
+        # left empty for nets not needing the analysis
+        block = []
+        for net_info in target_nets:
+            row = []
+            for col_name in col_names:
+                if not net_info or col_name not in net_info:
                     break
+                row.append(str(net_info[col_name]))
+            block.append(row)
+        self._fill_table(shapes, table, block, 3)
+        self._own_slide(slide, "analysis", type_)
     
-    def _replace_placeholders(self, net, shape):
-        placeholders = {
-            "<POWER_NET[i]>": net["power net"],
-            "<V[i]>": net["voltage"],
-            "<RECEIVER_REF>": net["reference ic"]
+    def _placeholders(self, net):
+        return {
+            "<POWER_NET[i]>": net.name,
+            "<V[i]>": net.voltage,
+            "<RECEIVER_REF>": net.reference_ic
         }
-        # Look at TextFrame of shape or cell of table therewithin
-        if shape.HasTextFrame == MSOTRUE:
-            curr_text = shape.TextFrame.TextRange.Text[:]
-            for k in placeholders.keys():
-                if curr_text.find(k) > -1:
-                    curr_text = curr_text.replace(k, placeholders[k])
-            shape.TextFrame.TextRange.Text = curr_text
-        elif shape.HasTable == MSOTRUE:
-            tar_cells = [(2,1), (3,1)]
-            for cell in tar_cells:
-                curr_text = shape.Table.Cell(cell[0], cell[1]).Shape.TextFrame.TextRange.Text[:]
-                for k in placeholders.keys():
-                    if curr_text.find(k) > -1:
-                        shape.Table.Cell(cell[0], cell[1]).Shape.TextFrame.TextRange.Text =\
-                            curr_text.replace(k, placeholders[k])
 
     def _build_slides(self):
         # Set ptrs to three result type slides
-        slide_ptrs = {
-            "dc drop analysis": 13 + self.__counter,
-            "ac drop analysis": 14 + self.__counter,
-            "impedance analysis": 15 + self.__counter
-        }
+        slide_ptrs = { analysis: index + self.__counter for analysis, index in RESULT_TEMPLATES.items() }
 
         self._curr_slide = slide_ptrs["impedance analysis"] + 1
-        for net in self._read_power_nets():
-            for analysis in ["dc drop analysis", "ac drop analysis", "impedance analysis"]:
-                target = net[analysis] if analysis == "dc drop analysis" else net[analysis][0]
-                if target: 
-                    self.pptx.Slides(slide_ptrs[analysis]).Copy()
-                    sleep(.25)
-                    self.pptx.Slides.Paste(self._curr_slide)
-                    for shape in self.pptx.Slides(self._curr_slide).Shapes:
-                        self._replace_placeholders(net, shape)
+        for net in self.power_nets:
+            for analysis in ANALYSES:
+                if net.needs(analysis): 
+                    template = self.pptx.Slides(slide_ptrs[analysis])
+                    slide = self._clone_slide(template, self._curr_slide)
+                    self._render(slide, self._placeholders(net), template.SlideID)
+                    self._own_slide(slide, "result", f"{analysis}|{net.name}", template.SlideID)
                     self._curr_slide += 1
         
-        # Remove template slide
-        for v in slide_ptrs.values():
-            self.pptx.Slides(v).Delete()
+        # Remove template slides, last first so that the indices of the others hold
+        for v in sorted(slide_ptrs.values(), reverse=True):
+            self._delete_slide(v)
+
+    def _update_slides(self, conf_tools, template, owned):
+        self._load_power_nets(conf_tools)
+        for slide, role, key, _ in owned:
+            if role == "analysis":
+                self._fill_analysis_tables(key, slide)
+        # Template slide of each analysis, as the report was built from,
+        # so that analyses newly marked for a net get their slides too
+        template_ids = { analysis: template.Slides(index).SlideID for analysis, index in RESULT_TEMPLATES.items() }
+        items = [ (f"{analysis}|{net.name}", template_ids[analysis], self._placeholders(net))
+                  for net in self.power_nets for analysis in ANALYSES if net.needs(analysis) ]
+        self._sync_slides(owned, "result", items, template)
 
     def build_pptx(self, conf_tools):
+        self._load_render_plan()
         self._make_cover(conf_tools)
         self._copy_slides(conf_tools)
         for type_ in ["ac", "dc", "imp"]: self._fill_analysis_tables(type_)
@@ -1,8 +1,39 @@
 import os
-from time import sleep
 from datetime import date
 from .report import Report
-from util import COVER_SLIDE, TITLE_NAME, DATE_NAME, MSOTRUE, TABLE_COORDS
+from .meta import PowerNets
+from tables import TableSnapshot, padded
+from render import RenderPlan
+from images import ImageDir, IMAGE_PLACEHOLDER, box_pixels, fit, spread, scale_images, image_size
+from util import COVER_SLIDE, TITLE_NAME, DATE_NAME, TABLE_COORDS, MSOTRUE
+from backends import clone_slide
+
+# Prefix of the names of the slides made by Weaver (see SimulationReport._own_slide)
+OWNED_PREFIX = "weaver:"
+# Names of the shapes of template slides images are placed in, once filled, and of the images themselves
+IMAGE_BOX_NAME = f"{OWNED_PREFIX}image-box"
+IMAGE_NAME = f"{OWNED_PREFIX}image"
+
+
+def _owned_name(role, template_id, key):
+    """
+    Returns name of a slide made by Weaver (see SimulationReport._own_slide)
+    """
+    return f"{OWNED_PREFIX}{role}:{template_id}:{key}"
+
+
+def owned_slides(pptx):
+    """
+    Returns list of (Slide, role, key, template SlideID) of the slides of pptx
+    marked as made by Weaver, in slide order
+    """
+    owned = []
+    for slide in pptx.Slides:
+        name = slide.Name
+        if name.startswith(OWNED_PREFIX):
+            role, template_id, key = name[len(OWNED_PREFIX):].split(":", 2)
+            owned.append((slide, role, key, int(template_id)))
+    return owned
 
 
 class SimulationReport(Report):
@@ -10,16 +41,99 @@ class SimulationReport(Report):
     Base class for simulation reports
     """
     __rep_types = ["si", "pi", "emc", "thermal"]
+    # Policies for saving to a file that already exists
+    __if_exists_policies = ["rename", "overwrite", "skip", "error"]
 
-    def __init__(self, pptx_template, proj_num):
+    def __init__(self, pptx_template, proj_num, params=None):
         super().__init__(pptx_template)
         self.__proj_num = proj_num
+        # Report parameters given in advance (e.g. in batch mode);
+        # the user is prompted for any that are missing
+        self.__params = {
+            "date": "", # yyyy-MM-dd or "today"
+            "output_dir": "",
+            "filename": "", # Pattern, e.g. "{proj_num}_{type}_{interface}.pptx"
+            "if_exists": "rename",
+            "image_dir": "", # Images placed on the slides they are matched to (see _place_images)
+        }
+        self.__params.update({ k: v for k, v in (params or {}).items() if v })
+        if self.__params["date"] == "today":
+            self.__params["date"] = date.today().isoformat()
+        elif self.__params["date"]:
+            date.fromisoformat(self.__params["date"]) # Fail before building if invalid
+        if self.__params["if_exists"] not in self.__if_exists_policies:
+            raise ValueError(f"Unknown policy for existing files: {self.__params['if_exists']}")
+        self.__saved_path = ""
+        self.__save_over = "" # Report built before, replaced by this one
+        self.__power_nets = None
+        self.__render_plan = None
+        self.__updating = False
+        # SlideID -> digests of the texts rendered on the slide (see RenderPlan.render),
+        # and those by slide name recorded before and kept when saved (see rendered)
+        self.__rendered = {}
+        self.__rendered_before = {}
+        self.__rendered_names = {}
         self._curr_slide = 1
 
+    @property
+    def proj_num(self):
+        return self.__proj_num
+
+    @property
+    def params(self):
+        return dict(self.__params)
+
+    @property
+    def saved_path(self):
+        """
+        Returns path the report was saved to, or "" if not saved
+        """
+        return self.__saved_path
+
+    @property
+    def rendered(self):
+        """
+        Returns dict of name of each slide made by Weaver -> digests of the texts rendered thereon
+        (see RenderPlan.render) as saved, to be recalled when the report is updated (see recall_rendered)
+        """
+        return { name: dict(targets) for name, targets in self.__rendered_names.items() }
+
+    def recall_rendered(self, rendered):
+        """
+        Has the report, when updated, rewrite only the texts that are still as rendered
+        when it was built or last updated (see rendered), leaving those edited since as they are;
+        without a record (None), none of the texts of the slides made before are rewritten
+        """
+        self.__rendered_before = rendered or {}
+
+    @property
+    def power_nets(self):
+        """
+        Returns PowerNets of the report, read from its power net table on first use
+        """
+        if self.__power_nets is None:
+            self.__power_nets = self._read_power_nets()
+        return self.__power_nets
+
+    @classmethod
+    def source_slides(cls, toc, interface=None):
+        """
+        Returns sorted list of the slides (by number) of the confirmation tools
+        a report is built from, given their TOC
+        """
+        slides = { COVER_SLIDE }
+        for start, end in toc.values():
+            slides.update(range(start, end + 1))
+        return sorted(slides)
+
     @staticmethod
     def report_types():
         return SimulationReport.__rep_types
 
+    @staticmethod
+    def if_exists_policies():
+        return SimulationReport.__if_exists_policies
+
     @property
     def report_type(self):
         raise NotImplementedError 
@@ -30,13 +144,14 @@ class SimulationReport(Report):
         and returns the date formatted according to report standards
         """
         date_str = ""
-        while True:
+        if self.__params["date"]:
+            date_str = date.fromisoformat(self.__params["date"])
+        while not date_str:
             # Instructions for user input
             prompt = """Input report date as follows: yyyy-MM-dd\nWhere:\n  yyyy -> year\n  MM -> month\n  dd -> date\n\nDate: """
             # Check if instructions were followed
             try:
                 date_str = date.fromisoformat(input(prompt))
-                break
             except ValueError: 
                 continue
 
@@ -47,25 +162,21 @@ class SimulationReport(Report):
         """
         Sets first slide of report from args and user input
         """
-        # Copy cover slide unto Clipboard
-        # and paste so as to make it the first slide in the report
-        conf_tools.pptx.Slides(COVER_SLIDE).Copy() 
-        sleep(.25)
-        self.pptx.Slides.Paste(COVER_SLIDE) 
-
-        # Grab the pasted cover slide
-        # and iterate over its shapes in order to replace their contents
-        cover = self.pptx.Slides(COVER_SLIDE)
-        for shape in cover.Shapes:
-            if shape.Name == TITLE_NAME:
-                shape.TextFrame.TextRange.Text = self.title[:]
-            elif shape.Name == DATE_NAME:
-                shape.TextFrame.TextRange.Text = self._get_date()
-            elif shape.HasTable == MSOTRUE:
-                conf_creators = conf_tools.get_creators()
-                # Match table coordinates with creator keys and insert values of latter
-                for group, coords in TABLE_COORDS.items():
-                    shape.Table.Cell(coords[0], coords[1]).Shape.TextFrame.TextRange.Text = conf_creators[group][:]
+        # Clone cover slide so as to make it the first slide in the report,
+        # then look up its shapes in order to replace their contents
+        cover = clone_slide(conf_tools.pptx.Slides(COVER_SLIDE), self.pptx, COVER_SLIDE)
+        shapes = self.shape_index(cover)
+        title_shape, date_shape = shapes.shape(TITLE_NAME), shapes.shape(DATE_NAME)
+        if title_shape is not None:
+            shapes.set_text(title_shape, self.title[:])
+        if date_shape is not None:
+            shapes.set_text(date_shape, self._get_date())
+        table = shapes.table()
+        if table is not None:
+            conf_creators = conf_tools.get_creators()
+            # Match table coordinates with creator keys and insert values of latter
+            for group, coords in TABLE_COORDS.items():
+                shapes.set_cell(table, coords[0], coords[1], conf_creators[group][:])
 
         title = " ".join(self.title[:].split("\n")).strip()
         print(f"Cover slide generated for {title}.\n")
@@ -79,40 +190,331 @@ class SimulationReport(Report):
         # Read each slide according to toc
         for section in toc:
             for slide_num in range(toc[section][0], toc[section][1] + 1):
-                # Copy current slide unto Clipboard
-                conf_tools.pptx.Slides(slide_num).Copy()
-                sleep(.25)
-                # Paste slide into the same position of report if possible;
+                # Clone slide into the same position of report if possible;
                 # otherwise, append to end
                 pos = slide_num - 1 if slide_num <= len(self.pptx.Slides) else ""
-                self.pptx.Slides.Paste(pos)
+                clone_slide(conf_tools.pptx.Slides(slide_num), self.pptx, pos)
                 self._curr_slide += 1
     
+    def _load_render_plan(self, template=None):
+        """
+        Loads RenderPlan of the template (the report itself if omitted);
+        to be called before the template is changed
+        """
+        self.__render_plan = RenderPlan.of(self.pptx if template is None else template)
+
+    def _render(self, slide, values, template_id=None, by_name=False):
+        """
+        Fills every placeholder of slide with values (a dict of placeholder -> text),
+        slide being the template slide template_id (its own SlideID if omitted)
+        or a copy thereof; by_name for copies made before and perhaps edited since
+        (see RenderPlan.render)
+        """
+        if self.__render_plan is None:
+            self._load_render_plan()
+        slide_id = slide.SlideID
+        template_id = slide_id if template_id is None else template_id
+        rendered = self.__rendered.get(slide_id)
+        if rendered is None:
+            rendered = dict(self.__rendered_before.get(slide.Name, {})) if by_name else {}
+            self.__rendered[slide_id] = rendered
+        if self.__render_plan.render(slide, values, template_id, self.journal, slide_id, by_name, rendered):
+            self._forget_slide(slide_id)
+
+    def _own_slide(self, slide, role, key="", template_id=0):
+        """
+        Marks slide, by its name, as a region of the report made by Weaver
+        and rewritten when the report is updated: role tells what it holds,
+        key the item (e.g. signal) it is of and template_id the template slide it is rendered from
+        """
+        slide.Name = _owned_name(role, template_id, key)
+
+    def _fill_table(self, shapes, table, block, first_row):
+        """
+        Fills table of shapes (a ShapeIndex) with block from first_row (see ShapeIndex.fill).
+        When updating, the columns of block are blanked down to the last row of table,
+        so that nothing is left of an earlier fill (e.g. rows of signals since removed)
+        """
+        if self.__updating:
+            width = max((len(texts) for texts in block), default=0)
+            block = padded(block, width, table.Rows.Count - first_row + 1)
+        shapes.fill(table, block, first_row)
+
+    def _keep_rendered(self):
+        """
+        Keeps digests of the texts rendered on the slides made by Weaver by slide name (see rendered),
+        those of slides not rendered again as recorded before
+        """
+        self.__rendered_names = {}
+        if not self.__rendered and not self.__rendered_before:
+            return
+        for slide, role, key, template_id in owned_slides(self.pptx):
+            name = _owned_name(role, template_id, key)
+            rendered = self.__rendered.get(slide.SlideID, self.__rendered_before.get(name))
+            if rendered:
+                self.__rendered_names[name] = rendered
+
+    def _image_names(self, role, key):
+        """
+        Returns names an image must be matched by (see images.ImageDir.match)
+        to be placed on the slide of role made for key (see _own_slide)
+        """
+        return [ name for name in key.split("|") if name ]
+
+    def _image_boxes(self, slide):
+        """
+        Returns list of the shapes of slide images are placed in, in z-order,
+        deleting the images placed therein before (and the ShapeIndex of slide, then out of date)
+        """
+        boxes = []
+        deleted = False
+        for shape in list(slide.Shapes):
+            name = shape.Name
+            if name == IMAGE_NAME:
+                shape.Delete()
+                deleted = True
+            elif name == IMAGE_BOX_NAME:
+                boxes.append(shape)
+            elif shape.HasTextFrame == MSOTRUE and shape.TextFrame.TextRange.Text.strip() == IMAGE_PLACEHOLDER:
+                boxes.append(shape)
+        if deleted:
+            self._forget_slide(slide.SlideID)
+        return boxes
+
+    def _place_images(self):
+        """
+        Places the images of the image directory (see params) on the slides made by Weaver
+        they are matched to (see _image_names), in the shapes holding IMAGE_PLACEHOLDER
+        on their template slides. Each image is scaled down to its box beforehand,
+        and those placed before (e.g. when updating) are replaced.
+        To be called once the journal is applied, as shapes are added and removed
+        """
+        if not self.__params["image_dir"]:
+            return
+        if self.__render_plan is None:
+            self._load_render_plan()
+        image_dir = ImageDir(self.__params["image_dir"])
+
+        # Boxes are read, and images matched, for every slide before any is scaled
+        placements = [] # (slide, boxes, [ (path, box) ])
+        for slide, role, key, template_id in owned_slides(self.pptx):
+            if IMAGE_PLACEHOLDER not in self.__render_plan.tokens(template_id or slide.SlideID):
+                continue
+            boxes = self._image_boxes(slide)
+            paths = image_dir.match(self._image_names(role, key))
+            if not paths:
+                continue
+            placed = spread(paths, [ (box.Left, box.Top, box.Width, box.Height) for box in boxes ])
+            placements.append((slide, boxes, placed))
+
+        jobs = [ (path, box_pixels(box[2], box[3])) for _, _, placed in placements for path, box in placed ]
+        scaled = iter(scale_images(jobs))
+        for slide, boxes, placed in placements:
+            shapes = slide.Shapes
+            for box in boxes:
+                box.Name = IMAGE_BOX_NAME
+                box.TextFrame.TextRange.Text = ""
+            for _, box in placed:
+                path = next(scaled)
+                picture = shapes.AddPicture(os.path.abspath(path), 0, MSOTRUE, *fit(box, image_size(path)))
+                picture.Name = IMAGE_NAME
+            # Shapes were added and written to directly, so any ShapeIndex of slide is out of date
+            self._forget_slide(slide.SlideID)
+        print(f"Placed {len(jobs)} images on {len(placements)} slides.")
+
+    def _read_power_nets(self, conf_tools=None):
+        """
+        Returns PowerNets read from the power net table of the report,
+        or of conf_tools if given
+        """
+        raise NotImplementedError
+
+    def _load_power_nets(self, conf_tools):
+        """
+        Reads the PowerNets of the report from conf_tools, e.g. when updating,
+        as its own copy of the power net table is left as is
+        """
+        self.__power_nets = self._read_power_nets(conf_tools)
+
+    def _parse_power_nets(self, slide_index, columns, analyses, source=None, loaded=()):
+        """
+        Reads the power net table on slide at slide_index (see PowerNets.from_table)
+        of source (e.g. ConfirmationTools), the report itself if omitted
+        """
+        source = self if source is None else source
+        table = self._get_table(source.shape_index(source.pptx.Slides(slide_index)))
+        power_nets = PowerNets.from_table(TableSnapshot.from_table(table), columns, analyses, loaded)
+        print("\nLoaded the following power nets:\n")
+        for net in power_nets:
+            analyses = ", ".join(f"{k} ({v})" if v else k for k, v in net.analyses.items())
+            print(f"  {net.name} ({net.voltage}): {analyses or '-'}")
+        print()
+        return power_nets
+
     def _build_slides(self):
         raise NotImplementedError
 
+    def _update_slides(self, conf_tools, template, owned):
+        """
+        Rewrites the slides of owned (see owned_slides) from conf_tools,
+        template being the template the report was built on
+        """
+        raise NotImplementedError
+
+    def _sync_slides(self, owned, role, items, template):
+        """
+        Makes the slides of role among owned match items, a list of (key, template SlideID, values) in order:
+        the slide of each key is rendered again with values (see _render), those of keys no longer
+        among items are deleted, and each new key gets a copy of its slide of template,
+        placed after the slide of the item before it
+        """
+        slides = { key: slide for slide, slide_role, key, _ in owned if slide_role == role }
+        if not slides:
+            print(f"No {role} slides to update.")
+            return
+        first = next(iter(slides.values()))
+        previous = None
+        added = 0
+        for key, template_id, values in items:
+            slide = slides.pop(key, None)
+            # Slides made before may have been edited since, so their shapes are matched by name
+            by_name = slide is not None
+            if slide is None:
+                source = next((s for s in template.Slides if s.SlideID == template_id), None)
+                if source is None:
+                    print(f"Template slide for {key} not found, skipped.")
+                    continue
+                # Placed before the first slide of role until one is placed
+                index = first.SlideIndex if previous is None else previous.SlideIndex + 1
+                slide = clone_slide(source, self.pptx, index)
+                self._own_slide(slide, role, key, template_id)
+                added += 1
+            self._render(slide, values, template_id, by_name)
+            previous = slide
+        for slide in slides.values():
+            self._delete_slide(slide.SlideIndex)
+        print(f"Updated {role} slides: {added} added, {len(slides)} deleted.")
+
+    def save_over(self, path):
+        """
+        Has the report replace the report built before at path, whatever the if_exists policy,
+        if saved to the same file; to any other file, the if_exists policy applies as usual
+        """
+        self.__save_over = os.path.abspath(path) if path else ""
+
     def _save_report(self):
         """
-        Gets filename from user and closes report after saving
+        Gets filename (from params or user), saves report 
+        according to the if_exists policy and closes it
         """
         filename = ""
-        path = ""
-        while True:
+        path = self.__params["output_dir"]
+        if path:
+            path = os.path.abspath(path)
+            filename = self._make_filename()
+            os.makedirs(path, exist_ok=True)
+        while not path:
             title = " ".join(self.title[:].split("\n"))
             filename = input(f"Input filename to save the report {title}:\n")
             path = input("Input path to save report: ") # TODO: develop algorithm to fix name
             if filename and os.path.isabs(path):
-                if os.path.exists(os.path.join(path, filename)):
-                    print("ERROR: File of specified name already exists.")
-                    return
                 if not os.path.exists(path): 
                     os.mkdir(path)
                 if not filename.endswith(".pptx"): filename += ".pptx"
-                break
+            else:
+                path = ""
 
-        self.pptx.SaveAs(os.path.join(path, filename))
+        save_path = os.path.join(path, filename)
+        if save_path == self.__save_over:
+            print(f"Replacing {filename}, built before.")
+        else:
+            save_path = self._resolve_collision(save_path)
+        if not save_path:
+            return
+        self._apply_writes()
+        self._place_images()
+        self._keep_rendered()
+        print(self.journal.summary())
+        self.__saved_path = save_path
+        self.pptx.SaveAs(self.__saved_path)
         self.pptx.Close()
-        print(f"{filename} saved in {path}.")
+        print(f"{os.path.basename(save_path)} saved in {path}.")
+
+    def _resolve_collision(self, save_path):
+        """
+        Returns path to save to if save_path already exists,
+        or "" if the report is not to be saved
+        """
+        if not os.path.exists(save_path):
+            return save_path
+
+        policy = self.__params["if_exists"]
+        if policy == "overwrite":
+            print(f"Overwriting existing file {save_path}.")
+            return save_path
+        elif policy == "rename":
+            stem, ext = os.path.splitext(save_path)
+            count = 1
+            while os.path.exists(f"{stem}_{count}{ext}"):
+                count += 1
+            return f"{stem}_{count}{ext}"
+        elif policy == "skip":
+            print(f"Skipped saving, as file {save_path} already exists.")
+            return ""
+        raise FileExistsError(f"File of specified name {save_path} already exists.")
+
+    def _filename_fields(self):
+        """
+        Returns dict of values available to filename patterns
+        """
+        return {
+            "proj_num": self.proj_num,
+            "type": self.report_type,
+            "interface": "",
+            "date": self.__params["date"],
+        }
+
+    def _filename_pattern(self):
+        """
+        Returns pattern of the filename used when saving to a given output directory
+        """
+        return self.__params["filename"] or "{proj_num}_{type}.pptx"
+
+    def _make_filename(self):
+        """
+        Returns filename used when saving to a given output directory,
+        formatted from the filename pattern
+        """
+        pattern = self._filename_pattern()
+        try:
+            filename = pattern.format(**self._filename_fields())
+        except (KeyError, IndexError, ValueError):
+            raise ValueError(f"Invalid filename pattern {pattern}, "
+                             f"fields are: {', '.join(self._filename_fields())}")
+        if not filename.endswith(".pptx"): filename += ".pptx"
+        return filename
 
     def build_pptx(self, conf_tools):
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def update_pptx(self, conf_tools, template):
+        """
+        Rewrites the regions of the report made by Weaver (results and analysis tables,
+        slides of each signal or power net) from conf_tools and saves it in place,
+        leaving everything else (e.g. manual edits) as is.
+        template is the template the report was built on, opened alongside it
+        """
+        owned = owned_slides(self.pptx)
+        if not owned:
+            raise ValueError(f"{self.pptx.FullName} has no slides made by Weaver, build it again instead")
+        self.__updating = True
+        self._load_render_plan(template)
+        self._update_slides(conf_tools, template, owned)
+        self._apply_writes()
+        self._place_images()
+        self._keep_rendered()
+        print(self.journal.summary())
+        self.__saved_path = self.pptx.FullName
+        self.pptx.Save()
+        self.pptx.Close()
+        print(f"{os.path.basename(self.__saved_path)} updated.")
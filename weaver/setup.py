@@ -6,10 +6,20 @@ setup(
     package_dir={
         "weaver": "",
         "weaver.reports": "reports",
-        "weaver.reports.sim": "reports/sim" 
+        "weaver.reports.sim": "reports/sim",
+        "weaver.backends": "backends"
+    },
+    packages=["weaver", "weaver.reports", "weaver.reports.sim", "weaver.backends"],
+    extras_require={
+        # Scales images placed on slides (-i) down to their boxes
+        "images": ["Pillow"]
     },
-    packages=["weaver", "weaver.reports", "weaver.reports.sim"],
     entry_points={
-        "console_scripts": ["weaver=app:main"]
+        "console_scripts": [
+            "weaver=app:main",
+            "weaver-batch=app:batch_main",
+            "weaver-daemon=app:daemon_main",
+            "weaver-client=app:client_main"
+        ]
     }
 )
\ No newline at end of file
@@ -0,0 +1,176 @@
+from tables import block_cells, ensure_rows, write_cells
+
+# As per the MsoTriState Enum
+MSOTRUE = -1
+
+
+class _Entry():
+    """
+    Shape of a ShapeIndex along with whatever has been read of it
+    """
+    __slots__ = ["shape", "name", "has_table", "has_text", "table", "header", "text"]
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.name = None
+        self.has_table = None
+        self.has_text = None
+        self.table = None
+        self.header = None
+        self.text = None
+
+    def is_table(self):
+        if self.has_table is None:
+            self.has_table = self.shape.HasTable == MSOTRUE
+            if self.has_table:
+                self.table = self.shape.Table
+                self.has_text = False # Tables have no TextFrame of their own
+        return self.has_table
+
+    def is_text(self):
+        if self.has_text is None:
+            self.has_text = self.shape.HasTextFrame == MSOTRUE
+        return self.has_text
+
+
+class ShapeIndex():
+    """
+    Index of the Shapes of a Slide:
+    shapes by name, tables by the text of their first header cell,
+    and shapes with a TextFrame along with their text.
+    The collection is iterated at most once, only as far as lookups need,
+    and each property of a shape is read at most once.
+    Given a WriteJournal, writes are recorded therein (under slide_id) instead of made
+    """
+    def __init__(self, shapes, journal=None, slide_id=None):
+        self.__pending = iter(shapes) # Shapes not reached yet
+        self.__entries = []
+        self.__journal = journal
+        self.__slide_id = slide_id
+
+    @classmethod
+    def of(cls, shapes):
+        """
+        Returns shapes if already indexed; otherwise, a new index of shapes
+        """
+        return shapes if isinstance(shapes, cls) else cls(shapes)
+
+    def __iter__(self):
+        """
+        Yields an _Entry for every shape in z-order
+        """
+        yield from self.__entries
+        for shape in self.__pending:
+            entry = _Entry(shape)
+            self.__entries.append(entry)
+            yield entry
+
+    def shape(self, name):
+        """
+        Returns first Shape named name, or None if not found
+        """
+        for entry in self:
+            if entry.name is None:
+                entry.name = entry.shape.Name
+            if entry.name == name:
+                return entry.shape
+        return None
+
+    def table(self, header=None):
+        """
+        Returns first Table (whose first header text is header, if given),
+        or None if not found
+        """
+        for entry in self:
+            if entry.is_table() and (header is None or self.__header(entry) == header):
+                return entry.table
+        return None
+
+    def tables(self, headers=False):
+        """
+        Returns list of Tables in z-order,
+        or of (first header text, Table) if headers
+        """
+        return [ (self.__header(entry), entry.table) if headers else entry.table
+                 for entry in self if entry.is_table() ]
+
+    def texts(self):
+        """
+        Returns list of (Shape, text) for shapes with a TextFrame in z-order
+        """
+        texts = []
+        for i, entry in enumerate(self, start=1):
+            if entry.has_table or not entry.is_text():
+                continue
+            if entry.text is None:
+                entry.text = self.__pending_text(i)
+                if entry.text is None:
+                    entry.text = entry.shape.TextFrame.TextRange.Text[:]
+            texts.append((entry.shape, entry.text))
+        return texts
+
+    def set_text(self, shape, text):
+        """
+        Sets text of shape, keeping the index up to date
+        """
+        index, entry = self.__find(shape)
+        if self.__journal is not None and entry is not None:
+            self.__journal.set_text(self.__slide_id, index, shape, text, entry.text)
+            entry.text = text
+            return
+        shape.TextFrame.TextRange.Text = text
+        if entry is not None:
+            # Read again on next use, as PowerPoint normalizes line breaks
+            entry.text = None
+
+    def set_cell(self, table, row, col, text):
+        """
+        Sets text of cell (row, col) of table
+        """
+        index, entry = self.__find(table)
+        if self.__journal is not None and entry is not None:
+            self.__journal.set_cell(self.__slide_id, index, table, row, col, text)
+        else:
+            table.Cell(row, col).Shape.TextFrame.TextRange.Text = text
+        if entry is not None and (row, col) == (1, 1):
+            entry.header = None # Read again (or from the journal) on next use
+
+    def fill(self, table, block, first_row=1, first_col=1):
+        """
+        Writes block (see tables.block_cells) into table from (first_row, first_col),
+        first appending any rows the block needs in one go
+        """
+        ensure_rows(table, first_row + len(block) - 1)
+        cells = block_cells(block, first_row, first_col)
+        index, entry = self.__find(table)
+        if self.__journal is not None and entry is not None:
+            for row, col, text in cells:
+                self.__journal.set_cell(self.__slide_id, index, table, row, col, text)
+        else:
+            write_cells(table, cells)
+        if entry is not None and (1, 1) in [ (row, col) for row, col, _ in cells ]:
+            entry.header = None
+
+    def __find(self, item):
+        """
+        Returns (z-order index, _Entry) of shape or table item, or (0, None) if not indexed
+        """
+        for i, entry in enumerate(self.__entries, start=1):
+            if entry.shape is item or entry.table is item:
+                return i, entry
+        return 0, None
+
+    def __header(self, entry):
+        if entry.header is None:
+            entry.header = self.__pending_text(self.__entries.index(entry) + 1, 1, 1)
+            if entry.header is None:
+                entry.header = entry.table.Cell(1, 1).Shape.TextFrame.TextRange.Text[:]
+        return entry.header
+
+    def __pending_text(self, index, row=0, col=0):
+        """
+        Returns text written to but not yet set on target, or None
+        """
+        if self.__journal is None:
+            return None
+        return self.__journal.text(self.__slide_id, index, row, col)
@@ -0,0 +1,158 @@
+import os
+import json
+import hashlib
+
+# Bump when the layout of the cache file changes
+INDEX_VERSION = 1
+IBIS_EXT = ".ibs"
+
+
+def _mtime(path):
+    """
+    Returns modification time of path in ns, or None if it does not exist
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _key(name):
+    """
+    Normalizes interface and signal names as written in confirmation tools
+    """
+    return name.strip().lower()
+
+
+class SimDirIndex():
+    """
+    Index of the .ibs files found in a simulation directory,
+    which is structured as <sim_dir>/<interface>/<signal>[/<folder>]/<model>.ibs.
+
+    The index is persisted to a cache file and each interface is rescanned
+    only when the modification time of one of its directories has changed,
+    so lookups on an unchanged tree cost a handful of stat calls.
+    """
+    def __init__(self, sim_dir, cache_dir):
+        self.__sim_dir = os.path.abspath(sim_dir)
+        digest = hashlib.sha1(self.__sim_dir.encode("utf-8")).hexdigest()
+        self.__cache_path = os.path.join(cache_dir, f"simdir-{digest}.json")
+        self.__checked = set() # Interfaces validated during this run
+        self.__modified = False
+        self.__data = self._load()
+
+    @property
+    def sim_dir(self):
+        return self.__sim_dir
+
+    @property
+    def cache_path(self):
+        return self.__cache_path
+
+    def _load(self):
+        empty = { "version": INDEX_VERSION, "sim_dir": self.__sim_dir, "mtime": None, "names": {}, "interfaces": {} }
+        try:
+            with open(self.__cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        if data.get("version") != INDEX_VERSION or data.get("sim_dir") != self.__sim_dir:
+            return empty
+        return data
+
+    def _names(self):
+        """
+        Returns dict of normalized -> actual interface folder names,
+        relisting the simulation directory only if it has changed
+        """
+        mtime = _mtime(self.__sim_dir)
+        if mtime != self.__data["mtime"]:
+            names = {}
+            if mtime is not None:
+                with os.scandir(self.__sim_dir) as entries:
+                    names = { _key(e.name): e.name for e in entries if e.is_dir() }
+            self.__data["mtime"] = mtime
+            self.__data["names"] = names
+            # Drop interfaces which no longer exist
+            for key in list(self.__data["interfaces"]):
+                if key not in names:
+                    del self.__data["interfaces"][key]
+            self.__modified = True
+        return self.__data["names"]
+
+    def _is_fresh(self, entry):
+        return all(_mtime(os.path.join(self.__sim_dir, rel)) == mtime for rel, mtime in entry["dirs"].items())
+
+    def _scan_dir(self, path):
+        """
+        Returns names of .ibs files and of subfolders in path
+        """
+        files, folders = [], []
+        with os.scandir(path) as entries:
+            for e in entries:
+                if e.is_dir():
+                    folders.append(e.name)
+                elif os.path.splitext(e.name)[1].lower() == IBIS_EXT:
+                    files.append(e.name)
+        return sorted(files), sorted(folders)
+
+    def _scan_interface(self, if_folder):
+        """
+        Walks one interface folder and returns its index entry
+        """
+        dirs = { if_folder: _mtime(os.path.join(self.__sim_dir, if_folder)) }
+        signals = {}
+        _, sig_folders = self._scan_dir(os.path.join(self.__sim_dir, if_folder))
+        for sig_folder in sig_folders:
+            rel = os.path.join(if_folder, sig_folder)
+            dirs[rel] = _mtime(os.path.join(self.__sim_dir, rel))
+            files, folders = self._scan_dir(os.path.join(self.__sim_dir, rel))
+            ibis = [ os.path.join(rel, name) for name in files ]
+            # If .ibs not found in the signal folder, check a level deeper
+            if not ibis:
+                for folder in folders:
+                    sub_rel = os.path.join(rel, folder)
+                    dirs[sub_rel] = _mtime(os.path.join(self.__sim_dir, sub_rel))
+                    ibis += [ os.path.join(sub_rel, name) for name in self._scan_dir(os.path.join(self.__sim_dir, sub_rel))[0] ]
+            signals[_key(sig_folder)] = ibis
+        return { "dirs": dirs, "signals": signals }
+
+    def _interface(self, if_name):
+        key = _key(if_name)
+        names = self._names()
+        if key not in names:
+            return None
+        entry = self.__data["interfaces"].get(key)
+        if key not in self.__checked:
+            if entry is None or not self._is_fresh(entry):
+                entry = self._scan_interface(names[key])
+                self.__data["interfaces"][key] = entry
+                self.__modified = True
+            self.__checked.add(key)
+        return entry
+
+    def has_signal(self, if_name, sig_name):
+        entry = self._interface(if_name)
+        return entry is not None and _key(sig_name) in entry["signals"]
+
+    def ibis_files(self, if_name, sig_name):
+        """
+        Returns absolute paths of the .ibs files for a signal of an interface
+        """
+        entry = self._interface(if_name)
+        if entry is None:
+            return []
+        return [ os.path.join(self.__sim_dir, rel) for rel in entry["signals"].get(_key(sig_name), []) ]
+
+    def save(self):
+        """
+        Writes the index to its cache file if it has changed
+        """
+        if not self.__modified:
+            return
+        os.makedirs(os.path.dirname(self.__cache_path), exist_ok=True)
+        tmp_path = self.__cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.__data, f)
+        os.replace(tmp_path, self.__cache_path)
+        self.__modified = False
@@ -0,0 +1,357 @@
+import os
+import zlib
+import struct
+import zipfile
+from xml.sax.saxutils import escape, quoteattr
+
+from util import TITLE_NAME, DATE_NAME, REP_SLIDE_TITLE
+
+# \\\\\\\\\\\\\\\\\\\\\\\\\\\\\\
+# *** GLOBAL CONSTANTS ****
+# //////////////////////////////
+
+EMU_PER_POINT = 12700
+
+P_NS = 'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" ' \
+       'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" ' \
+       'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+RT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/"
+CT = "application/vnd.openxmlformats-officedocument.presentationml."
+
+# Part numbers of the synthetic ICs
+SOC_PART = "ABC123_SOC"
+DRAM_PART = "XYZ789"
+
+
+# =======================
+# -- Deck Writer --
+# =======================
+
+def _xfrm(shape, tag="a:xfrm"):
+    x, y, cx, cy = [ int(shape.get(key, 0) * EMU_PER_POINT) for key in ["left", "top", "width", "height"] ]
+    return f'<{tag}><a:off x="{x}" y="{y}"/><a:ext cx="{cx}" cy="{cy}"/></{tag}>'
+
+
+def _paragraphs(text):
+    return "".join(f"<a:p><a:r><a:t>{escape(line)}</a:t></a:r></a:p>" if line else "<a:p/>"
+                   for line in str(text).split("\n"))
+
+
+def _shape_xml(shape_id, shape):
+    name = quoteattr(shape.get("name", ""))
+    if "table" in shape:
+        rows = shape["table"]
+        grid = "".join('<a:gridCol w="914400"/>' for _ in rows[0])
+        trs = "".join('<a:tr h="370840">' + "".join(
+            f'<a:tc><a:txBody><a:bodyPr/><a:lstStyle/>{_paragraphs(cell)}</a:txBody><a:tcPr/></a:tc>'
+            for cell in row) + "</a:tr>" for row in rows)
+        return f'<p:graphicFrame><p:nvGraphicFramePr><p:cNvPr id="{shape_id}" name={name}/>' \
+               f'<p:cNvGraphicFramePr/><p:nvPr/></p:nvGraphicFramePr>{_xfrm(shape, "p:xfrm")}' \
+               f'<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/table">' \
+               f'<a:tbl><a:tblGrid>{grid}</a:tblGrid>{trs}</a:tbl></a:graphicData></a:graphic></p:graphicFrame>'
+    tx_body = f'<p:txBody><a:bodyPr/><a:lstStyle/>{_paragraphs(shape["text"])}</p:txBody>' if "text" in shape else ""
+    return f'<p:sp><p:nvSpPr><p:cNvPr id="{shape_id}" name={name}/><p:cNvSpPr/><p:nvPr/></p:nvSpPr>' \
+           f'<p:spPr>{_xfrm(shape)}</p:spPr>{tx_body}</p:sp>'
+
+
+def write_pptx(path, deck):
+    """
+    Writes a deck spec (see backends.fake.read_deck) to a minimal .pptx
+    with a single master and layout
+    """
+    slides = deck["slides"]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        overrides = "".join(f'<Override PartName="/ppt/slides/slide{i}.xml" ContentType="{CT}slide+xml"/>'
+                            for i in range(1, len(slides) + 1))
+        z.writestr("[Content_Types].xml",
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            f'<Override PartName="/ppt/presentation.xml" ContentType="{CT}presentation.main+xml"/>'
+            f'<Override PartName="/ppt/slideMasters/slideMaster1.xml" ContentType="{CT}slideMaster+xml"/>'
+            f'<Override PartName="/ppt/slideLayouts/slideLayout1.xml" ContentType="{CT}slideLayout+xml"/>'
+            f'{overrides}</Types>')
+        z.writestr("_rels/.rels", f'<Relationships xmlns="{REL_NS}">'
+            f'<Relationship Id="rId1" Type="{RT}officeDocument" Target="ppt/presentation.xml"/></Relationships>')
+        sld_ids = "".join(f'<p:sldId id="{255 + i}" r:id="rId{i + 1}"/>' for i in range(1, len(slides) + 1))
+        z.writestr("ppt/presentation.xml", f'<p:presentation {P_NS}><p:sldMasterIdLst>'
+            f'<p:sldMasterId id="2147483648" r:id="rId1"/></p:sldMasterIdLst>'
+            f'<p:sldIdLst>{sld_ids}</p:sldIdLst><p:sldSz cx="9144000" cy="6858000"/></p:presentation>')
+        rels = "".join(f'<Relationship Id="rId{i + 1}" Type="{RT}slide" Target="slides/slide{i}.xml"/>'
+                       for i in range(1, len(slides) + 1))
+        z.writestr("ppt/_rels/presentation.xml.rels", f'<Relationships xmlns="{REL_NS}">'
+            f'<Relationship Id="rId1" Type="{RT}slideMaster" Target="slideMasters/slideMaster1.xml"/>{rels}</Relationships>')
+        z.writestr("ppt/slideMasters/slideMaster1.xml", f'<p:sldMaster {P_NS}><p:cSld><p:spTree/></p:cSld>'
+            f'<p:sldLayoutIdLst><p:sldLayoutId id="2147483649" r:id="rId1"/></p:sldLayoutIdLst></p:sldMaster>')
+        z.writestr("ppt/slideMasters/_rels/slideMaster1.xml.rels", f'<Relationships xmlns="{REL_NS}">'
+            f'<Relationship Id="rId1" Type="{RT}slideLayout" Target="../slideLayouts/slideLayout1.xml"/></Relationships>')
+        z.writestr("ppt/slideLayouts/slideLayout1.xml",
+            f'<p:sldLayout {P_NS}><p:cSld name="Title Only"><p:spTree/></p:cSld></p:sldLayout>')
+        z.writestr("ppt/slideLayouts/_rels/slideLayout1.xml.rels", f'<Relationships xmlns="{REL_NS}">'
+            f'<Relationship Id="rId1" Type="{RT}slideMaster" Target="../slideMasters/slideMaster1.xml"/></Relationships>')
+        for i, slide in enumerate(slides, start=1):
+            tree = "".join(_shape_xml(j, shape) for j, shape in enumerate(slide["shapes"], start=2))
+            name = quoteattr(slide.get("name", ""))
+            z.writestr(f"ppt/slides/slide{i}.xml", f'<p:sld {P_NS}><p:cSld name={name}><p:spTree>'
+                f'<p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr><p:grpSpPr/>'
+                f'{tree}</p:spTree></p:cSld></p:sld>')
+            z.writestr(f"ppt/slides/_rels/slide{i}.xml.rels", f'<Relationships xmlns="{REL_NS}">'
+                f'<Relationship Id="rId1" Type="{RT}slideLayout" Target="../slideLayouts/slideLayout1.xml"/></Relationships>')
+
+
+# =======================
+# -- Slide Helpers --
+# =======================
+
+def _text(name, text, top=20):
+    return { "name": name, "text": text, "left": 20, "top": top, "width": 680, "height": 40 }
+
+
+def _table(name, rows, top=80):
+    return { "name": name, "table": rows, "left": 20, "top": top, "width": 680, "height": 20 * len(rows) }
+
+
+def _slide(title, *shapes):
+    return { "name": "", "shapes": [ _text(REP_SLIDE_TITLE, title) ] + list(shapes) }
+
+
+def _cover(title):
+    """
+    Cover slide read by ConfirmationTools and cloned into each report
+    """
+    return { "name": "", "shapes": [
+        _text(TITLE_NAME, title, top=150),
+        _text(DATE_NAME, "01 Jan. 2020", top=250),
+        _table("Table 3", [ ["Prepared by", "A. Preparer"], ["Reviewed by", "B. Reviewer"] ], top=350),
+    ] }
+
+
+def _toc(sections):
+    return _slide("Table of Contents", _table("Table 2", [ ["Section", "Page"] ] + sections))
+
+
+def _interface_names(interfaces):
+    return [ f"IF{i}" for i in range(interfaces) ]
+
+
+def _signal_names(signals):
+    return [ f"DQ{i}" for i in range(signals) ]
+
+
+def _power_net_names(power_nets):
+    return [ f"VDD_{i}" for i in range(power_nets) ]
+
+
+# =======================
+# -- Deck Generators --
+# =======================
+
+def conf_tools_deck(rep_type, proj_num="AB1234", interfaces=2, signals=4, power_nets=3):
+    """
+    Returns deck spec of synthetic confirmation tools of rep_type (si, pi or emc)
+    laid out as ConfirmationTools and util expect
+    """
+    cover = _cover(f"{proj_num} Synthetic Board\nConfirmation Tools")
+    slides = [ cover, _slide("Revision History") ]
+    if rep_type == "si":
+        if_names = _interface_names(interfaces)
+        first = 5
+        topology = first + len(if_names)
+        eye_mask = topology + len(if_names)
+        slides += [
+            _toc([ ["1. Purpose", "4"],
+                   ["2.1 Simulation Target & Condition", f"{first}-{topology - 1}"],
+                   ["2.2 Topology", f"{topology}-{eye_mask - 1}"],
+                   ["2.3 Eye Mask Judgement", f"{eye_mask}"] ]),
+            _slide("1. Purpose"),
+        ]
+        for if_name in if_names:
+            slides.append(_slide(f"2.1 Simulation Target & Condition: {if_name}",
+                _table("Table 3", [ ["Signal Group", "Frequency", "Transmission Line", "Topology", "PVT"] ] +
+                                  [ [ f"DQ: {sig}", "800 MHz", "U1 ~ U2", "Point to point", "Typ / Max" ]
+                                    for sig in _signal_names(signals) ]),
+                _table("Table 4", [ ["Reference", "Function", "Part", "IC Model"],
+                                    ["U1", "SoC", f"SOC {SOC_PART}", "soc.ibs"],
+                                    ["U2", "Memory", f"DRAM {DRAM_PART}", "?"] ], top=300)))
+        slides += [ _slide(f"2.2 Topology: {if_name}") for if_name in if_names ]
+        slides.append(_slide("2.3 Eye Mask Judgement"))
+    elif rep_type == "pi":
+        nets = _power_net_names(power_nets)
+        slides += [
+            _toc([ ["1. Purpose", "4"],
+                   ["2.1 Simulation Target", "6"],
+                   ["2.2 Current Consumption", "7"],
+                   ["2.3 Voltage Margin", "8"],
+                   ["3. Appendix", f"9-{8 + len(nets)}"] ]),
+            _slide("1. Purpose"),
+            _slide("2. Simulation Conditions"),
+            _slide("2.1 Simulation Target",
+                _table("Table 3", [ ["Power Net", "Reference IC", "Voltage", "DC Drop Analysis", "AC Drop Analysis",
+                                     "Impedance Analysis", "Acceptable Target Voltage Margin"] ] +
+                                  [ [ net, "U1 ~ U3", "1.8V", "○", "○ (U2)", "○ (U3)", "±5%" ] for net in nets ])),
+            _slide("2.2 Current Consumption"),
+            _slide("2.3 Voltage Margin"),
+        ]
+        slides += [ _slide(f"Topology: {net}") for net in nets ]
+    elif rep_type == "emc":
+        nets = _power_net_names(power_nets)
+        slides += [
+            _toc([ ["1. Purpose", "4"], ["2.1 Simulation Target", "7"] ]),
+            _slide("1. Purpose"),
+            _slide("2. Simulation Conditions"),
+            _slide("2.1 Board Stack-up"),
+            _slide("3.1 Simulation Target",
+                _table("Table 3", [ ["Power Net", "Source", "Voltage", "Power Resonance"] ] +
+                                  [ [ net, "U1", "1.8V", u"〇" ] for net in nets ])),
+        ]
+    else:
+        raise ValueError(f"Unknown report type '{rep_type}'")
+    return { "slides": slides }
+
+
+def template_deck(rep_type, interfaces=2, signals=4, power_nets=3):
+    """
+    Returns deck spec of a synthetic report template of rep_type,
+    with slides at the positions the reports.sim classes expect
+    once the cover slide is inserted
+    """
+    if rep_type == "si":
+        # Results table has 4 header rows and 2 rows for each of the first 5 (staggered) signals
+        results = [ ["No.", "Signal", "Driver", "Receiver", "PVT"] ] + [ [ "" ] * 5 for _ in range(13) ]
+        slides = [
+            _slide("Revision History"),
+            _toc([ ["1. <INTERFACE> Overview", "4"], ["2. <INTERFACE> Results", "5"], ["", ""] ]),
+            _slide("Executive Summary", _text("TextBox 2", "Results of <INTERFACE>", top=100)),
+            _slide("3. <INTERFACE> Simulation Results"),
+            _slide("Results", _table("Table 3", results)),
+            _slide("<SIGNAL> Eye Diagram", _text("TextBox 2", "<INTERFACE> at <FREQ>", top=100),
+                { "name": "TextBox 5", "text": "<IMAGE>", "left": 20, "top": 150, "width": 680, "height": 140 },
+                _table("Table 4", [ ["Item", "<SIGNAL>", ""], ["Frequency", "<FREQ>", ""], ["", "Driver", "Receiver"],
+                                    ["<DRIVER_IBS>", "<DRIVER_MODEL>", "<RECEIVER_IBS>"],
+                                    ["<RECEIVER_MODEL>", "<SIGNAL>", "<INTERFACE>"] ], top=300)),
+            _slide("Appendix"),
+        ]
+    elif rep_type == "pi":
+        rows = power_nets + 2
+        analysis = [ ["Item", "Simulation Target", "", ""],
+                     ["", "Simulation Target", "Simulation Portion", "Source Voltage"] ] + [ [ "" ] * 4 for _ in range(rows) ]
+        impedance = [ ["No.", "", ""], ["", "Power Net", "Reference IC"] ] + [ [ "" ] * 3 for _ in range(rows) ]
+        result = lambda title: _slide(title, _text("TextBox 2", "<POWER_NET[i]> (<V[i]>) at <RECEIVER_REF>", top=100),
+                                      _table("Table 3", [ ["Net"], ["<POWER_NET[i]>"], ["<RECEIVER_REF>"] ], top=300))
+        slides = [
+            _slide("Revision History"),
+            _toc([ ["1. Overview", "4"], ["2. Results", "12"] ]),
+            _slide("Executive Summary"),
+            _slide("Methodology"),
+            _slide("2. Simulation Target"),
+            # Power net table of the confirmation tools is copied here
+            _slide("Current Consumption"),
+            _slide("Voltage Margin"),
+            _slide("DC Drop Analysis", _table("Table 3", analysis)),
+            _slide("AC Drop Analysis", _table("Table 3", [ list(row) for row in analysis ])),
+            _slide("Impedance Analysis", _table("Table 3", impedance)),
+            _slide("3. Results"),
+            _slide("3.1 Result Summary"),
+            result("DC Drop: <POWER_NET[i]>"),
+            result("AC Drop: <POWER_NET[i]>"),
+            result("Impedance: <POWER_NET[i]>"),
+            # Topology slides are copied before the last two slides
+            _slide("Appendix"),
+            _slide("End"),
+        ]
+    elif rep_type == "emc":
+        slides = [
+            _slide("Revision History"),
+            _toc([ ["1. Overview", "4"], ["2. Results", "8"] ]),
+            _slide("Executive Summary"),
+            _slide("3. Simulation Target"),
+            # Power net table of the confirmation tools is copied here
+            _slide("4. Power Resonance Analysis"),
+            _slide("Analysis Items", _table("Table 3", [ ["Item", "Power Net", "Result"], ["", "", "Frequency"],
+                                                         ["", "", ""] ])),
+            _slide("4.1 Method"),
+            _slide("4.2 Results"),
+            _slide("Result", _text("TextBox 2", "Target: <POWER_NET[i]> (<V[i]>)", top=100),
+                _table("Table 3", [ ["Net"], ["<POWER_NET[i]>"] ], top=300)),
+            _slide("5. Appendix"),
+            _slide("Appendix <i>", _text("TextBox 2", "Appendix <i>: <POWER_NET[i]>", top=100),
+                _table("Table 3", [ ["", "Net"], ["", "<POWER_NET[i]>"] ], top=300)),
+            _slide("End"),
+        ]
+    else:
+        raise ValueError(f"Unknown report type '{rep_type}'")
+    return { "slides": slides }
+
+
+def _ibis_text(signals, waveform_rows=200):
+    """
+    Returns an IBIS file of a component with a pin per signal
+    and a waveform table of waveform_rows, which IBIS files are mostly made of
+    """
+    pins = "".join(f"A{i}  {sig}  DQ_40OHM\n" for i, sig in enumerate(signals, start=1))
+    waveform = "".join(f"{i * 0.01:.2f}  {-i}mA  {-i}mA  {-i}mA\n" for i in range(waveform_rows))
+    return f"[IBIS Ver]  5.0\n[Component]  {SOC_PART}\n[Manufacturer]  Synthetic\n" \
+           f"[Pin]  signal_name  model_name\n{pins}" \
+           f"[Model]  DQ_40OHM\nModel_type  I/O\n[Pulldown]\n{waveform}[End]\n"
+
+
+def make_sim_dir(root, interfaces=2, signals=4):
+    """
+    Writes a simulation directory of interface/signal folders,
+    each holding an IBIS file of the SoC
+    """
+    sig_names = _signal_names(signals)
+    text = _ibis_text(sig_names)
+    for if_name in _interface_names(interfaces):
+        for sig in sig_names:
+            os.makedirs(os.path.join(root, if_name, sig), exist_ok=True)
+            with open(os.path.join(root, if_name, sig, "soc.ibs"), "w") as f:
+                f.write(text)
+    return root
+
+
+def _png(width, height):
+    """
+    Returns a grey RGB PNG image of width by height pixels
+    """
+    chunk = lambda tag, data: struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+    rows = b"".join(b"\x00" + b"\x80" * 3 * width for _ in range(height))
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)) \
+           + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+def make_image_dir(root, interfaces=2, signals=4, width=1600, height=1200):
+    """
+    Writes an eye diagram image of width by height pixels for each signal of each interface,
+    named <interface>_<signal>_eye.png
+    """
+    os.makedirs(root, exist_ok=True)
+    blob = _png(width, height)
+    for if_name in _interface_names(interfaces):
+        for sig in _signal_names(signals):
+            with open(os.path.join(root, f"{if_name}_{sig}_eye.png"), "wb") as f:
+                f.write(blob)
+    return root
+
+
+def generate(out_dir, rep_type, interfaces=2, signals=4, power_nets=3, proj_num="AB1234"):
+    """
+    Writes synthetic confirmation tools of rep_type, a matching report template,
+    a textfile of template paths (see TEMP_PATH) and, for SI, a simulation directory.
+    Returns dict of their paths
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {
+        "conf_tools": os.path.join(out_dir, f"{proj_num}_{rep_type}_conf_tools.pptx"),
+        "template": os.path.join(out_dir, f"{rep_type}_template.pptx"),
+        "templates": os.path.join(out_dir, "paths_to_templates.txt"),
+        "sim_dir": "",
+    }
+    write_pptx(paths["conf_tools"], conf_tools_deck(rep_type, proj_num, interfaces, signals, power_nets))
+    write_pptx(paths["template"], template_deck(rep_type, interfaces, signals, power_nets))
+    with open(paths["templates"], "w") as f:
+        f.write(f"{rep_type}={paths['template']}\n")
+    if rep_type == "si":
+        paths["sim_dir"] = make_sim_dir(os.path.join(out_dir, "sim"), interfaces, signals)
+    return paths
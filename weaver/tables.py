@@ -0,0 +1,185 @@
+import re
+
+
+def _normalize_header(text):
+    """
+    Lowercases header text and collapses line breaks and spaces
+    """
+    return " ".join(re.split(r"[\r\n\v\s]+", text.lower())).strip()
+
+
+class TableSnapshot():
+    """
+    In-memory copy of the text of a Table,
+    read in a single pass so that readers need no further calls to the table
+    """
+    def __init__(self, cells, header_row=1):
+        self.__cells = [ list(row) for row in cells ]
+        self.__cols = max((len(row) for row in self.__cells), default=0)
+        self.__header_row = header_row
+        self.__columns = {}
+        if 1 <= header_row <= len(self.__cells):
+            for col, name in enumerate(self.__cells[header_row - 1], start=1):
+                # Keep first occurrence for repeated header names
+                self.__columns.setdefault(_normalize_header(name), col)
+
+    @classmethod
+    def from_table(cls, table, header_row=1):
+        """
+        Reads every cell of table (e.g. Shape.Table) and returns its snapshot
+        """
+        # Backends that hold the table in memory can hand over all cells at once
+        read_all = getattr(table, "read_all", None)
+        if read_all:
+            return cls(read_all(), header_row)
+
+        rows, cols = table.Rows.Count, table.Columns.Count
+        cells = [ [ table.Cell(row, col).Shape.TextFrame.TextRange.Text[:] for col in range(1, cols + 1) ]
+                  for row in range(1, rows + 1) ]
+        return cls(cells, header_row)
+
+    @property
+    def rows(self):
+        """
+        Returns number of rows, including the header
+        """
+        return len(self.__cells)
+
+    @property
+    def cols(self):
+        return self.__cols
+
+    @property
+    def header_row(self):
+        return self.__header_row
+
+    def cell(self, row, col):
+        """
+        Returns text at (row, col), indexed from 1 as with Table.Cell;
+        cells missing from a row (e.g. ragged tables) are empty
+        """
+        if not 1 <= row <= self.rows or not 1 <= col <= self.cols:
+            raise IndexError(f"Cell ({row}, {col}) is outside of the {self.rows}x{self.cols} table")
+        cells = self.__cells[row - 1]
+        return cells[col - 1] if col <= len(cells) else ""
+
+    def row(self, row):
+        """
+        Returns list of texts in row
+        """
+        return [ self.cell(row, col) for col in range(1, self.cols + 1) ]
+
+    def column(self, name):
+        """
+        Returns index of the column whose header matches name, or 0 if not found.
+        Matching ignores case and line breaks
+        """
+        return self.__columns.get(_normalize_header(name), 0)
+
+    def locate(self, layout):
+        """
+        Returns dict of field -> column index for layout, a dict of field -> (header names, usual column):
+        each field is found by the first of its header names present, so that columns may be reordered,
+        or else at its usual column (0 if beyond the table) for tables with headers of their own
+        """
+        columns = {}
+        for field, (names, usual) in layout.items():
+            col = next((self.column(name) for name in names if self.column(name)), 0)
+            if not col:
+                print(f"No column named {' or '.join(names)}; reading column {usual} instead")
+                col = usual if usual <= self.cols else 0
+            columns[field] = col
+        return columns
+
+    def value(self, row, col):
+        """
+        Returns text at (row, col), or "" if col is 0 (see locate)
+        """
+        return self.cell(row, col) if col else ""
+
+    def get(self, row, name, default=""):
+        """
+        Returns text of the cell in row under the header name
+        """
+        col = self.column(name)
+        return self.cell(row, col) if col else default
+
+    @property
+    def headers(self):
+        """
+        Returns normalized header name of every column
+        """
+        if not 1 <= self.__header_row <= self.rows:
+            return []
+        return [ _normalize_header(name) for name in self.row(self.__header_row) ]
+
+    def body(self):
+        """
+        Yields (row index, texts) for each row below the header
+        """
+        for row in range(self.__header_row + 1, self.rows + 1):
+            yield row, self.row(row)
+
+    def __len__(self):
+        return self.rows
+
+
+def block_cells(block, first_row=1, first_col=1):
+    """
+    Returns list of (row, col, text) for block, a list of rows of texts
+    placed at (first_row, first_col); None leaves a cell as it is
+    and rows may be shorter than others
+    """
+    return [ (row, col, text)
+             for row, texts in enumerate(block, start=first_row)
+             for col, text in enumerate(texts, start=first_col) if text is not None ]
+
+
+def padded(block, width, rows=0):
+    """
+    Returns block with its rows padded with empty texts to width cells,
+    followed by rows of empty texts up to rows rows in all
+    """
+    block = [ list(texts) + [ "" ] * (width - len(texts)) for texts in block ]
+    return block + [ [ "" ] * width for _ in range(rows - len(block)) ]
+
+
+def ensure_rows(table, count):
+    """
+    Appends rows to table until it has count rows, if fewer;
+    returns number of rows of table
+    """
+    rows = table.Rows
+    num_rows = rows.Count
+    if num_rows < count:
+        # Backends that hold the table in memory can add all rows at once
+        extend = getattr(rows, "extend", None)
+        if extend:
+            extend(count - num_rows)
+        else:
+            for _ in range(count - num_rows):
+                rows.Add()
+        num_rows = count
+    return num_rows
+
+
+def write_cells(table, cells):
+    """
+    Writes each (row, col, text) of cells to table
+    """
+    # Backends that hold the table in memory can take all cells at once
+    write_all = getattr(table, "write_all", None)
+    if write_all:
+        write_all(cells)
+        return
+    for row, col, text in cells:
+        table.Cell(row, col).Shape.TextFrame.TextRange.Text = text
+
+
+def staggered(texts, values):
+    """
+    Returns rows of a record spanning one row per item of values ("rows within row"):
+    texts fill the first row, each of values the next column of its own row,
+    and cells under texts (e.g. merged) are left as they are
+    """
+    return [ (texts if i == 0 else [ None ] * len(texts)) + [ value ] for i, value in enumerate(values) ]
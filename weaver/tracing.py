@@ -0,0 +1,338 @@
+import sys
+import json
+import time
+import types
+import bisect
+import functools
+
+import util
+from backends.base import Backend
+from reports import ConfirmationTools
+from reports.sim import SIReport, PIReport, EMCReport
+
+# \\\\\\\\\\\\\\\\\\\\\\\\\\\\\\
+# *** GLOBAL CONSTANTS ****
+# //////////////////////////////
+
+# Methods whose calls into PowerPoint are attributed to them as build phases, by class;
+# calls outside of any are attributed to OTHER_PHASE
+PHASES = {
+    ConfirmationTools: ["_read_toc", "_read_creators"],
+    SIReport: ["_load_render_plan", "_make_cover", "_fill_toc", "_fill_exec_summ", "_copy_slides", "_fill_divider",
+               "_fill_results_table", "_build_slides", "_save_report"],
+    PIReport: ["_load_render_plan", "_make_cover", "_copy_slides", "_fill_analysis_tables", "_build_slides", "_save_report"],
+    EMCReport: ["_load_render_plan", "_make_cover", "_copy_slides", "_get_power_nets", "_fill_analysis_table",
+                "_make_reson_analysis", "_add_appendix", "_save_report"],
+}
+# Module functions attributed as build phases
+PHASE_FUNCTIONS = {
+    util: ["_extract_interfaces"],
+}
+OTHER_PHASE = "(other)"
+
+# Upper bounds of the latency histogram buckets in microseconds
+BUCKETS_US = [1, 10, 100, 1000, 10000, 100000]
+
+# Names of the objects returned by collections and methods
+# when their type is not known (e.g. win32com CDispatch)
+ITEM_NAMES = {
+    "Presentations": "Presentation",
+    "Slides": "Slide",
+    "Shapes": "Shape",
+    "Rows": "Row",
+    "Columns": "Column",
+}
+RESULT_NAMES = {
+    "Open": "Presentation",
+    "Duplicate": "SlideRange",
+    "Paste": "SlideRange",
+    "clone": "Slide",
+}
+
+# Values passed through without a proxy
+_PLAIN_TYPES = (str, bytes, int, float, bool, type(None), list, tuple, dict)
+_METHOD_TYPES = (types.MethodType, types.BuiltinMethodType, functools.partial)
+
+# Tracer of the current process, if tracing is enabled
+_tracer = None
+
+
+# =======================
+# -- Helper Functions --
+# =======================
+
+def _type_name(value, fallback):
+    name = type(value).__name__
+    return fallback if name == "CDispatch" else name.lstrip("_")
+
+
+def _unwrap(value):
+    return object.__getattribute__(value, "_target") if isinstance(value, _Proxy) else value
+
+
+def _wrap(value, tracer, fallback):
+    if isinstance(value, _PLAIN_TYPES) or isinstance(value, _Proxy):
+        return value
+    return _Proxy(value, tracer, _type_name(value, fallback))
+
+
+def _phase(name, func):
+    """
+    Returns func attributing the calls made while it runs to phase name
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        tracer = _tracer
+        if tracer is None:
+            return func(*args, **kwargs)
+        tracer.enter(name)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            tracer.exit()
+    wrapper.traced_phase = name
+    return wrapper
+
+
+def _install_phases():
+    """
+    Wraps the methods and functions listed in PHASES and PHASE_FUNCTIONS as build phases;
+    raises AttributeError if any is missing (e.g. renamed), rather than leaving it untraced
+    """
+    missing = [ f"{cls.__name__}.{name}" for cls, names in PHASES.items() for name in names if not hasattr(cls, name) ]
+    missing += [ f"{module.__name__}.{name}" for module, names in PHASE_FUNCTIONS.items()
+                 for name in names if not hasattr(module, name) ]
+    if missing:
+        raise AttributeError(f"Build phases to trace not found: {', '.join(missing)}")
+    for cls, names in PHASES.items():
+        for name in names:
+            method = getattr(cls, name)
+            if getattr(method, "traced_phase", None) != name or name not in cls.__dict__:
+                setattr(cls, name, _phase(name, method))
+    for module, names in PHASE_FUNCTIONS.items():
+        for name in names:
+            func = getattr(module, name)
+            if not hasattr(func, "traced_phase"):
+                setattr(module, name, _phase(name, func))
+
+
+def enable():
+    """
+    Starts tracing calls into the objects of backends wrapped with wrap_backend
+    and returns the Tracer recording them
+    """
+    global _tracer
+    if _tracer is None:
+        _install_phases()
+        _tracer = Tracer()
+    return _tracer
+
+
+def disable():
+    """
+    Stops tracing and returns the Tracer used, if any
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def wrap_backend(backend):
+    """
+    Returns backend with its presentations traced if tracing is enabled;
+    otherwise, backend itself
+    """
+    return TracingBackend(backend, _tracer) if _tracer is not None else backend
+
+
+def dump(path="-"):
+    """
+    Writes report of the current Tracer to path:
+    as JSON if path ends with .json, or as text (to stdout if path is -)
+    """
+    if _tracer is None:
+        return
+    if path.endswith(".json"):
+        with open(path, "w") as f:
+            json.dump(_tracer.to_dict(), f, indent=2)
+    elif path == "-":
+        _tracer.report(sys.stdout)
+    else:
+        with open(path, "w") as f:
+            _tracer.report(f)
+
+
+# =======================
+# -- Class Definitions --
+# =======================
+
+class Tracer():
+    """
+    Counts and times calls into PowerPoint objects, per member and build phase
+    """
+    def __init__(self):
+        self.__stack = [ OTHER_PHASE ]
+        # phase -> member (e.g. "TextRange.Text") -> stats
+        self.__stats = {}
+
+    @property
+    def phase(self):
+        return self.__stack[-1]
+
+    def enter(self, phase):
+        self.__stack.append(phase)
+
+    def exit(self):
+        if len(self.__stack) > 1:
+            self.__stack.pop()
+
+    def record(self, member, seconds):
+        stats = self.__stats.setdefault(self.phase, {}).setdefault(member, {
+            "calls": 0,
+            "seconds": 0.0,
+            "max_seconds": 0.0,
+            "histogram": [ 0 ] * (len(BUCKETS_US) + 1),
+        })
+        stats["calls"] += 1
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        stats["histogram"][bisect.bisect_right(BUCKETS_US, seconds * 1e6)] += 1
+
+    def calls(self, phase=None):
+        """
+        Returns number of calls made (during phase if given)
+        """
+        phases = [ phase ] if phase else list(self.__stats)
+        return sum(stats["calls"] for p in phases for stats in self.__stats.get(p, {}).values())
+
+    def calls_per_phase(self):
+        return { phase: self.calls(phase) for phase in self.__stats }
+
+    def to_dict(self):
+        return {
+            "buckets_us": BUCKETS_US,
+            "phases": self.__stats,
+        }
+
+    def report(self, f=sys.stdout, top=15):
+        """
+        Writes a table of calls per phase, slowest phases and members first
+        """
+        labels = [ f"<{bound}us" for bound in BUCKETS_US ] + [ f">={BUCKETS_US[-1]}us" ]
+        seconds = lambda members: sum(stats["seconds"] for stats in members.values())
+        total_calls = self.calls()
+        total_seconds = sum(seconds(members) for members in self.__stats.values())
+        print(f"\nTRACE OF CALLS INTO POWERPOINT: {total_calls} calls, {total_seconds * 1000:.1f} ms", file=f)
+        for phase, members in sorted(self.__stats.items(), key=lambda item: -seconds(item[1])):
+            histogram = [ sum(stats["histogram"][i] for stats in members.values()) for i in range(len(labels)) ]
+            print(f"\nPHASE {phase}: {self.calls(phase)} calls, {seconds(members) * 1000:.1f} ms", file=f)
+            print("  " + "  ".join(f"{label}: {count}" for label, count in zip(labels, histogram) if count), file=f)
+            print(f"  {'MEMBER':<28} {'CALLS':>7} {'TOTAL [ms]':>10} {'MEAN [us]':>10} {'MAX [us]':>10}", file=f)
+            ranked = sorted(members.items(), key=lambda item: -item[1]["seconds"])
+            for member, stats in ranked[:top]:
+                print(f"  {member:<28} {stats['calls']:>7} {stats['seconds'] * 1000:>10.2f} "
+                      f"{stats['seconds'] / stats['calls'] * 1e6:>10.1f} {stats['max_seconds'] * 1e6:>10.1f}", file=f)
+            if len(ranked) > top:
+                print(f"  ... {len(ranked) - top} more", file=f)
+
+
+class _Proxy():
+    """
+    Wraps a PowerPoint object (e.g. a COM Object),
+    recording every access of its members and the objects returned thereby
+    """
+    __slots__ = ["_target", "_tracer", "_name"]
+
+    def __init__(self, target, tracer, name):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_tracer", tracer)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, name):
+        target, tracer, type_name = self._target, self._tracer, self._name
+        start = time.perf_counter()
+        value = getattr(target, name)
+        elapsed = time.perf_counter() - start
+        if isinstance(value, _METHOD_TYPES):
+            return _Method(value, tracer, f"{type_name}.{name}", RESULT_NAMES.get(name, name))
+        # Attributes of native object models (e.g. Slide.part) are not calls into PowerPoint
+        if not name[:1].isupper():
+            return value
+        tracer.record(f"{type_name}.{name}", elapsed)
+        return _wrap(value, tracer, name)
+
+    def __setattr__(self, name, value):
+        start = time.perf_counter()
+        setattr(self._target, name, _unwrap(value))
+        self._tracer.record(f"{self._name}.{name}=", time.perf_counter() - start)
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        value = self._target(*[ _unwrap(arg) for arg in args ], **kwargs)
+        self._tracer.record(f"{self._name}.Item", time.perf_counter() - start)
+        return _wrap(value, self._tracer, ITEM_NAMES.get(self._name, self._name))
+
+    def __iter__(self):
+        items = iter(self._target)
+        while True:
+            start = time.perf_counter()
+            try:
+                value = next(items)
+            except StopIteration:
+                return
+            self._tracer.record(f"{self._name}.Item", time.perf_counter() - start)
+            yield _wrap(value, self._tracer, ITEM_NAMES.get(self._name, self._name))
+
+    def __len__(self):
+        start = time.perf_counter()
+        count = len(self._target)
+        self._tracer.record(f"{self._name}.Count", time.perf_counter() - start)
+        return count
+
+    def __bool__(self):
+        return True
+
+    def __repr__(self):
+        return f"<traced {self._name} {self._target!r}>"
+
+
+class _Method():
+    """
+    Method of a traced object; calls are recorded under member
+    """
+    def __init__(self, method, tracer, member, result_name):
+        self.__method = method
+        self.__tracer = tracer
+        self.__member = member
+        self.__result_name = result_name
+
+    def __call__(self, *args, **kwargs):
+        args = [ _unwrap(arg) for arg in args ]
+        kwargs = { k: _unwrap(v) for k, v in kwargs.items() }
+        start = time.perf_counter()
+        value = self.__method(*args, **kwargs)
+        self.__tracer.record(self.__member, time.perf_counter() - start)
+        return _wrap(value, self.__tracer, self.__result_name)
+
+
+class TracingBackend(Backend):
+    """
+    Backend whose presentations are wrapped to be traced by tracer
+    """
+    def __init__(self, backend, tracer):
+        self.__backend = backend
+        self.__tracer = tracer
+        self.name = backend.name
+
+    @property
+    def backend(self):
+        return self.__backend
+
+    def open(self, path, with_window=True):
+        start = time.perf_counter()
+        pptx = self.__backend.open(path, with_window)
+        self.__tracer.record("Presentations.Open", time.perf_counter() - start)
+        return _wrap(pptx, self.__tracer, "Presentation")
+
+    def quit(self):
+        self.__backend.quit()
@@ -1,6 +1,18 @@
 import os
+import ibis
 # from .reports.meta import Interface, Signal
-from pywintypes import com_error
+from tables import TableSnapshot
+from simdir import SimDirIndex
+from pipeline import prefetch
+from shapes import ShapeIndex, MSOTRUE # MSOTRUE is imported from here by the backends
+
+try:
+    from pywintypes import com_error
+except ImportError:
+    # pywin32 is only available on Windows;
+    # native backends raise this in its place
+    class com_error(Exception):
+        pass
 
 # \\\\\\\\\\\\\\\\\\\\\\\\\\\\\\
 # *** GLOBAL CONSTANTS ****
@@ -20,204 +32,269 @@ TOC = 3
 EXEC_SUMM = 4
 
 # Values to verify shape identity
-MSOTRUE = -1
 TITLE_NAME = "Rectangle 26" 
 REP_SLIDE_TITLE = "Title 6" 
 DATE_NAME = u"テキスト プレースホルダー 10"
 
+# Columns of the Target and Frequency and IC Model tables: field -> (header names, usual column)
+TAR_AND_FREQ_COLUMNS = {
+    "signal_group": (["Signal Group"], 1),
+    "frequency": (["Frequency"], 2),
+    "trans_line": (["Transmission Line"], 3),
+    "pvt": (["PVT"], 5),
+}
+IC_MODEL_COLUMNS = {
+    "ref_num": (["Reference"], 1),
+    "part_name": (["Part", "Part Name", "Part Number"], 3),
+    "ibis_model": (["IC Model", "IBIS Model"], 4),
+}
+
+# Directory for data persisted between runs (e.g. simulation directory index)
+CACHE_DIR = os.getenv("WEAVER_CACHE", os.path.join(os.path.expanduser("~"), ".weaver", "cache"))
+
+
+def get_cache_dir():
+    """
+    Returns CACHE_DIR as it is when called, not when imported,
+    so that all modules follow it if changed (e.g. by tests)
+    """
+    return CACHE_DIR
+
 
 def _parse_if_name(shapes):
     """
-    Searches through Slide.Shapes for Shape with Text;
+    Searches through Slide.Shapes (or ShapeIndex thereof) for Shape with Text;
     Returns Interface.name if found based on pattern
     """
     if_name = ""
     last_title = ""
-    for shape in shapes:
-        if shape.HasTextFrame == MSOTRUE:
-            text = shape.TextFrame.TextRange.Text[:].lower()
-            curr_title = text[:]
-            if last_title != curr_title: 
-                last_title = curr_title
-                if text.find("target & condition") > -1:
-                    if text.find(":") > -1:
-                        # Displace pointer to the right by 1 and strip spaces
-                        if_name = text[text.find(":")+1:].strip()
-                    # # In case full-size colon used
-                    # except:
-                    #     tar_index = text.find("：")
-                    
+    for _, text in ShapeIndex.of(shapes).texts():
+        text = text.lower()
+        curr_title = text[:]
+        if last_title != curr_title: 
+            last_title = curr_title
+            if text.find("target & condition") > -1:
+                if text.find(":") > -1:
+                    # Displace pointer to the right by 1 and strip spaces
+                    if_name = text[text.find(":")+1:].strip()
+                # # In case full-size colon used
+                # except:
+                #     tar_index = text.find("：")
+                
     return if_name
 
 
 def _get_if_tables(shapes):
     """
     Returns pointers to the Target and Frequency and IC Model tables
+    of Slide.Shapes (or ShapeIndex thereof)
     """
-    tar_and_freq_table = None
-    ic_model_table = None
-    for s in shapes:
-        table_count = 0
-        if s.HasTable == MSOTRUE:
-            table_count += 1
-            first_header_name = s.Table.Cell(1,1).Shape.TextFrame.TextRange.Text[:]
-            if first_header_name == "Signal Group":
-                tar_and_freq_table = s.Table
-            elif first_header_name == "Reference":
-                ic_model_table = s.Table
-            else:
-                print(f"Found table with header name '{first_header_name}'")
-        if table_count == 2:
-            break
-
-    return tar_and_freq_table, ic_model_table
-
-
-def _get_ibis_models(if_name, sig_name, sim_dir):
+    index = ShapeIndex.of(shapes)
+    for first_header_name, _ in index.tables(headers=True):
+        if first_header_name not in ["Signal Group", "Reference"]:
+            print(f"Found table with header name '{first_header_name}'")
+
+    return index.table("Signal Group"), index.table("Reference")
+
+
+def _get_ibis_models(if_name, sig_name, sim_index):
     """
     Returns a str to be set as the ibis_model of a Signal.Device
     """
     # Path requires particular directory structure
-    signal_path = os.path.join(sim_dir, if_name, sig_name)
-    if not os.path.exists(signal_path):
+    if not sim_index.has_signal(if_name, sig_name):
+        signal_path = os.path.join(sim_index.sim_dir, if_name, sig_name.strip())
         print(f"Could not find {signal_path}:\n  \
                 Skipping addition of IBIS Model info for {sig_name} in {if_name}")
-    # Look through folders or current folder for IBIS files
+        return ""
+    # IBIS files in the signal folder or folders therewithin;
     # Let user choose during report editing which is correct
-    ibis_str = ""
-    in_folder = False # Flag for whether .ibs in signal_path or folder therewithin
-    for item in os.listdir(signal_path):
-        ext = os.path.splitext(item)[1] # Get file ext
-        # Found a file -- check if .ibs
-        if ext:
-            if ext == ".ibs":
-                in_folder = True
-                ibis_str += item + " " # Add space for additional ibis file
-        # If .ibs not yet found in current path, check a level deeper
-        elif not in_folder:
-            for subitem in os.listdir(os.path.join(signal_path, item)):
-                if os.path.splitext(subitem)[1] == ".ibs":
-                    ibis_str += subitem + " "
+    ibis_str = " ".join(os.path.basename(path) for path in sim_index.ibis_files(if_name, sig_name))
     if not ibis_str:
         print(f"Could not find IBIS Models for {sig_name} in {if_name}")
 
     return ibis_str
 
 
-def _set_signal_devices(interface, signal, table, sim_dir):
+def _get_buffer_model(if_name, signal, device, sim_index):
     """
-    Sets the Driver and Receiver of an input signal
+    Returns the buffer model of a Signal.Device,
+    which is read from the [Pin] section of its IBIS file(s)
     """
-    row = 1
-    while True:
-        # Go through every column and fill in Signal fields accordingly
+    paths = sim_index.ibis_files(if_name, signal.name)
+    # Prefer IBIS files named in the confirmation tools
+    named = (device.ibis_model or "").split()
+    paths = [ p for p in paths if os.path.basename(p) in named ] + \
+            [ p for p in paths if not os.path.basename(p) in named ]
+    for path in paths:
         try:
-            ref_num = table.Cell(row, 1).Shape.TextFrame.TextRange.Text[:]
-            ic_model = table.Cell(row, 4).Shape.TextFrame.TextRange.Text[:]
+            model = ibis.load(path).buffer_model(signal.name, device.part_name)
+        except (OSError, ValueError) as e:
+            print(f"Could not read {path}: {e}")
+            continue
+        if model:
+            return model
+    return ""
 
-            if signal.driver.ref_num == ref_num:
-                signal.driver.part_name = table.Cell(row, 3).\
-                                            Shape.TextFrame.TextRange.Text[:].split()[1]
-                signal.driver.ibis_model = None if ic_model.find("?") > -1 else ic_model
-                
-            elif signal.receiver.ref_num == ref_num:
-                signal.receiver.part_name = table.Cell(row, 3).\
-                                            Shape.TextFrame.TextRange.Text[:].split()[1]
-                signal.receiver.ibis_model = None if ic_model.find("?") > -1 else ic_model
-                
-            row += 1
 
-        # Reached end of table
-        except com_error:
-            break
+def _index_ic_models(ic_models):
+    """
+    Parses a TableSnapshot of the IC Model table 
+    into a dict of ref_num -> (part_name, ibis_model)
+    """
+    index = {}
+    cols = ic_models.locate(IC_MODEL_COLUMNS)
+    for row, _ in ic_models.body():
+        ref_num, ic_model = ic_models.value(row, cols["ref_num"]), ic_models.value(row, cols["ibis_model"])
+        part_name = ic_models.value(row, cols["part_name"]).split()
+        # Part column reads e.g. "DRAM ABC123"; keep the part number
+        part_name = part_name[1] if len(part_name) > 1 else "".join(part_name)
+        index[ref_num] = (part_name, None if ic_model.find("?") > -1 else ic_model)
+    return index
+
+
+def _set_signal_devices(signal, ic_models):
+    """
+    Sets the Driver and Receiver of an input signal
+    by looking up their ref_num in an index made by _index_ic_models
+    """
+    for device in [ signal.driver, signal.receiver ]:
+        if device.ref_num in ic_models:
+            device.part_name, device.ibis_model = ic_models[device.ref_num]
 
+    return signal
+
+
+def _enrich_signal(interface, signal, sim_index):
+    """
+    Fills in the IBIS data of a signal's devices from the simulation directory
+    """
     # Use simulation directory for ibis models if not found in confirmation tools
-    if sim_dir and not signal.driver.ibis_model and not signal.receiver.ibis_model:
+    if not signal.driver.ibis_model and not signal.receiver.ibis_model:
         for device in [ signal.driver, signal.receiver ]:
-            device.ibis_model =  _get_ibis_models(interface.name, signal.name, sim_dir)
+            device.ibis_model =  _get_ibis_models(interface.name, signal.name, sim_index)
+
+    # Resolve buffer models from the IBIS files themselves
+    for device in [ signal.driver, signal.receiver ]:
+        if not device.buffer_model:
+            device.buffer_model = _get_buffer_model(interface.name, signal, device, sim_index)
         
     return signal
 
 
-def _set_signal(table):
+def _set_signal(tar_and_freq):
     """
-    Set signal features based on target and frequency table
+    Set signal features based on a TableSnapshot 
+    of the target and frequency table
     """
-    signal = Signal()
-    row = 2
-    while True:
+    cols = tar_and_freq.locate(TAR_AND_FREQ_COLUMNS)
+    for row, _ in tar_and_freq.body():
         # Set name
+        signal_group = tar_and_freq.value(row, cols["signal_group"])
+        if not signal_group.strip():
+            continue
+        signal = Signal()
+        index = signal_group.find(":")
+        signal.name = signal_group[index+1:] if index > -1 else signal_group
+        if index > -1: 
+            signal.type = signal_group[:index].strip()
+
+        # Set frequency
+        freq_str = tar_and_freq.value(row, cols["frequency"])
         try:
-            signal_group = table.Cell(row, 1).Shape.TextFrame.TextRange.Text[:]
-            index = signal_group.find(":")
-            signal.name = signal_group[index+1:] if index > -1 else signal_group
-            if index > -1: 
-                signal.type = signal_group[:index].strip()
-            # print(signal.name)
-
-            # Set frequency
-            freq_str = table.Cell(row, 2).Shape.TextFrame.TextRange.Text[:]
-            try:
-                signal.frequency = freq_str.split()[0].strip(), freq_str.split()[1].strip()
-            except IndexError:
-                signal.frequency = None
-
-            # Set driver / receiver
-            trans_line = table.Cell(row, 3).Shape.TextFrame.TextRange.Text[:]
-            signal.driver.ref_num = trans_line.split("~")[0].strip()
-            signal.receiver.ref_num = trans_line.split("~")[1].strip()
-
-            # Set PVT value
-            signal.pvt = table.Cell(row, 5).Shape.TextFrame.TextRange.Text[:].split("/")
-            signal.pvt = [ item.strip() for item in signal.pvt ]
-            
-            yield signal
-            row += 1
-
-        except com_error:
-            break
+            signal.frequency = freq_str.split()[0].strip(), freq_str.split()[1].strip()
+        except IndexError:
+            signal.frequency = None
+
+        # Set driver / receiver
+        trans_line = tar_and_freq.value(row, cols["trans_line"])
+        signal.driver.ref_num = trans_line.split("~")[0].strip()
+        signal.receiver.ref_num = trans_line.split("~")[1].strip()
+
+        # Set PVT value
+        signal.pvt = tar_and_freq.value(row, cols["pvt"]).split("/")
+        signal.pvt = [ item.strip() for item in signal.pvt ]
+        
+        yield signal
     
 
-def _read_interface(slide, if_name, sim_dir):
+def _read_interface(shapes, if_name, slide_num=0):
     """
     Factory function for Interface instances with all fields filled in 
-    based on data found on the current Slide
+    based on data found on the current Slide.Shapes (or ShapeIndex thereof),
+    that of slide slide_num
     """
-    interface = Interface(if_name)
+    interface = Interface(if_name, slide_num)
 
-    tar_and_freq_table, ic_model_table = _get_if_tables(slide.Shapes)
+    tar_and_freq_table, ic_model_table = _get_if_tables(shapes)
     if tar_and_freq_table and ic_model_table:
-        for signal in _set_signal(tar_and_freq_table): 
-            interface.signals.append(signal)
-        print()
-        for i, signal in enumerate(interface.signals):
-            interface.signals[i] = _set_signal_devices(interface, signal, ic_model_table, sim_dir)
-            print(f"Loaded the following data for")
-            print(f"{signal.name}:")
-            print(f"DRIVER: {signal.driver.ref_num}")
-            print(f"RECEIVER: {signal.receiver.ref_num}\n")
-        print(f"TOTAL SIGNALS in")
-        print(f"{interface.name}: {len(interface.signals)}")
-        print()
+        # Read each table once; all signals are resolved against the IC model index
+        tar_and_freq = TableSnapshot.from_table(tar_and_freq_table)
+        ic_models = _index_ic_models(TableSnapshot.from_table(ic_model_table))
+        for signal in _set_signal(tar_and_freq): 
+            interface.signals.append(_set_signal_devices(signal, ic_models))
+        # One line per interface, as signals may number in the hundreds
+        signals = ", ".join(f"{signal.name.strip()} ({signal.driver.ref_num} ~ {signal.receiver.ref_num})"
+                            for signal in interface.signals)
+        print(f"Loaded {len(interface.signals)} signals of {interface.name}: {signals}")
         return interface
 
 
-def get_interfaces(conf_tools, sim_dir):
+def _extract_interfaces(conf_tools):
+    """
+    Returns list of Interfaces read from the simulation target slides
+    """
+    interfaces = []
     toc = conf_tools.get_toc()
     start, end = toc["sim_target"][0], toc["sim_target"][1]
     for i in range(start, end + 1):
         # last_title = ""
-        slide = conf_tools.pptx.Slides(i)
-        if_name = _parse_if_name(slide.Shapes)
-        interface = _read_interface(slide, if_name, sim_dir)
+        # Both reads share a single scan of the slide
+        shapes = conf_tools.shape_index(conf_tools.pptx.Slides(i))
+        if_name = _parse_if_name(shapes)
+        interface = _read_interface(shapes, if_name, i)
         if interface:
-            yield interface
+            interfaces.append(interface)
+    return interfaces
+
+
+def _enrich_interface(interface, sim_index):
+    """
+    Fills in the IBIS data of every signal of interface (see _enrich_signal)
+    """
+    for signal in interface.signals:
+        _enrich_signal(interface, signal, sim_index)
+    return interface
+
+
+def get_interfaces(conf_tools, sim_dir):
+    """
+    Yields the Interfaces of conf_tools, all read at once (or from cache),
+    each enriched with the IBIS data of sim_dir in a thread of its own (see pipeline.prefetch)
+    while the consumer builds the report of the one before
+    """
+    # Extraction is skipped if the confirmation tools are unchanged since the last run
+    if conf_tools.cache is not None:
+        interfaces = conf_tools.cache.fetch("interfaces", lambda: _extract_interfaces(conf_tools))
+        conf_tools.save_cache()
+    else:
+        interfaces = _extract_interfaces(conf_tools)
+
+    if not sim_dir:
+        yield from interfaces
+        return
+    # Index of IBIS files, reused across runs while the directory is unchanged
+    sim_index = SimDirIndex(sim_dir, get_cache_dir())
+    yield from prefetch(interfaces, lambda interface: _enrich_interface(interface, sim_index), name="enrich")
+    sim_index.save()
 
 from abc import ABC
 class Interface():
-    def __init__(self, name):
+    def __init__(self, name, slide_num=0):
         self.__name = name.upper()
         self.signals = list()
+        # Slide of the confirmation tools read from, or 0 if unknown
+        self.slide_num = slide_num
 
     @property
     def name(self):
@@ -1,12 +1,24 @@
 import os
-import win32com.client as win32
+import shutil
+import tempfile
 
+from concurrent.futures import ProcessPoolExecutor
 # from time import sleep
 # from abc import ABC, abstractmethod
-from util import get_interfaces
+import tracing
+from util import get_interfaces, get_cache_dir
+from builds import BuildLog, fingerprint
+from backends import get_backend, copy_presentation, max_workers
 from reports import ConfirmationTools
 from reports.sim import SIReport, PIReport, EMCReport
+from reports.simreport import owned_slides
 
+REPORT_CLASSES = { "si": SIReport, "pi": PIReport, "emc": EMCReport }
+
+# Templates loaded in this process, by path of their textfile: (modification time, templates)
+_template_paths = {}
+# Templates kept open in this process (see keep_templates), by path: (modification time, backend, Presentation)
+_open_templates = {}
 
 
 # \\\\\\\\\\\\\\\\\\\\\\\\\\\\\\
@@ -16,8 +28,13 @@ from reports.sim import SIReport, PIReport, EMCReport
 
 def _load_template_paths(file_path):
     """
-    Fetches template paths and returns dict mapping report type to template
+    Fetches template paths and returns dict mapping report type to template;
+    the textfile is read again only once changed
     """
+    mtime = os.path.getmtime(file_path)
+    if file_path in _template_paths and _template_paths[file_path][0] == mtime:
+        return dict(_template_paths[file_path][1])
+
     # dict to be populated
     templates = {
         "si": "",
@@ -41,50 +58,318 @@ def _load_template_paths(file_path):
     for k, v in templates.items():
         print(f"  REPORT TYPE {k.upper()}: {v}") 
     print()
-    return templates
+    _template_paths[file_path] = (mtime, templates)
+    return dict(templates)
+
+
+def _copy_template(template_path, work_dir):
+    """
+    Copies template into work_dir and returns path of the copy,
+    so that each report is built on a fresh template
+    """
+    fd, path = tempfile.mkstemp(suffix=".pptx", dir=work_dir)
+    os.close(fd)
+    shutil.copyfile(template_path, path)
+    return path
+
+
+def keep_templates(backend, file_path):
+    """
+    Opens the templates listed in the textfile at file_path with backend and keeps them open,
+    so that reports are built on copies made in memory rather than read from file each time.
+    Templates kept before are opened again only once changed (by modification time).
+    Backends unable to copy a presentation (see backends.copy_presentation) keep none.
+    Returns list of the templates kept open
+    """
+    kept = []
+    for path in set(_load_template_paths(file_path).values()):
+        if not path or not os.path.isfile(path):
+            continue
+        mtime = os.path.getmtime(path)
+        if path in _open_templates:
+            if _open_templates[path][:2] == (mtime, backend):
+                kept.append(_open_templates[path][2])
+                continue
+            _open_templates.pop(path)[2].Close()
+        pptx = backend.open(path, with_window=False)
+        copy = copy_presentation(pptx)
+        if copy is None:
+            pptx.Close()
+            continue
+        copy.Close()
+        _open_templates[path] = (mtime, backend, pptx)
+        kept.append(pptx)
+    return kept
+
+
+def release_templates():
+    """
+    Closes the templates kept open (see keep_templates)
+    """
+    while _open_templates:
+        _open_templates.popitem()[1][2].Close()
 
 
-def init_reports(PowerPoint, conf_tools, sim_dir=""):
+def _open_template(backend, template_path, work_dir="", with_window=True):
+    """
+    Opens and returns a fresh presentation of the template at template_path to build a report on:
+    a copy of the template if kept open with backend and unchanged since, otherwise
+    the template itself or, given work_dir, a copy of its file made therein
     """
-    Initializes and returns Report based on user input and template
+    if template_path in _open_templates:
+        mtime, owner, pptx = _open_templates[template_path]
+        if owner is backend and mtime == os.path.getmtime(template_path):
+            return copy_presentation(pptx)
+    return backend.open(_copy_template(template_path, work_dir) if work_dir else template_path, with_window)
+
+
+def _is_unattended(params):
+    """
+    Checks if reports can be built without prompting the user
+    """
+    return bool(params and params.get("date") and params.get("output_dir"))
+
+
+def iter_reports(backend, conf_tools, sim_dir="", params=None, work_dir="", interfaces=None):
+    """
+    Yields the Reports of conf_tools one at a time, each opened only once the one before is done with.
+    Reports are built on copies of the templates kept open (see keep_templates);
+    otherwise SI reports each open a copy of the template made in work_dir,
+    one for each of interfaces if given (all those of conf_tools otherwise,
+    read as the reports are built; see util.get_interfaces)
     """
     templates = _load_template_paths(os.getenv("TEMP_PATH"))
-    reports = None
     proj_num = conf_tools.proj_num[:]
     rep_type = conf_tools.type
-    template_pptx = PowerPoint.Presentations.Open(templates[rep_type])
 
     # Instantiate report based on user input
     if rep_type == "si":
-        reports = [ SIReport(template_pptx, interface, proj_num) for interface in get_interfaces(conf_tools, sim_dir) ]
+        work_dir = work_dir or tempfile.mkdtemp(prefix="weaver-")
+        for interface in (get_interfaces(conf_tools, sim_dir) if interfaces is None else interfaces):
+            yield SIReport(_open_template(backend, templates[rep_type], work_dir), interface, proj_num, params)
     elif rep_type == "pi":
-        reports = PIReport(template_pptx, proj_num)
+        yield PIReport(_open_template(backend, templates[rep_type]), proj_num, params)
     elif rep_type == "emc":
-        reports = EMCReport(template_pptx, proj_num)
+        yield EMCReport(_open_template(backend, templates[rep_type]), proj_num, params)
 
-    # Ensure returned object is of consistent data structure
-    if not isinstance(reports, list):
-        reports = [ reports ]
 
-    return reports
+def init_reports(backend, conf_tools, sim_dir="", params=None, work_dir="", interfaces=None):
+    """
+    Initializes and returns list of all Reports based on user input and template
+    (see iter_reports)
+    """
+    return list(iter_reports(backend, conf_tools, sim_dir, params, work_dir, interfaces))
 
 
-def weave_reports(conf_path, sim_dir):
+def _weave_si_report(conf_path, template_path, interface, params, backend_name="", save_over=""):
     """
-    Generate reports based on input confirmation tools and indicated type
+    Builds and saves the SI report of a single interface
+    on a fresh copy of the template (over the report at save_over if given; see SimulationReport.save_over);
+    run in a worker process. Returns path of the saved report ("" if not saved)
+    and the digests of the texts rendered therein (see SimulationReport.rendered)
     """
-    # Start PowerPoint process
-    PowerPoint = win32.Dispatch("PowerPoint.Application") 
+    backend = get_backend(backend_name)
+    ct = ConfirmationTools(backend.open(conf_path, with_window=False))
+    work_dir = tempfile.mkdtemp(prefix="weaver-")
+    try:
+        template_pptx = backend.open(_copy_template(template_path, work_dir), with_window=False)
+        rep = SIReport(template_pptx, interface, ct.proj_num[:], params)
+        rep.save_over(save_over)
+        rep.build_pptx(ct)
+        if not rep.saved_path:
+            rep.pptx.Close()
+        return rep.saved_path, rep.rendered
+    finally:
+        ct.pptx.Close()
+        backend.quit()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _weave_si_reports(conf_path, interfaces, params, backend_name="", workers=1, save_over=None):
+    """
+    Builds SI reports of interfaces concurrently in a pool of at most workers processes,
+    those of the interfaces (by name) in save_over over the reports at the paths given.
+    Returns list of (path of the saved report, digests of the texts rendered therein)
+    in order of interfaces (see _weave_si_report)
+    """
+    template_path = _load_template_paths(os.getenv("TEMP_PATH"))["si"]
+    save_over = save_over or {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(interfaces))) as pool:
+        futures = [ pool.submit(_weave_si_report, conf_path, template_path, interface, params, backend_name,
+                                save_over.get(interface.name, ""))
+                    for interface in interfaces ]
+        return [ future.result() for future in futures ]
+
+
+def _build_key(rep_type, interface=None):
+    """
+    Returns key of a report in build logs
+    """
+    return f"{rep_type}:{interface.name}" if interface else rep_type
+
+
+def _check_builds(build_log, conf_tools, interfaces, params):
+    """
+    Returns list of (interface, fingerprint, path of the report built before or "") of the reports
+    to be built (interface being None for reports of types other than SI)
+    and list of paths of those up to date according to build_log
+    """
+    rep_type = conf_tools.type
+    template_path = _load_template_paths(os.getenv("TEMP_PATH"))[rep_type]
+    stale, current = [], []
+    for interface in interfaces:
+        slides = REPORT_CLASSES[rep_type].source_slides(conf_tools.get_toc(), interface)
+        inputs = fingerprint(conf_tools, slides, template_path, params, interface, get_cache_dir())
+        key = _build_key(rep_type, interface)
+        path = build_log.current(key, inputs)
+        if path:
+            print(f"{os.path.basename(path)} is up to date.")
+            current.append(path)
+        else:
+            stale.append((interface, inputs, build_log.recorded(key)))
+    return stale, current
+
+
+def weave_reports(conf_path, sim_dir, backend_name="", params=None, workers=1, backend=None, incremental=False):
+    """
+    Generate reports based on input confirmation tools and indicated type.
+    params (date, output_dir, filename) are passed on to each report;
+    if these suffice to build without prompts, SI reports are built in up to workers processes.
+    A backend already started (e.g. by the daemon) may be given, which is then left running.
+    If incremental (and without prompts), reports whose inputs are unchanged since
+    they were last built in the output directory are left as they are,
+    and the others are built again, over those built before if saved to the same file.
+    Returns list of paths of the saved reports, followed by those up to date
+    """
+    # Start backend (e.g. PowerPoint process)
+    owns_backend = backend is None
+    if owns_backend:
+        backend = tracing.wrap_backend(get_backend(backend_name))
     # Make ConfirmationTools instance (not visible) 
-    ct = ConfirmationTools(PowerPoint.Presentations.Open(conf_path, WithWindow=False)) 
+    ct = ConfirmationTools(backend.open(conf_path, with_window=False)) 
 
-    # Initialize reports,
+    # Reports built are recorded in the output directory (e.g. to be updated later),
+    # and if incremental, only those whose inputs changed are built
+    build_log = BuildLog(params["output_dir"]) if _is_unattended(params) else None
+    # Stale reports are built again over those built before, if saved to the same file
+    interfaces, fingerprints, rebuilt, current = None, {}, {}, []
+    if incremental and build_log is not None and ct.type in REPORT_CLASSES:
+        stale, current = _check_builds(build_log, ct, list(get_interfaces(ct, sim_dir)) if ct.type == "si" else [ None ], params)
+        fingerprints = { _build_key(ct.type, interface): inputs for interface, inputs, _ in stale }
+        rebuilt = { _build_key(ct.type, interface): path for interface, _, path in stale if path }
+        interfaces = [ interface for interface, *_ in stale ]
+
+    # One process per interface
+    if ct.type == "si" and max_workers(workers, backend_name) > 1 and _is_unattended(params):
+        if interfaces is None:
+            interfaces = list(get_interfaces(ct, sim_dir))
+        ct.get_toc()
+        ct.get_creators()
+        ct.save_cache() # Workers read the extracted data from cache
+        ct.pptx.Close()
+        if owns_backend:
+            backend.quit()
+        if not interfaces:
+            return current
+        save_over = { interface.name: rebuilt[_build_key("si", interface)]
+                      for interface in interfaces if _build_key("si", interface) in rebuilt }
+        built = _weave_si_reports(conf_path, interfaces, params, backend_name, workers, save_over)
+        if build_log is not None:
+            for interface, (path, rendered) in zip(interfaces, built):
+                key = _build_key("si", interface)
+                build_log.record(key, fingerprints.get(key, ""), path, rendered)
+            build_log.save()
+        return [ path for path, _ in built if path ] + current
+
+    # Initialize reports one at a time,
     # then make a cover slide, copy/paste relevant slides, 
     # and save for each report
-    reports = init_reports(PowerPoint, ct, sim_dir) 
-    for rep in reports:
-        rep.build_pptx(ct)
+    work_dir = tempfile.mkdtemp(prefix="weaver-")
+    saved = []
+    rep = None
+    try:
+        if interfaces != []:
+            for rep in iter_reports(backend, ct, sim_dir, params, work_dir, interfaces):
+                key = _build_key(ct.type, getattr(rep, "interface", None))
+                rep.save_over(rebuilt.get(key, ""))
+                rep.build_pptx(ct)
+                # Reports not saved (e.g. skipped) are still open
+                if not rep.saved_path:
+                    rep.pptx.Close()
+                else:
+                    saved.append(rep.saved_path)
+                if build_log is not None:
+                    build_log.record(key, fingerprints.get(key, ""), rep.saved_path, rep.rendered)
+                rep = None
+
+        ct.save_cache()
+    finally:
+        # Close report left open by a failed build,
+        # so that a backend left running holds on to none of them
+        if rep is not None and not rep.saved_path:
+            rep.pptx.Close()
+        ct.pptx.Close() # Close, to avoid file corruption, w/o saving
+        if owns_backend:
+            backend.quit() # e.g. Quit PowerPoint process
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if build_log is not None:
+            build_log.save()
+
+    return saved + current
+
+
+def update_reports(conf_path, report_paths, sim_dir="", backend_name="", params=None, backend=None):
+    """
+    Updates reports at report_paths, built before from the confirmation tools at conf_path,
+    in place: only the regions made by Weaver are rewritten (see SimulationReport.update_pptx),
+    and of their texts, only those still as recorded in the build log of their directory when last
+    built or updated, so that those edited by hand since are left as they are.
+    SI reports are matched with their interface by name.
+    Returns list of paths of the updated reports
+    """
+    owns_backend = backend is None
+    if owns_backend:
+        backend = tracing.wrap_backend(get_backend(backend_name))
+    ct = ConfirmationTools(backend.open(conf_path, with_window=False))
+    template = _open_template(backend, _load_template_paths(os.getenv("TEMP_PATH"))[ct.type], with_window=False)
+    interfaces = None
+    updated = []
+    try:
+        for path in report_paths:
+            pptx = backend.open(os.path.abspath(path))
+            build_log = BuildLog(os.path.dirname(os.path.abspath(path)))
+            rep = None
+            interface = None
+            try:
+                if ct.type == "si":
+                    if interfaces is None:
+                        interfaces = { interface.name: interface for interface in get_interfaces(ct, sim_dir) }
+                    if_name = next((key for _, role, key, _ in owned_slides(pptx) if role == "results"), "")
+                    if if_name not in interfaces:
+                        raise ValueError(f"{path} is not the SI report of an interface of {conf_path}")
+                    interface = interfaces[if_name]
+                    rep = SIReport(pptx, interface, ct.proj_num[:], params)
+                else:
+                    rep = REPORT_CLASSES[ct.type](pptx, ct.proj_num[:], params)
+                rendered = build_log.rendered(path)
+                if rendered is None:
+                    print(f"No record of the texts rendered in {os.path.basename(path)}, "
+                          f"those of the slides made by Weaver are left as they are.")
+                rep.recall_rendered(rendered)
+                rep.update_pptx(ct, template)
+            finally:
+                # Close report left open by a failed update
+                if rep is None or not rep.saved_path:
+                    pptx.Close()
+            build_log.record_update(_build_key(ct.type, interface), rep.saved_path, rep.rendered)
+            build_log.save()
+            updated.append(rep.saved_path)
 
-    ct.pptx.Close() # Close, to avoid file corruption, w/o saving
-    PowerPoint.Quit() # Quit PowerPoint process
+        ct.save_cache()
+    finally:
+        template.Close()
+        ct.pptx.Close()
+        if owns_backend:
+            backend.quit()
 
+    return updated